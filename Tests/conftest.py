@@ -1,5 +1,7 @@
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
 from charts.models import HaradaChart, Pillar, Task
 
 
@@ -66,3 +68,52 @@ def tasks(db, pillars):
             )
             tasks_list.append(task)
     return tasks_list
+
+
+@pytest.fixture(scope="session", autouse=True)
+def shared_cache_dir(tmp_path_factory):
+    """Point the shared cache tier at a temporary directory, not the repo's .cache."""
+    from django.conf import settings
+
+    caches = {
+        **settings.CACHES,
+        "shared": {
+            **settings.CACHES["shared"],
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path_factory.mktemp("cache")),
+        },
+    }
+    with override_settings(CACHES=caches):
+        yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def generations_path(tmp_path_factory):
+    """Bump a temporary generation table, not the real one in /dev/shm."""
+    with override_settings(CACHE_GENERATIONS_PATH=str(tmp_path_factory.mktemp("generations") / "table")):
+        yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def queued_jobs():
+    """Leave jobs queued for the test to run, whatever DEBUG defaults JOBS_IMMEDIATE to."""
+    with override_settings(JOBS_IMMEDIATE=False):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache so cached pages don't leak."""
+    cache.clear()
+    yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def metrics_dir(tmp_path_factory):
+    """Keep request metrics written during tests out of the real METRICS_DIR."""
+    from config import metrics
+
+    with override_settings(METRICS_DIR=str(tmp_path_factory.mktemp("metrics"))):
+        metrics.reset()
+        yield
+        metrics.reset()
@@ -0,0 +1,80 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+
+PUBLIC_PAGES = ["home", "long_term_goal", "five_pillars", "64_tasks", "sign_in", "sign_up"]
+
+
+@pytest.mark.django_db
+class TestPageCache:
+    """Test the whole-page cache on the public marketing and method pages."""
+
+    @pytest.mark.parametrize("name", PUBLIC_PAGES)
+    def test_second_request_is_served_from_cache(self, client, name):
+        """Only the first anonymous request renders the template."""
+        url = reverse(name)
+
+        first = client.get(url)
+        second = client.get(url)
+
+        assert first.status_code == second.status_code == 200
+        assert first.templates
+        assert not second.templates
+        assert first.content == second.content
+
+    def test_anonymous_headers(self, client):
+        """Anonymous visitors get a publicly cacheable, cookie-free page."""
+        response = client.get(reverse("home"))
+
+        assert "public" in response["Cache-Control"]
+        assert "max-age=" in response["Cache-Control"]
+        assert "Cookie" in response["Vary"]
+        assert not response.cookies
+
+    def test_signed_in_visitors_get_private_copy(self, client):
+        """A session cookie bypasses the shared entry and marks the page private."""
+        client.get(reverse("home"))
+        client.cookies["sessionid"] = "abc"
+
+        response = client.get(reverse("home"))
+
+        assert response.templates
+        assert "private" in response["Cache-Control"]
+
+    def test_signed_in_pages_are_never_stored(self, client, user):
+        """Session-stored flash messages of one user never reach another."""
+        client.force_login(user)
+        client.get(reverse("home"))
+
+        response = client.get(reverse("home"))
+
+        assert response.templates
+
+    def test_query_string_is_not_part_of_key(self, client):
+        """The sign-up redirect parameter is read client-side only."""
+        client.get(reverse("sign_up"))
+
+        response = client.get(reverse("sign_up") + "?redirect=/wizard/")
+
+        assert not response.templates
+
+    def test_flash_messages_bypass_cache(self, client):
+        """Pages with pending messages are rendered fresh and not stored."""
+        client.cookies["messages"] = "x"
+        client.get(reverse("home"))
+
+        response = client.get(reverse("home"))
+
+        assert response.templates
+        assert "Cache-Control" not in response
+
+    def test_publishable_key_change_invalidates(self, client):
+        """Rotating the Clerk key renders the page again with the new key."""
+        with override_settings(CLERK_PUBLISHABLE_KEY="pk_test_old"):
+            client.get(reverse("home"))
+        with override_settings(CLERK_PUBLISHABLE_KEY="pk_test_new"):
+            response = client.get(reverse("home"))
+
+        assert response.templates
+        assert "pk_test_new" in response.content.decode()
@@ -0,0 +1,108 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from charts.models import HaradaChart, Pillar, Task, TaskComment
+from charts.search import search
+from charts.services import clone_chart
+
+
+@pytest.mark.django_db
+class TestCloneChart:
+    """Test deep-copying a chart as a template."""
+
+    def test_clone_copies_structure_and_resets_status(self, harada_chart, pillars, tasks):
+        """Pillars and tasks are copied; statuses go back to todo by default."""
+        tasks[0].status = "done"
+        tasks[0].save()
+
+        copy = clone_chart(harada_chart)
+
+        assert copy.id != harada_chart.id
+        assert copy.title == "Test Chart (copy)"
+        assert copy.pillar_set.count() == 8
+        assert copy.task_set.count() == 64
+        assert not copy.task_set.exclude(status="todo").exists()
+        assert set(copy.task_set.values_list("pillar__chart", flat=True)) == {copy.id}
+
+    def test_clone_keeps_status_and_comments_when_asked(self, user, harada_chart, tasks):
+        """Statuses and comments can be carried over."""
+        tasks[0].status = "done"
+        tasks[0].save()
+        TaskComment.objects.create(task=tasks[0], user=user, content="Halfway there")
+
+        copy = clone_chart(harada_chart, reset_status=False, include_comments=True)
+
+        copied = copy.task_set.get(pillar__position=1, position=1)
+        assert copied.status == "done"
+        assert list(copied.comments.values_list("content", flat=True)) == ["Halfway there"]
+
+    def test_query_count_does_not_grow_with_chart_size(self, user, harada_chart, pillars, tasks):
+        """Cloning runs the same number of statements for 8 or 64 tasks."""
+        small = HaradaChart.objects.create(
+            user=user, title="Small", core_goal="Goal", target_date="2026-12-31"
+        )
+        pillar = Pillar.objects.create(chart=small, name="Only", position=1)
+        for i in range(1, 9):
+            Task.objects.create(chart=small, pillar=pillar, title=f"T{i}", position=i)
+
+        with CaptureQueriesContext(connection) as small_queries:
+            clone_chart(small)
+        with CaptureQueriesContext(connection) as large_queries:
+            clone_chart(harada_chart)
+
+        assert len(large_queries) == len(small_queries)
+
+    def test_pillar_added_while_copying_is_left_out(self, user, harada_chart, pillars, tasks):
+        """A pillar and task created between the pillar and task reads do not break the copy."""
+        added = []
+
+        def concurrent_edit(execute, sql, params, many, context):
+            # Lands after the pillars were read, before the tasks are
+            if sql.startswith('SELECT') and 'FROM "charts_task"' in sql and not added:
+                added.append(True)
+                pillar = Pillar.objects.create(chart=harada_chart, name="Late", position=9)
+                Task.objects.create(chart=harada_chart, pillar=pillar, title="Late", position=1)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(concurrent_edit):
+            copy = clone_chart(harada_chart, include_comments=True)
+
+        assert added
+        assert copy.pillar_set.count() == 8
+        assert copy.task_set.count() == 64
+
+    def test_copies_are_searchable(self, user, harada_chart, tasks):
+        """Bulk-created copies are added to the search index."""
+        copy = clone_chart(harada_chart)
+
+        chart_ids = {r["chart_id"] for r in search(user, "marketing task")}
+        assert chart_ids == {harada_chart.id, copy.id}
+
+    def test_duplicate_view(self, client, user, harada_chart, tasks):
+        """The dashboard action duplicates the chart and opens the copy."""
+        client.force_login(user)
+
+        response = client.post(
+            reverse("accounts:duplicate_chart", args=[harada_chart.id]),
+            {"title": "Next year"},
+        )
+
+        copy = HaradaChart.objects.get(title="Next year")
+        assert response.status_code == 302
+        assert response.url == reverse("matrix_view", args=[copy.id])
+        assert copy.task_set.count() == 64
+
+    @pytest.mark.parametrize("target_date", ["next year", "2026-02-30"])
+    def test_duplicate_view_rejects_invalid_dates(self, client, user, harada_chart, target_date):
+        """A bad target date is a 400, not a 500, and copies nothing."""
+        client.force_login(user)
+
+        response = client.post(
+            reverse("accounts:duplicate_chart", args=[harada_chart.id]),
+            {"target_date": target_date},
+        )
+
+        assert response.status_code == 400
+        assert HaradaChart.objects.count() == 1
@@ -0,0 +1,119 @@
+import datetime
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from charts.deletion import CHART_TABLES, delete_account, delete_charts
+from charts.models import ChartShareLink, HaradaChart, Pillar, SearchDocument, Task, TaskComment
+from charts.services import record_status_change, toggle_check_in
+from config import generations
+
+
+def _make_chart(user, title="Other chart", pillars=8, tasks_per_pillar=8):
+    chart = HaradaChart.objects.create(user=user, title=title, core_goal=title, target_date="2026-12-31")
+    for p in range(1, pillars + 1):
+        pillar = Pillar.objects.create(chart=chart, name=f"Pillar {p}", position=p)
+        for t in range(1, tasks_per_pillar + 1):
+            Task.objects.create(chart=chart, pillar=pillar, title=f"Task {p}.{t}", position=t)
+    return chart
+
+
+@pytest.fixture
+def busy_chart(user, harada_chart, pillars, tasks):
+    """The 8x8 test chart with rows in every dependent table."""
+    for task in tasks[:3]:
+        TaskComment.objects.create(task=task, user=user, content="Progress note")
+        task.status = "done"
+        task.save()
+        record_status_change(task, "todo")
+        toggle_check_in(task, datetime.date(2026, 3, 1))
+    ChartShareLink.objects.create(chart=harada_chart)
+    return harada_chart
+
+
+def _rows(chart_id):
+    return {
+        model.__name__: model._base_manager.filter(**{f"{prefix}id": chart_id}).count()
+        for model, prefix in CHART_TABLES
+    }
+
+
+@pytest.mark.django_db
+class TestDeleteCharts:
+    def test_removes_every_dependent_row(self, user, busy_chart):
+        other = _make_chart(user, pillars=1, tasks_per_pillar=2)
+        assert all(_rows(busy_chart.id).values())
+
+        deleted = delete_charts([busy_chart.id])
+
+        assert not any(_rows(busy_chart.id).values())
+        assert deleted > 64
+        assert Task.objects.filter(chart=other).count() == 2
+        assert SearchDocument.objects.filter(chart=other).exists()
+
+    def test_query_count_does_not_grow_with_the_chart(self, user, busy_chart):
+        small = _make_chart(user, pillars=1, tasks_per_pillar=1)
+        TaskComment.objects.create(task=small.task_set.get(), user=user, content="Note")
+
+        with CaptureQueriesContext(connection) as big_run:
+            delete_charts([busy_chart.id], chunk_size=1000)
+        with CaptureQueriesContext(connection) as small_run:
+            delete_charts([small.id], chunk_size=1000)
+
+        big_deletes = [q for q in big_run.captured_queries if q["sql"].startswith("DELETE")]
+        small_deletes = [q for q in small_run.captured_queries if q["sql"].startswith("DELETE")]
+        # One statement per non-empty table, however many rows it holds
+        assert len(big_deletes) == 9
+        assert len(small_deletes) == 5  # search, comments, tasks, pillars, chart
+
+    def test_deletes_in_chunks_and_reports_progress(self, busy_chart):
+        calls = []
+
+        with CaptureQueriesContext(connection) as run:
+            delete_charts([busy_chart.id], chunk_size=10, progress=lambda done, total: calls.append((done, total)))
+
+        total = calls[0][1]
+        assert calls[0] == (0, total)
+        assert calls[-1] == (total, total)
+        assert [done for done, _ in calls] == sorted(done for done, _ in calls)
+        task_deletes = [q for q in run.captured_queries if q["sql"].startswith('DELETE FROM "charts_task"')]
+        assert len(task_deletes) == 7  # 64 tasks, 10 at a time
+
+    def test_an_interrupted_run_can_be_resumed(self, busy_chart):
+        def interrupt(done, total):
+            if done >= 60:
+                raise ConnectionError("worker killed")
+
+        with pytest.raises(ConnectionError):
+            delete_charts([busy_chart.id], chunk_size=20, progress=interrupt)
+        assert HaradaChart.objects.filter(id=busy_chart.id).exists()
+
+        delete_charts([busy_chart.id], chunk_size=20)
+
+        assert not any(_rows(busy_chart.id).values())
+
+    def test_bumps_the_chart_cache_generation(self, harada_chart):
+        namespace = generations.chart_namespace(harada_chart.id)
+        before = generations.generation(namespace)
+
+        delete_charts([harada_chart.id])
+
+        assert generations.generation(namespace) > before
+
+
+@pytest.mark.django_db
+def test_delete_account_removes_the_user_and_all_charts(user, busy_chart):
+    second = _make_chart(user, pillars=2, tasks_per_pillar=3)
+    stranger = User.objects.create_user("stranger", password="x")
+    kept = _make_chart(stranger)
+    calls = []
+
+    delete_account(user.id, chunk_size=25, progress=lambda done, total: calls.append(done))
+
+    assert not User.objects.filter(id=user.id).exists()
+    assert not any(_rows(busy_chart.id).values())
+    assert not any(_rows(second.id).values())
+    assert Task.objects.filter(chart=kept).count() == 64
+    assert calls[-1] > 64
@@ -27,6 +27,19 @@ class TestHaradaChartModel:
 
         assert harada_chart.completion_percentage == 50
 
+    def test_saving_a_stale_instance_does_not_rewind_the_version(self, harada_chart, pillars):
+        """A chart loaded before a task save still moves the version forward."""
+        stale = HaradaChart.objects.get(id=harada_chart.id)
+        Task.objects.create(chart=harada_chart, pillar=pillars[0], title="New", position=1)
+        bumped = HaradaChart.objects.get(id=harada_chart.id).version
+
+        stale.title = "Renamed"
+        stale.save()
+
+        assert stale.version == bumped + 1
+        stale.save(update_fields=["title"])
+        assert HaradaChart.objects.get(id=harada_chart.id).version == bumped + 2
+
     def test_completion_percentage_all_done(self, harada_chart, tasks):
         """Test completion percentage when all tasks are done."""
         for task in tasks:
@@ -0,0 +1,71 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from charts.models import RoutineCheckIn
+from charts.services import checked_in_task_ids, routine_stats, toggle_check_in
+
+
+@pytest.mark.django_db
+class TestRoutineCheckIns:
+    """Test bit-packed routine check-ins and streak computation."""
+
+    def test_toggle_check_in_uses_one_row_per_year(self, tasks):
+        """Check-ins for a whole year share one bitmap row."""
+        task = tasks[0]
+        for day in range(1, 11):
+            assert toggle_check_in(task, datetime.date(2026, 1, day)) is True
+
+        assert RoutineCheckIn.objects.filter(task=task).count() == 1
+        assert toggle_check_in(task, datetime.date(2026, 1, 5)) is False
+        assert RoutineCheckIn.objects.get(task=task).bits.bit_count() == 9
+
+    def test_streaks_across_new_year(self, tasks):
+        """Runs spanning December 31st are counted as one streak."""
+        task = tasks[0]
+        for offset in range(10):
+            toggle_check_in(task, datetime.date(2025, 12, 27) + datetime.timedelta(days=offset))
+        toggle_check_in(task, datetime.date(2026, 1, 10))
+
+        stats = routine_stats(task, datetime.date(2026, 1, 10))
+        assert stats.current_streak == 1
+        assert stats.longest_streak == 10
+        assert stats.total == 11
+
+    def test_streak_survives_until_end_of_day(self, tasks):
+        """A streak that is not yet extended today still counts."""
+        task = tasks[0]
+        for day in range(1, 6):
+            toggle_check_in(task, datetime.date(2026, 3, day))
+
+        stats = routine_stats(task, datetime.date(2026, 3, 6))
+        assert stats.current_streak == 5
+        assert stats.consistency == round(5 * 100 / 30)
+
+        assert routine_stats(task, datetime.date(2026, 3, 7)).current_streak == 0
+
+    def test_no_check_ins(self, tasks):
+        """Tasks without check-ins report zeros."""
+        stats = routine_stats(tasks[0], datetime.date(2026, 3, 6))
+        assert (stats.current_streak, stats.longest_streak, stats.total) == (0, 0, 0)
+
+    def test_check_in_endpoint_toggles_today(self, client, user, harada_chart, tasks):
+        """The HTMX toggle flips today's check-in and re-renders the cell."""
+        client.force_login(user)
+        task = next(t for t in tasks if t.frequency == "routine")
+
+        response = client.post(reverse("task_check_in", args=[harada_chart.id, task.id]))
+        assert response.status_code == 200
+        assert f'id="task-cell-{task.id}"' in response.content.decode()
+        assert "Checked in today" in response.content.decode()
+        assert checked_in_task_ids([task], timezone.localdate()) == {task.id}
+
+    def test_check_in_endpoint_rejects_one_time_tasks(self, client, user, harada_chart, tasks):
+        """Only routine tasks can be checked in."""
+        client.force_login(user)
+        task = next(t for t in tasks if t.frequency == "one_time")
+
+        response = client.post(reverse("task_check_in", args=[harada_chart.id, task.id]))
+        assert response.status_code == 404
@@ -0,0 +1,88 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from charts.models import HaradaChart, SearchDocument, TaskComment
+from charts.search import search
+
+
+@pytest.mark.django_db
+class TestSearchIndex:
+    """Test that the search index follows model writes."""
+
+    def test_objects_are_indexed_on_save(self, harada_chart, pillars, tasks):
+        """Charts, pillars and tasks get one document each."""
+        assert SearchDocument.objects.filter(kind="chart").count() == 1
+        assert SearchDocument.objects.filter(kind="pillar").count() == 8
+        assert SearchDocument.objects.filter(kind="task").count() == 64
+
+    def test_updates_and_deletes_follow_the_model(self, user, tasks):
+        """Renamed tasks are found by their new title, deleted ones disappear."""
+        task = tasks[0]
+        task.title = "Practice calligraphy daily"
+        task.save()
+
+        results = search(user, "calligraphy")
+        assert [(r["kind"], r["object_id"]) for r in results] == [("task", task.id)]
+
+        task.delete()
+        assert search(user, "calligraphy") == []
+
+    def test_comments_are_searchable(self, user, tasks):
+        """Comment bodies are indexed and returned with a highlighted snippet."""
+        comment = TaskComment.objects.create(
+            task=tasks[0], user=user, content="Booked the marathon for April"
+        )
+
+        results = search(user, "marath")
+        assert len(results) == 1
+        assert results[0]["kind"] == "comment"
+        assert results[0]["object_id"] == comment.id
+        assert "<mark>marathon</mark>" in results[0]["snippet"]
+
+
+@pytest.mark.django_db
+class TestSearch:
+    """Test ranking, highlighting and isolation of search results."""
+
+    def test_title_matches_rank_first(self, user, harada_chart, tasks):
+        """A title hit outranks a description hit."""
+        tasks[0].description = "Read about finance basics"
+        tasks[0].save()
+
+        results = search(user, "finance")
+        assert results[0]["kind"] == "pillar"
+        assert "<mark>Finance</mark>" in results[0]["title"]
+
+    def test_results_are_escaped(self, user, tasks):
+        """User text is HTML-escaped around the highlight tags."""
+        tasks[0].title = "<b>bold</b> plans"
+        tasks[0].save()
+
+        results = search(user, "plans")
+        assert results[0]["title"] == "&lt;b&gt;bold&lt;/b&gt; <mark>plans</mark>"
+
+    def test_other_users_charts_are_excluded(self, user, tasks):
+        """Only the searching user's charts are returned."""
+        other = User.objects.create_user(username="other", password="pass123")
+        HaradaChart.objects.create(
+            user=other, title="Finance goals", core_goal="Save", target_date="2026-12-31"
+        )
+
+        assert all(r["chart_id"] == tasks[0].chart_id for r in search(user, "finance"))
+        assert [r["kind"] for r in search(other, "finance")] == ["chart"]
+
+    def test_punctuation_only_query(self, user, tasks):
+        """Queries without any word characters return nothing."""
+        assert search(user, '"*:()') == []
+
+    def test_search_view(self, client, user, tasks):
+        """The search page and its HTMX partial render results."""
+        client.force_login(user)
+
+        response = client.get(reverse("search"), {"q": "marketing"})
+        assert response.status_code == 200
+        assert "<mark>Marketing</mark>" in response.content.decode()
+
+        response = client.get(reverse("search"), {"q": "marketing"}, HTTP_HX_REQUEST="true")
+        assert "<html" not in response.content.decode()
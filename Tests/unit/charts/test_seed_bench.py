@@ -0,0 +1,51 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from charts.models import HaradaChart, Pillar, SearchDocument, Task
+
+
+def _seed(**options):
+    call_command("seed_bench", stdout=StringIO(), **options)
+    return list(Task.objects.order_by("id").values_list("title", "status", "frequency"))
+
+
+@pytest.mark.django_db
+class TestSeedBench:
+    """Test the synthetic benchmark dataset generator."""
+
+    def test_generates_requested_volumes(self):
+        """Every chart gets 8 pillars and 64 tasks, all indexed for search."""
+        _seed(users=3, charts=2, comments=0, chunk_size=100)
+
+        assert User.objects.filter(username__startswith="loadtest_").count() == 3
+        assert HaradaChart.objects.count() == 6
+        assert Pillar.objects.count() == 48
+        assert Task.objects.count() == 384
+        assert SearchDocument.objects.filter(kind="task").count() == 384
+        assert set(Task.objects.values_list("status", flat=True)) <= {"todo", "in_progress", "done"}
+
+    def test_same_seed_gives_same_dataset(self):
+        """Re-seeding with --flush and the same seed reproduces the data."""
+        first = _seed(users=2, charts=1, comments=1)
+        second = _seed(users=2, charts=1, comments=1, flush=True)
+
+        assert first == second
+        assert _seed(users=2, charts=1, comments=1, flush=True, seed=7) != first
+
+    def test_flush_deletes_in_chunks(self):
+        """--flush empties the old dataset with chunked raw DELETEs, not the cascade collector."""
+        _seed(users=3, charts=2, comments=1, chunk_size=100)
+
+        with CaptureQueriesContext(connection) as run:
+            call_command("seed_bench", users=0, flush=True, chunk_size=100, stdout=StringIO())
+
+        assert not User.objects.filter(username__startswith="loadtest_").exists()
+        assert not Task.objects.exists() and not SearchDocument.objects.exists()
+        task_deletes = [q for q in run.captured_queries if q["sql"].startswith('DELETE FROM "charts_task" ')]
+        assert len(task_deletes) >= 384 // 100
+        assert not [q for q in run.captured_queries if q["sql"].startswith('SELECT "charts_task"."id", "charts_task"."chart_id"')]
@@ -0,0 +1,173 @@
+import datetime
+import json
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from charts.models import ChartProgressDaily, TaskStatusEvent
+from charts.services import clone_chart, record_status_change, save_chart_tasks
+from matrix.services import build_progress_series
+
+
+@pytest.mark.django_db
+class TestStatusHistory:
+    """Test status change events and their daily rollups."""
+
+    def test_task_update_records_event_and_seeds_rollup(
+        self, client, user, harada_chart, pillars, tasks
+    ):
+        """The first transition of the day seeds one row per pillar."""
+        client.force_login(user)
+        task = tasks[0]
+
+        response = client.post(
+            reverse("task_update", args=[harada_chart.id, task.id]),
+            {"status": "done"},
+        )
+        assert response.status_code == 200
+
+        event = TaskStatusEvent.objects.get(task=task)
+        assert (event.from_status, event.to_status) == ("todo", "done")
+
+        rows = ChartProgressDaily.objects.filter(chart=harada_chart)
+        assert rows.count() == 8
+        row = rows.get(pillar=task.pillar)
+        assert (row.todo_count, row.in_progress_count, row.done_count) == (7, 0, 1)
+
+    def test_later_transitions_apply_deltas(self, harada_chart, pillars, tasks):
+        """Subsequent transitions on the same day update the existing row."""
+        task = tasks[0]
+        for from_status, to_status in [("todo", "in_progress"), ("in_progress", "done")]:
+            task.status = to_status
+            task.save()
+            record_status_change(task, from_status)
+
+        row = ChartProgressDaily.objects.get(chart=harada_chart, pillar=task.pillar)
+        assert (row.todo_count, row.in_progress_count, row.done_count) == (7, 0, 1)
+        assert TaskStatusEvent.objects.filter(task=task).count() == 2
+
+    def test_unchanged_status_is_not_recorded(self, client, user, harada_chart, tasks):
+        """Saving a task without changing its status writes no event."""
+        client.force_login(user)
+        task = tasks[0]
+
+        client.post(
+            reverse("task_update", args=[harada_chart.id, task.id]),
+            {"title": "Renamed"},
+        )
+
+        assert not TaskStatusEvent.objects.exists()
+        assert not ChartProgressDaily.objects.exists()
+
+    def test_bulk_task_saves_resync_the_rollup(self, client, user, harada_chart, pillars, tasks):
+        """Wizard step 3 resets tasks to todo without events; today's row follows."""
+        client.force_login(user)
+        task = tasks[0]
+        client.post(reverse("task_update", args=[harada_chart.id, task.id]), {"status": "done"})
+
+        save_chart_tasks(harada_chart, {(task.pillar_id, task.position): "Again"})
+        client.post(reverse("task_update", args=[harada_chart.id, task.id]), {"status": "in_progress"})
+
+        row = ChartProgressDaily.objects.get(chart=harada_chart, pillar=task.pillar)
+        assert (row.todo_count, row.in_progress_count, row.done_count) == (7, 1, 0)
+        reset = TaskStatusEvent.objects.get(task=task, from_status="done")
+        assert reset.to_status == "todo"
+
+    def test_racing_first_transition_is_not_lost(self, harada_chart, pillars, tasks):
+        """A row seeded by a concurrent transition after our UPDATE missed still gets our delta."""
+        task = tasks[0]
+        seeded = []
+
+        def other_transaction_seeds(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            if sql.startswith('UPDATE "charts_chartprogressdaily"') and not seeded:
+                seeded.append(True)
+                # From counts that did not include our transition
+                ChartProgressDaily.objects.create(
+                    chart=harada_chart, pillar=task.pillar, date=timezone.localdate(), todo_count=8
+                )
+            return result
+
+        task.status = "done"
+        task.save()
+        with connection.execute_wrapper(other_transaction_seeds):
+            record_status_change(task, "todo")
+
+        row = ChartProgressDaily.objects.get(chart=harada_chart, pillar=task.pillar)
+        assert (row.todo_count, row.done_count) == (7, 1)
+
+    def test_copies_start_their_history(self, harada_chart, pillars, tasks):
+        """Cloned tasks get creation events and today's rows, like tasks created one by one."""
+        copy = clone_chart(harada_chart)
+
+        events = TaskStatusEvent.objects.filter(chart=copy)
+        assert events.count() == 64
+        assert set(events.values_list("from_status", "to_status")) == {("", "todo")}
+        assert ChartProgressDaily.objects.filter(chart=copy, todo_count=8).count() == 8
+
+    def test_ai_import_records_creation_events(self, client, user, harada_chart, pillars, tasks):
+        """Imported tasks are logged, and today's rows count them."""
+        client.force_login(user)
+        ai_json = json.dumps({
+            "pillars": [
+                {"pillar_name": f"Pillar {p}", "tasks": [f"Task {p}.{t}" for t in range(1, 9)]}
+                for p in range(1, 9)
+            ],
+        })
+
+        client.post(reverse("ai_inspiration", args=[harada_chart.id]), {"json_input": ai_json})
+
+        assert TaskStatusEvent.objects.filter(chart=harada_chart, to_status="todo").count() == 64
+        rows = ChartProgressDaily.objects.filter(chart=harada_chart)
+        assert sorted(rows.values_list("todo_count", flat=True)) == [8] * 8
+
+    def test_drifted_rows_never_go_negative(self, client, user, harada_chart, pillars, tasks):
+        """A row that drifted to zero is clamped instead of failing the update."""
+        client.force_login(user)
+        task = tasks[0]
+        client.post(reverse("task_update", args=[harada_chart.id, task.id]), {"status": "done"})
+        ChartProgressDaily.objects.filter(pillar=task.pillar).update(done_count=0)
+
+        response = client.post(reverse("task_update", args=[harada_chart.id, task.id]), {"status": "todo"})
+
+        assert response.status_code == 200
+        assert ChartProgressDaily.objects.get(pillar=task.pillar).done_count == 0
+
+
+@pytest.mark.django_db
+class TestProgressSeries:
+    """Test the progress-over-time series built from the rollups."""
+
+    def test_missing_pillar_days_carry_forward(self, harada_chart, pillars):
+        """A pillar without a row on a day keeps its previous counts."""
+        day1 = datetime.date(2026, 3, 1)
+        day2 = datetime.date(2026, 3, 2)
+        ChartProgressDaily.objects.create(
+            chart=harada_chart, pillar=pillars[0], date=day1, todo_count=8
+        )
+        ChartProgressDaily.objects.create(
+            chart=harada_chart, pillar=pillars[1], date=day1, todo_count=8
+        )
+        ChartProgressDaily.objects.create(
+            chart=harada_chart, pillar=pillars[1], date=day2, todo_count=4, done_count=4
+        )
+
+        series = build_progress_series(harada_chart)
+
+        assert [p["date"] for p in series] == [day1, day2]
+        assert series[0]["done_pct"] == 0
+        assert (series[1]["todo"], series[1]["done"], series[1]["done_pct"]) == (12, 4, 25)
+
+    def test_progress_view_renders(self, client, user, harada_chart, pillars, tasks):
+        """The progress page lists one bar per recorded day."""
+        client.force_login(user)
+        task = tasks[0]
+        task.status = "done"
+        task.save()
+        record_status_change(task, "todo")
+
+        response = client.get(reverse("progress_view", args=[harada_chart.id]))
+        assert response.status_code == 200
+        assert "Progress over time" in response.content.decode()
@@ -0,0 +1,98 @@
+import jwt
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+
+from charts.models import ChartShareLink
+
+
+@pytest.mark.django_db
+class TestShareLinks:
+    """Test revocable public share links for a chart."""
+
+    def test_owner_creates_and_revokes_links(self, client, user, harada_chart):
+        """The share modal creates links and revokes them."""
+        client.force_login(user)
+
+        response = client.post(reverse("share_create", args=[harada_chart.id]))
+        assert response.status_code == 200
+        link = ChartShareLink.objects.get(chart=harada_chart)
+        assert link.token in response.content.decode()
+
+        response = client.post(reverse("share_revoke", args=[harada_chart.id, link.id]))
+        link.refresh_from_db()
+        assert link.revoked_at is not None
+        assert link.token not in response.content.decode()
+
+    def test_other_users_cannot_create_links(self, client, harada_chart):
+        """Share management requires owning the chart."""
+        other = User.objects.create_user(username="other", password="pass123")
+        client.force_login(other)
+
+        response = client.post(reverse("share_create", args=[harada_chart.id]))
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestSharedChartView:
+    """Test the anonymous, cacheable read-only matrix."""
+
+    def test_anonymous_view_is_cacheable(self, client, harada_chart, pillars, tasks):
+        """The page renders without cookies and with public cache headers."""
+        link = ChartShareLink.objects.create(chart=harada_chart)
+
+        response = client.get(reverse("shared_chart_view", args=[link.token]))
+
+        assert response.status_code == 200
+        assert pillars[0].name in response.content.decode()
+        assert "public" in response["Cache-Control"]
+        assert "max-age=" in response["Cache-Control"]
+        assert response["ETag"]
+        assert "Cookie" not in response.get("Vary", "")
+        assert not response.cookies
+
+    def test_session_cookies_are_ignored(self, client, user, harada_chart, tasks, django_assert_num_queries):
+        """Logged-in visitors get the same bytes; Clerk user sync is skipped."""
+        link = ChartShareLink.objects.create(chart=harada_chart)
+        client.force_login(user)
+        client.cookies["__session"] = jwt.encode({"sub": "clerk_user"}, "k" * 32, algorithm="HS256")
+        url = reverse("shared_chart_view", args=[link.token])
+        etag = client.get(url)["ETag"]
+
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert "Cookie" not in response.get("Vary", "")
+
+    def test_etag_changes_when_a_task_changes(self, client, harada_chart, tasks):
+        """Editing a task invalidates the ETag."""
+        link = ChartShareLink.objects.create(chart=harada_chart)
+        url = reverse("shared_chart_view", args=[link.token])
+        etag = client.get(url)["ETag"]
+
+        tasks[0].status = "done"
+        tasks[0].save()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_etag_changes_when_the_chart_is_edited(self, client, user, harada_chart, tasks):
+        """Wizard step 1 edits of an instance loaded earlier still move the ETag forward."""
+        link = ChartShareLink.objects.create(chart=harada_chart)
+        url = reverse("shared_chart_view", args=[link.token])
+        etag = client.get(url)["ETag"]
+        client.force_login(user)
+
+        client.post(reverse("wizard_step1", args=[harada_chart.id]), {"title": "Renamed"})
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_revoked_link_is_not_found(self, client, harada_chart):
+        """Revoked tokens stop working."""
+        link = ChartShareLink.objects.create(chart=harada_chart, revoked_at=timezone.now())
+
+        response = client.get(reverse("shared_chart_view", args=[link.token]))
+        assert response.status_code == 404
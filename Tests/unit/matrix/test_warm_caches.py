@@ -0,0 +1,47 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+
+from matrix.services import snapshot_key
+
+
+@pytest.mark.django_db
+class TestWarmCaches:
+    """Test the post-deploy cache warm-up command."""
+
+    def test_warms_active_charts_and_public_pages(self, client, user, harada_chart, tasks):
+        """Active charts get a snapshot and public pages are pre-rendered."""
+        out = StringIO()
+
+        call_command("warm_caches", stdout=out)
+
+        snapshot = cache.get(snapshot_key(harada_chart.id))
+        assert len(snapshot.pillars) == 8
+        assert snapshot.completion_percentage == 0
+        assert "Warmed 1 chart snapshots and 6 public pages" in out.getvalue()
+
+        response = client.get(reverse("home"))
+        assert response.status_code == 200
+        assert not response.templates
+
+    def test_matrix_view_uses_warm_snapshot(
+        self, client, user, harada_chart, tasks, django_assert_max_num_queries
+    ):
+        """With a warm snapshot the matrix page skips pillar and task queries."""
+        call_command("warm_caches", stdout=StringIO())
+        client.force_login(user)
+
+        # session, user, chart and check-ins
+        with django_assert_max_num_queries(4):
+            response = client.get(reverse("matrix_view", args=[harada_chart.id]))
+        assert response.status_code == 200
+        assert tasks[0].title in response.content.decode()
+
+    def test_inactive_charts_are_skipped(self, harada_chart):
+        """Charts without recent task activity are left cold."""
+        call_command("warm_caches", stdout=StringIO())
+
+        assert cache.get(snapshot_key(harada_chart.id)) is None
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+from django.urls import reverse
+
+from charts.models import ChartShareLink, HaradaChart, Pillar, Task, TaskComment
+from config.budgets import BUDGETS
+from config.instrumentation import record_queries
+
+
+def _step3_post(pillars):
+    return {
+        f"pillar_{pillar.position}_task_{i}": f"{pillar.name} task {i}"
+        for pillar in pillars
+        for i in range(1, 9)
+    }
+
+
+# url name -> (method, url args, POST data), built from the `full_chart` fixture
+ENDPOINTS = {
+    "home": lambda f: ("get", [], None),
+    "sign_in": lambda f: ("get", [], None),
+    "dashboard": lambda f: ("get", [], None),
+    "search": lambda f: ("get", [], {"q": "task"}),
+    "matrix_view": lambda f: ("get", [f.chart.id], None),
+    "progress_view": lambda f: ("get", [f.chart.id], None),
+    "task_modal": lambda f: ("get", [f.chart.id, f.task.id], None),
+    "task_update": lambda f: ("post", [f.chart.id, f.task.id], {"status": "done"}),
+    "task_check_in": lambda f: ("post", [f.chart.id, f.routine_task.id], {}),
+    "task_comment_create": lambda f: ("post", [f.chart.id, f.task.id], {"content": "Went well"}),
+    "task_create_modal": lambda f: ("get", [f.chart.id, f.pillar.id, 1], None),
+    "task_create": lambda f: ("post", [f.chart.id, f.pillar.id, 1], {"title": "Replacement"}),
+    "pillar_modal": lambda f: ("get", [f.chart.id, f.pillar.id], None),
+    "pillar_update": lambda f: ("post", [f.chart.id, f.pillar.id], {"name": "Renamed"}),
+    "share_modal": lambda f: ("get", [f.chart.id], None),
+    "share_create": lambda f: ("post", [f.chart.id], {}),
+    "share_revoke": lambda f: ("post", [f.chart.id, f.share_link.id], {}),
+    "shared_chart_view": lambda f: ("get", [f.share_link.token], None),
+    "accounts:duplicate_chart": lambda f: ("post", [f.chart.id], {"include_comments": "on"}),
+    "accounts:delete_chart": lambda f: ("post", [f.chart.id], {}),
+    "wizard_start": lambda f: ("get", [], None),
+    "wizard_step1": lambda f: ("get", [f.chart.id], None),
+    "wizard_step2": lambda f: ("get", [f.chart.id], None),
+    "wizard_step3": lambda f: ("post", [f.chart.id], _step3_post(f.pillars)),
+    "wizard_step3_pillar": lambda f: ("get", [f.chart.id, f.pillar.id], None),
+}
+
+
+class FullChart:
+    def __init__(self, chart, pillars, tasks, share_link):
+        self.chart = chart
+        self.pillars = pillars
+        self.pillar = pillars[0]
+        self.task = tasks[1]
+        self.routine_task = next(t for t in tasks if t.frequency == "routine")
+        self.share_link = share_link
+
+
+@pytest.fixture
+def full_chart(user, harada_chart, pillars, tasks):
+    """A complete 8x8 chart with a few comments per task and a share link.
+
+    The user also owns a few small finished charts, so per-chart queries on
+    list pages (e.g. the dashboard's completion badges) exceed the budget.
+    """
+    TaskComment.objects.bulk_create(
+        TaskComment(task=task, user=user, content=f"Note {n}") for task in tasks for n in range(3)
+    )
+    for n in range(4):
+        other = HaradaChart.objects.create(
+            user=user, title=f"Finished {n}", core_goal="Done", target_date="2026-12-31", is_draft=False
+        )
+        pillar = Pillar.objects.create(chart=other, name="Only", position=1)
+        Task.objects.bulk_create(
+            Task(chart=other, pillar=pillar, title=f"Step {i}", position=i, status="done" if i <= n else "todo")
+            for i in range(1, 5)
+        )
+    share_link = ChartShareLink.objects.create(chart=harada_chart)
+    return FullChart(harada_chart, pillars, tasks, share_link)
+
+
+def _request(client, url_name, full_chart):
+    method, args, data = ENDPOINTS[url_name](full_chart)
+    url = reverse(url_name, args=args)
+    started = time.perf_counter()
+    with record_queries() as log:
+        response = getattr(client, method)(url, data or {})
+    return response, log, (time.perf_counter() - started) * 1000
+
+
+def test_every_budget_has_an_endpoint():
+    assert set(BUDGETS) == set(ENDPOINTS)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", sorted(ENDPOINTS))
+def test_endpoint_within_budget(client, user, full_chart, url_name):
+    client.force_login(user)
+    budget = BUDGETS[url_name]
+
+    response, log, elapsed_ms = _request(client, url_name, full_chart)
+
+    assert response.status_code < 400, f"{url_name} returned {response.status_code}"
+    assert len(log) <= budget.queries, (
+        f"{url_name} ran {len(log)} queries, budget is {budget.queries}:\n{log.report()}"
+    )
+    assert elapsed_ms <= budget.ms, (
+        f"{url_name} took {elapsed_ms:.0f}ms, budget is {budget.ms:.0f}ms:\n{log.report()}"
+    )
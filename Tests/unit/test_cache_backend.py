@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import caches
+from django.test import override_settings
+
+
+TWO_TIER_CACHES = {
+    "default": {
+        "BACKEND": "config.cache_backends.TwoTierCache",
+        "LOCATION": "shared",
+        "OPTIONS": {"LOCAL_MAX_ENTRIES": 2, "LOCAL_TIMEOUT": 60},
+    },
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@pytest.fixture
+def two_tier():
+    with override_settings(CACHES=TWO_TIER_CACHES):
+        cache = caches["default"]
+        cache.clear()
+        yield cache
+
+
+class TestTwoTierCache:
+    """Test the in-process LRU in front of the shared cache."""
+
+    def test_reads_fill_local_tier_and_count_by_prefix(self, two_tier):
+        """A shared hit is copied locally; later reads never leave the process."""
+        two_tier.shared.set("chart:1", "snapshot")
+
+        assert two_tier.get("chart:1") == "snapshot"
+        two_tier.shared.delete("chart:1")
+        assert two_tier.get("chart:1") == "snapshot"
+        assert two_tier.get("chart:2") is None
+
+        assert two_tier.stats()["chart"] == {"shared_hits": 1, "local_hits": 1, "misses": 1}
+
+    def test_local_tier_is_bounded_lru(self, two_tier):
+        """The least recently used entry is evicted once the LRU is full."""
+        for key in ("a", "b"):
+            two_tier.set(key, key)
+        two_tier.get("a")
+        two_tier.set("c", "c")
+        two_tier.shared.clear()
+
+        assert two_tier.get("a") == "a"
+        assert two_tier.get("b") is None
+
+    def test_local_copies_are_isolated(self, two_tier):
+        """Mutating a returned value does not change the cached one."""
+        two_tier.set("k", {"n": 1})
+        two_tier.get("k")["n"] = 2
+
+        assert two_tier.get("k") == {"n": 1}
+
+    def test_get_or_set_is_single_flight(self, two_tier):
+        """Concurrent callers share one computation."""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(two_tier.get_or_set("slow", compute)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["value"] * 5
+        assert len(calls) == 1
+
+    def test_get_or_set_waits_for_other_process(self, two_tier):
+        """While another worker holds the lock, its result is reused."""
+        two_tier.shared.add("slow:lock", 1)
+        timer = threading.Timer(0.05, lambda: two_tier.shared.set("slow", "theirs"))
+        timer.start()
+
+        assert two_tier.get_or_set("slow", lambda: "ours") == "theirs"
+        timer.join()
+
+    def test_incr_goes_to_shared_tier(self, two_tier):
+        """A stale local copy is neither read nor kept by incr/decr."""
+        two_tier.set("hits", 1)
+        two_tier.shared.set("hits", 10)  # another worker counted meanwhile
+
+        assert two_tier.incr("hits") == 11
+        assert two_tier.decr("hits", 2) == 9
+        assert two_tier.get("hits") == 9
+        with pytest.raises(ValueError):
+            two_tier.incr("missing")
+
+    def test_stats_survive_concurrent_counting(self, two_tier):
+        """Counting from many threads loses no hits."""
+        def read():
+            for _ in range(2000):
+                two_tier.get("chart:missing")
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert two_tier.stats()["chart"]["misses"] == 8000
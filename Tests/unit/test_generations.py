@@ -0,0 +1,97 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+from config import generations
+from config.generations import GenerationTable
+
+
+def _bump_in_child(path, namespace):
+    GenerationTable(path).bump(namespace)
+
+
+class TestGenerationTable:
+    """Test the shared-memory generation counters."""
+
+    def test_bump_is_visible_to_other_processes(self, tmp_path):
+        """A bump in another process changes what this one reads."""
+        path = tmp_path / "generations"
+        table = GenerationTable(path)
+        before = table.get("chart:1")
+
+        child = multiprocessing.get_context("fork").Process(
+            target=_bump_in_child, args=(str(path), "chart:1")
+        )
+        child.start()
+        child.join()
+
+        assert table.get("chart:1") == before + 1
+
+    def test_threads_do_not_lose_bumps(self, tmp_path, monkeypatch):
+        """Concurrent bumps from threads of one process all count."""
+        table = GenerationTable(tmp_path / "generations")
+        table.get("chart:1")  # map the table before slowing reads down
+        slot = generations._SLOT
+
+        class SlowSlot:
+            """Yields to other threads between reading a counter and writing it back."""
+
+            size = slot.size
+            pack_into = slot.pack_into
+
+            def unpack_from(self, buffer, offset):
+                value = slot.unpack_from(buffer, offset)
+                time.sleep(0.001)
+                return value
+
+        monkeypatch.setattr(generations, "_SLOT", SlowSlot())
+        threads = [
+            threading.Thread(target=lambda: [table.bump("chart:1") for _ in range(25)])
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert table.get("chart:1") == 100
+
+    def test_suite_uses_a_temporary_table(self, tmp_path_factory):
+        """Tests never bump the production table."""
+        assert generations.get_table().path.startswith(str(tmp_path_factory.getbasetemp()))
+
+    def test_namespaced_key_changes_on_bump(self, tmp_path):
+        """Keys built before a bump no longer match afterwards."""
+        with override_settings(CACHE_GENERATIONS_PATH=str(tmp_path / "generations")):
+            key = generations.namespaced_key("chart:7", "snapshot")
+            generations.bump("chart:7")
+
+            assert generations.namespaced_key("chart:7", "snapshot") != key
+
+    def test_recreated_table_starts_a_new_epoch(self, tmp_path):
+        """After a reboot wipes the table, keys cached before it never match again."""
+        path = tmp_path / "generations"
+        with override_settings(CACHE_GENERATIONS_PATH=str(path)):
+            key = generations.namespaced_key("chart:7", "snapshot")
+            assert GenerationTable(path).epoch == generations.get_table().epoch
+
+        path.unlink()
+        with override_settings(CACHE_GENERATIONS_PATH=str(path)):
+            generations._forget_table()
+            assert generations.namespaced_key("chart:7", "snapshot") != key
+
+
+@pytest.mark.django_db(transaction=True)
+def test_task_update_bumps_chart_generation(client, user, harada_chart, tasks):
+    """Editing a task invalidates the chart's cached values in every worker."""
+    namespace = generations.chart_namespace(harada_chart.id)
+    before = generations.generation(namespace)
+    client.force_login(user)
+
+    client.post(reverse("task_update", args=[harada_chart.id, tasks[0].id]), {"status": "done"})
+
+    assert generations.generation(namespace) > before
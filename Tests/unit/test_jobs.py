@@ -0,0 +1,250 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.urls import reverse
+from django.utils import timezone
+
+from charts.models import ChartShareLink, HaradaChart, Task
+from config import metrics
+from jobs.base import get_result, task
+from jobs.models import Job, TaskResultStatus
+from jobs import worker
+from jobs.worker import claim_next, requeue_stale, run_job
+
+QUEUES = {"default": 2}
+
+
+@task
+def add(a, b):
+    return a + b
+
+
+@task(max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+@task(takes_context=True)
+def count_up(context, total):
+    for done in range(1, total + 1):
+        context.task_result.set_progress(done, total)
+    return context.attempt
+
+
+def _run_next():
+    job = claim_next(QUEUES, "test-worker")
+    run_job(job)
+    return get_result(job.id)
+
+
+@pytest.mark.django_db
+class TestQueue:
+    def test_enqueue_stores_a_ready_job(self, user):
+        job = add.using(owner=user, priority=5).enqueue(1, b=2)
+
+        job.refresh()
+        assert job.status == TaskResultStatus.READY
+        assert (job.task_path, job.args, job.kwargs) == ("Tests.unit.test_jobs.add", [1], {"b": 2})
+        assert (job.owner, job.priority) == (user, 5)
+
+    def test_arguments_must_be_json(self):
+        with pytest.raises(TypeError):
+            add.enqueue(object(), 1)
+        assert not Job.objects.exists()
+
+    def test_unknown_queue_is_rejected(self):
+        with pytest.raises(ValueError, match="Unknown queue"):
+            add.using(queue_name="nope").enqueue(1, 2)
+
+    def test_worker_stores_the_return_value(self):
+        add.enqueue(2, 3)
+
+        result = _run_next()
+
+        assert result.status == TaskResultStatus.SUCCESSFUL
+        assert result.return_value == 5
+        assert result.finished_at is not None
+
+    def test_higher_priority_runs_first(self):
+        add.enqueue(1, 1)
+        urgent = add.using(priority=10).enqueue(2, 2)
+
+        assert claim_next(QUEUES, "test-worker").id == urgent.id
+
+    def test_failures_are_retried_with_backoff_then_failed(self, settings):
+        settings.JOBS_RETRY_DELAY = 30
+        explode.enqueue()
+
+        first = _run_next()
+        assert first.status == TaskResultStatus.READY
+        assert first.run_after > timezone.now() + timedelta(seconds=25)
+        assert "RuntimeError: boom" in first.error
+        assert claim_next(QUEUES, "test-worker") is None  # not due yet
+
+        Job.objects.update(run_after=timezone.now())
+        second = _run_next()
+        assert second.status == TaskResultStatus.FAILED
+        assert second.attempts == 2
+
+    def test_context_reports_progress(self):
+        count_up.enqueue(4)
+
+        result = _run_next()
+
+        assert result.progress == {"done": 4, "total": 4}
+        assert result.percent_done == 100
+        assert result.return_value == 1
+
+    def test_concurrency_limit_per_queue(self):
+        add.enqueue(1, 1)
+        add.enqueue(2, 2)
+
+        assert claim_next({"default": 1}, "a") is not None
+        assert claim_next({"default": 1}, "b") is None
+        assert claim_next({"default": 2}, "b") is not None
+
+    def test_jobs_of_lost_workers_are_requeued_or_failed(self, settings):
+        settings.JOBS_STALE_AFTER = 60
+        last_attempt = add.enqueue(1, 1)
+        retryable = explode.enqueue()
+        claim_next(QUEUES, "dead-worker")
+        claim_next(QUEUES, "dead-worker")
+        Job.objects.update(started_at=timezone.now() - timedelta(minutes=5))
+
+        assert requeue_stale() == 2
+        assert get_result(retryable.id).status == TaskResultStatus.READY
+        assert get_result(last_attempt.id).status == TaskResultStatus.FAILED
+
+    def test_queue_depth_is_exported(self):
+        add.enqueue(1, 1)
+        add.enqueue(1, 2)
+        claim_next(QUEUES, "test-worker")
+
+        text = metrics.exposition()
+
+        assert 'harada_jobs_pending{queue="default",status="READY"} 1' in text
+        assert 'harada_jobs_pending{queue="default",status="RUNNING"} 1' in text
+        assert "harada_jobs_oldest_ready_seconds{queue=\"default\"}" in text
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_command_drains_the_queue_in_burst_mode():
+    jobs = [add.enqueue(n, n) for n in range(3)]
+    out = StringIO()
+
+    call_command("jobs_worker", "--burst", "--threads", "2", stdout=out)
+
+    assert [get_result(job.id).return_value for job in jobs] == [0, 2, 4]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_survives_a_failure_to_store_the_outcome(monkeypatch):
+    add.enqueue(1, 1)
+    add.enqueue(2, 2)
+    stored = []  # the first job's outcome is lost, the worker goes on to the second
+
+    def flaky_run_job(job):
+        if not stored:
+            stored.append(None)
+            raise DatabaseError("connection lost")
+        run_job(job)
+        stored.append(job.return_value)
+
+    monkeypatch.setattr(worker, "run_job", flaky_run_job)
+
+    worker.Worker(QUEUES, threads=1).run(burst=True)
+
+    assert len(stored) == 2 and stored[1] in (2, 4)
+    assert Job.objects.filter(status=TaskResultStatus.RUNNING).count() == 1
+
+
+@pytest.mark.django_db
+class TestChartDeletion:
+    def test_delete_is_queued_and_polled(self, client, user, harada_chart, tasks):
+        client.force_login(user)
+
+        response = client.post(reverse("accounts:delete_chart", args=[harada_chart.id]), HTTP_HX_REQUEST="true")
+
+        job = Job.objects.get()
+        assert job.args == [harada_chart.id]
+        assert HaradaChart.objects.filter(id=harada_chart.id).exists()
+        assert f'hx-get="{reverse("jobs:status", args=[job.id])}"' in response.content.decode()
+
+        dashboard = client.get(reverse("dashboard")).content.decode()
+        assert "Deleting this chart" in dashboard
+
+        result = _run_next()
+        assert result.status == TaskResultStatus.SUCCESSFUL
+        assert not HaradaChart.objects.filter(id=harada_chart.id).exists()
+        assert not Task.objects.filter(chart_id=harada_chart.id).exists()
+
+        status = client.get(reverse("jobs:status", args=[job.id])).content.decode()
+        assert "Done." in status
+        assert "hx-get" not in status
+
+    def test_delete_requires_post(self, client, user, harada_chart):
+        client.force_login(user)
+
+        response = client.get(reverse("accounts:delete_chart", args=[harada_chart.id]))
+
+        assert response.status_code == 405
+        assert not Job.objects.exists()
+
+    def test_status_is_private_to_the_owner(self, client, user, django_user_model):
+        job = add.using(owner=user).enqueue(1, 1)
+        client.force_login(django_user_model.objects.create_user("other", password="x"))
+
+        response = client.get(reverse("jobs:status", args=[job.id]))
+
+        assert response.status_code == 404
+
+    def test_immediate_mode_runs_after_commit(self, client, user, harada_chart, settings, django_capture_on_commit_callbacks):
+        settings.JOBS_IMMEDIATE = True
+        client.force_login(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(reverse("accounts:delete_chart", args=[harada_chart.id]))
+
+        assert Job.objects.get().status == TaskResultStatus.SUCCESSFUL
+        assert not HaradaChart.objects.filter(id=harada_chart.id).exists()
+
+    def test_repeated_posts_reuse_the_queued_job(self, client, user, harada_chart):
+        client.force_login(user)
+        url = reverse("accounts:delete_chart", args=[harada_chart.id])
+
+        first = client.post(url, HTTP_HX_REQUEST="true")
+        second = client.post(url, HTTP_HX_REQUEST="true")
+
+        job = Job.objects.get()
+        assert f'id="job-{job.id}"' in first.content.decode()
+        assert f'id="job-{job.id}"' in second.content.decode()
+
+    def test_chart_is_hidden_while_deletion_is_pending(self, client, user, harada_chart, tasks):
+        client.force_login(user)
+        link = ChartShareLink.objects.create(chart=harada_chart)
+
+        client.post(reverse("accounts:delete_chart", args=[harada_chart.id]))
+
+        harada_chart.refresh_from_db()
+        assert harada_chart.deletion_requested_at is not None
+        assert client.get(reverse("matrix_view", args=[harada_chart.id])).status_code == 404
+        assert client.post(reverse("accounts:duplicate_chart", args=[harada_chart.id])).status_code == 404
+        assert client.get(reverse("shared_chart_view", args=[link.token])).status_code == 404
+        assert "Test Chart" not in client.get(reverse("search"), {"q": "Test"}).content.decode()
+        assert "Deleting this chart" in client.get(reverse("dashboard")).content.decode()
+
+    def test_failed_deletion_can_be_retried(self, client, user, harada_chart):
+        client.force_login(user)
+        url = reverse("accounts:delete_chart", args=[harada_chart.id])
+        client.post(url)
+        Job.objects.update(status=TaskResultStatus.FAILED)
+
+        dashboard = client.get(reverse("dashboard")).content.decode()
+        assert "could not be deleted" in dashboard
+
+        client.post(url)
+
+        assert Job.objects.filter(status=TaskResultStatus.READY).count() == 1
@@ -0,0 +1,57 @@
+import asyncio
+import random
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+
+from benchmarks.loadtest import (
+    HttpClient,
+    Stats,
+    VirtualUser,
+    compare,
+    endpoint_name,
+    load_sessions,
+    percentile,
+    summarize,
+)
+
+
+def test_endpoint_name_groups_ids():
+    """Numeric and temporary chart ids collapse into one route."""
+    assert endpoint_name("GET", "/matrix/12/task/7/modal/") == "GET /matrix/{id}/task/{id}/modal/"
+    assert endpoint_name("POST", "/wizard/temp_0a1b2c/step1/?x=1") == "POST /wizard/{id}/step1/"
+
+
+def test_percentiles_and_compare():
+    """Nearest-rank percentiles feed the per-endpoint comparison."""
+    samples = [i / 1000 for i in range(1, 101)]
+    assert percentile(samples, 50) == 0.05
+    assert percentile(samples, 99) == 0.099
+
+    stats = Stats(samples={"GET /": samples})
+    run = {"commit": "a", "endpoints": summarize(stats, elapsed=10)}
+    faster = {"commit": "b", "endpoints": {"GET /": {**run["endpoints"]["GET /"], "p50_ms": 25.0}}}
+    assert "25.0 (-50%)" in compare(run, faster)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_journey_against_live_server(live_server, tmp_path):
+    """A full wizard-to-comment journey succeeds end to end."""
+    sessions = tmp_path / "sessions.json"
+    call_command("loadtest_sessions", users=2, out=str(sessions), stderr=StringIO())
+    cookie = load_sessions(sessions, 2)[1]
+    stats = Stats()
+
+    async def journey():
+        client = HttpClient(live_server.url, stats, behind_proxy=False)
+        try:
+            await VirtualUser(1, client, random.Random(1), cookie).create()
+        finally:
+            await client.close()
+
+    asyncio.run(journey())
+
+    assert "POST /matrix/{id}/task/{id}/comment/" in stats.samples
+    assert not stats.errors
@@ -0,0 +1,129 @@
+import json
+import logging
+import sys
+from logging.handlers import QueueHandler
+
+import pytest
+from django.urls import reverse
+
+from config import log
+from config.log import ClerkHandshakeFilter, JsonFormatter, truncated
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _record(msg, *args, exc_info=None, **extra):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_handshake_token_is_redacted_from_formatted_message():
+    record = _record('"GET %s HTTP/1.1" 200', "/?__clerk_handshake=abc.def&next=/matrix/")
+
+    ClerkHandshakeFilter().filter(record)
+
+    assert record.getMessage() == '"GET /?__clerk_handshake=***&next=/matrix/ HTTP/1.1" 200'
+
+
+def test_messages_without_a_token_are_untouched():
+    record = _record("GET %s", "/matrix/")
+
+    ClerkHandshakeFilter().filter(record)
+
+    assert (record.msg, record.args) == ("GET %s", ("/matrix/",))
+
+
+def test_json_formatter_includes_timing_and_exception():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = _record("GET %s %d", "/", 500, exc_info=sys.exc_info(), timing={"total": 12.5, "db_count": 3})
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "GET / 500"
+    assert entry["level"] == "INFO"
+    assert entry["timing"] == {"total": 12.5, "db_count": 3}
+    assert "ValueError: boom" in entry["exc"]
+
+
+def test_truncated_renders_lazily_and_bounded():
+    class Payload:
+        rendered = 0
+
+        def __str__(self):
+            Payload.rendered += 1
+            return "x" * 1000
+
+    value = truncated(Payload(), limit=10)
+    assert Payload.rendered == 0
+
+    assert str(value) == "xxxxxxxxxx... (990 more chars)"
+    assert str(truncated("short", limit=10)) == "short"
+
+
+@pytest.fixture
+def queued_logger():
+    logger = logging.getLogger("tests.queued")
+    target = ListHandler("tests_target")
+    logger.handlers = [target]
+    logger.propagate = False
+    log.start_queues(["tests_target"])
+    (entry,) = [entry for entry in log._listeners if entry[0] is logger.handlers[0]]
+    yield logger, target, entry[1]
+    if entry[1]._thread is not None:
+        entry[1].stop()
+    log._listeners.remove(entry)
+    logger.handlers.clear()
+
+
+def test_handlers_are_served_from_a_listener_thread(queued_logger):
+    logger, target, listener = queued_logger
+    assert isinstance(logger.handlers[0], QueueHandler)
+    args = ["before"]
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("state: %s", args)
+    args.append("after")
+    listener.stop()  # drains the queue
+
+    (record,) = target.records
+    assert record.getMessage() == "state: ['before']"
+    assert "ValueError: boom" in record.exc_text
+    assert record.exc_info is None
+
+
+def test_handlers_include_the_ones_behind_listeners(queued_logger):
+    logger, target, _ = queued_logger
+
+    assert target in log.handlers()
+    assert logger.handlers[0] not in log.handlers()
+
+
+@pytest.mark.django_db
+def test_create_chart_logs_a_truncated_payload(client, settings, caplog, monkeypatch):
+    settings.LOG_PAYLOAD_LIMIT = 50
+    wizard_logger = logging.getLogger("wizard.views")
+    monkeypatch.setattr(logging.getLogger("wizard"), "handlers", [caplog.handler])
+    caplog.set_level(logging.DEBUG, logger="wizard")
+
+    client.post(
+        reverse("create_chart"),
+        data=json.dumps({"title": "Goal", "notes": "n" * 5000}),
+        content_type="application/json",
+    )
+
+    (message,) = [r.getMessage() for r in caplog.records if r.name == wizard_logger.name and "Parsed" in r.msg]
+    assert message.endswith("more chars)")
+    assert len(message) < 120
@@ -0,0 +1,120 @@
+import os
+import tracemalloc
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from config import memory, metrics
+
+_kept = []
+
+
+def _allocate():
+    _kept.extend("x" * 1000 + str(n) for n in range(2000))
+
+
+@pytest.fixture(autouse=True)
+def memory_settings(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path / "metrics")
+    settings.MEMORY_DIR = str(tmp_path / "memory")
+    settings.MEMORY_SNAPSHOT_KEEP = 2
+    metrics.reset()
+    yield settings
+    metrics.reset()
+
+
+@pytest.fixture
+def tracing():
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(5)
+    memory._forget_baseline()
+    yield
+    _kept.clear()
+    memory._forget_baseline()
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def test_gauges_are_published_per_worker():
+    memory.update_gauges(force=True)
+
+    text = metrics.exposition()
+
+    pid = os.getpid()
+    assert f'harada_process_memory_bytes{{kind="rss",pid="{pid}"}}' in text
+    assert f'harada_process_gc_objects{{pid="{pid}"}}' in text
+
+
+def test_request_path_does_not_walk_the_heap(monkeypatch):
+    def walk():
+        raise AssertionError("gc.get_objects() on a request thread")
+
+    monkeypatch.setattr(memory.gc, "get_objects", walk)
+
+    memory.update_gauges()  # what the metrics middleware calls
+    memory._last_update = 0.0
+
+
+def test_gauges_of_exited_workers_are_dropped(memory_settings):
+    dead = metrics.ValueFile(os.path.join(memory_settings.METRICS_DIR, "metrics_999999999.db"))
+    dead.set(metrics._key("harada_process_gc_objects", {"pid": "999999999"}), 5)
+    dead.add(metrics._key("harada_http_errors_total", {"view": "home"}), 1)
+
+    text = metrics.exposition()
+
+    assert 'pid="999999999"' not in text
+    assert 'harada_http_errors_total{view="home"} 1' in text
+
+
+@pytest.mark.usefixtures("tracing")
+def test_endpoint_reports_growth_since_the_baseline(client):
+    url = reverse("memory")
+    client.get(url, {"reset": "1"}, REMOTE_ADDR="127.0.0.1")
+    _allocate()
+
+    response = client.get(url, {"top": "5"}, REMOTE_ADDR="127.0.0.1")
+
+    text = response.content.decode()
+    assert f"pid {os.getpid()}" in text
+    assert "Top 5 allocation sites" in text
+    assert "test_memory.py" in text.split("Top 5", 1)[1]
+
+
+def test_endpoint_explains_when_tracing_is_off(client):
+    if tracemalloc.is_tracing():
+        pytest.skip("tracemalloc is on for the whole run")
+
+    response = client.get(reverse("memory"), REMOTE_ADDR="127.0.0.1")
+
+    assert "tracemalloc is off" in response.content.decode()
+
+
+@pytest.mark.parametrize("top", ["abc", "0", "-3"])
+def test_endpoint_rejects_a_bad_top(client, top):
+    response = client.get(reverse("memory"), {"top": top}, REMOTE_ADDR="127.0.0.1")
+
+    assert response.status_code == 400
+
+
+def test_endpoint_is_internal_only(client):
+    response = client.get(reverse("memory"), REMOTE_ADDR="127.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.9")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.usefixtures("tracing")
+def test_report_diffs_first_and_latest_snapshot(memory_settings):
+    first = memory.dump_snapshot()
+    _allocate()
+    latest = memory.dump_snapshot()
+    assert latest != first and first.exists()
+    out = StringIO()
+
+    call_command("memory_report", pid=[os.getpid()], top=5, stdout=out)
+
+    report = out.getvalue()
+    assert f"worker {os.getpid()}: {first.stem} -> {latest.stem}" in report
+    assert "test_memory.py" in report
@@ -0,0 +1,141 @@
+import os
+
+import pytest
+from django.urls import reverse
+
+from config import metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_value_file_grows_and_is_readable_by_other_processes(tmp_path):
+    values = metrics.ValueFile(tmp_path / "metrics_1.db")
+    for n in range(3000):  # well past the initial 64 KiB
+        values.add(f"key-{n}", n)
+    values.add("key-7", 0.5)
+
+    read = metrics.read_file(tmp_path / "metrics_1.db")
+
+    assert len(read) == 3000
+    assert read["key-7"] == 7.5
+    assert read["key-2999"] == 2999
+
+
+def test_reopening_a_file_keeps_its_values(tmp_path):
+    metrics.ValueFile(tmp_path / "metrics_1.db").add("a", 2)
+    reopened = metrics.ValueFile(tmp_path / "metrics_1.db")
+    reopened.add("a", 3)
+
+    assert metrics.read_file(tmp_path / "metrics_1.db") == {"a": 5}
+
+
+def test_collect_sums_every_worker_file(tmp_path):
+    key = metrics._key("harada_http_requests_total", {"view": "home", "method": "GET", "status": "200"})
+    metrics.ValueFile(tmp_path / "metrics_101.db").add(key, 2)
+    metrics.ValueFile(tmp_path / "metrics_102.db").add(key, 3)
+
+    assert 'harada_http_requests_total{method="GET",status="200",view="home"} 5' in metrics.exposition()
+
+
+def test_dead_worker_files_are_folded_into_one(tmp_path):
+    key = metrics._key("harada_http_requests_total", {"view": "home", "method": "GET", "status": "200"})
+    gauge = metrics._key("harada_process_memory_bytes", {"kind": "rss", "pid": "999999998"})
+    for pid in (999999998, 999999999):
+        dead = metrics.ValueFile(tmp_path / f"metrics_{pid}.db")
+        dead.add(key, 2)
+        dead.set(gauge, 1024)
+    metrics.ValueFile(tmp_path / f"metrics_{os.getpid()}.db").add(key, 1)
+
+    first = metrics.exposition()
+
+    assert sorted(path.name for path in tmp_path.glob("*.db")) == ["aggregate.db", f"metrics_{os.getpid()}.db"]
+    assert 'harada_http_requests_total{method="GET",status="200",view="home"} 5' in first
+    assert "999999998" not in first
+    assert gauge not in metrics.read_file(tmp_path / "aggregate.db")
+    assert metrics.compact() == 0
+    assert 'harada_http_requests_total{method="GET",status="200",view="home"} 5' in metrics.exposition()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("test_seconds", "Test.", buckets=(0.1, 1.0))
+    try:
+        for value in (0.05, 0.5, 0.7, 5):
+            histogram.observe(value, view="v")
+        text = metrics.exposition()
+    finally:
+        del metrics.REGISTRY["test_seconds"]
+
+    assert 'test_seconds_bucket{view="v",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{view="v",le="1.0"} 3' in text
+    assert 'test_seconds_bucket{view="v",le="+Inf"} 4' in text
+    assert 'test_seconds_count{view="v"} 4' in text
+
+
+def test_collectors_add_gauges_at_scrape_time():
+    collector = metrics.register_collector(lambda: [("test_gauge", "gauge", "Test.", [({"kind": "x"}, 4)])])
+    try:
+        text = metrics.exposition()
+    finally:
+        metrics._collectors.remove(collector)
+
+    assert "# TYPE test_gauge gauge" in text
+    assert 'test_gauge{kind="x"} 4' in text
+
+
+def test_a_failing_collector_does_not_break_the_scrape():
+    def broken():
+        raise ConnectionError("database unavailable")
+
+    metrics.register_collector(broken)
+    try:
+        text = metrics.exposition()
+    finally:
+        metrics._collectors.remove(broken)
+
+    assert "# TYPE harada_http_requests_total counter" in text
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    def test_requests_are_recorded_per_url_name(self, client, user, harada_chart, pillars, tasks):
+        client.force_login(user)
+        client.get(reverse("matrix_view", args=[harada_chart.id]))
+        client.get(reverse("matrix_view", args=[harada_chart.id]))
+
+        response = client.get(reverse("metrics"), REMOTE_ADDR="127.0.0.1")
+
+        text = response.content.decode()
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert 'harada_http_requests_total{method="GET",status="200",view="matrix_view"} 2' in text
+        assert 'harada_http_request_duration_seconds_count{view="matrix_view"} 2' in text
+        assert 'harada_db_queries_total{view="matrix_view"}' in text
+        assert 'harada_cache_lookups_total{prefix="chart",result="misses"}' in text
+        assert 'view="metrics"' not in text
+
+    def test_server_errors_are_counted(self, client, user, monkeypatch):
+        client.raise_request_exception = False
+        client.force_login(user)
+
+        def boom(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr("accounts.views.search_charts", boom)
+        client.get(reverse("search"), {"q": "x"})
+
+        text = client.get(reverse("metrics"), REMOTE_ADDR="127.0.0.1").content.decode()
+        assert 'harada_http_errors_total{view="search"} 1' in text
+        assert 'harada_http_requests_total{method="GET",status="500",view="search"} 1' in text
+
+    def test_proxied_requests_are_refused(self, client):
+        response = client.get(reverse("metrics"), REMOTE_ADDR="127.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.9")
+
+        assert response.status_code == 404
+
+    def test_remote_clients_are_refused(self, client):
+        assert client.get(reverse("metrics"), REMOTE_ADDR="203.0.113.9").status_code == 404
@@ -0,0 +1,30 @@
+import json
+
+from benchmarks.micro import BASELINE_FILE, find_regressions
+
+
+def test_find_regressions_uses_threshold():
+    """Only benchmarks slower than baseline * (1 + threshold) are flagged."""
+    baselines = {"grid": {"median_ms": 10.0}, "render": {"median_ms": 10.0}}
+    results = {
+        "grid": {"median_ms": 11.0},
+        "render": {"median_ms": 13.0},
+        "new": {"median_ms": 99.0},
+    }
+
+    assert find_regressions(baselines, results, threshold=0.2) == ["render"]
+    assert find_regressions(baselines, results, threshold=0.05) == ["grid", "render"]
+
+
+def test_committed_baselines_cover_the_suite():
+    """The stored baselines include every hot path the suite measures."""
+    stored = json.loads(BASELINE_FILE.read_text())
+
+    assert {
+        "build_matrix_grid",
+        "matrix_template_render",
+        "completion_percentage",
+        "migrate_session_to_database",
+        "ai_inspiration_import",
+        "dashboard",
+    } <= set(stored["benchmarks"])
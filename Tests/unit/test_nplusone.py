@@ -0,0 +1,67 @@
+import logging
+
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from charts.models import Task
+from config.nplusone import HEADER, NPlusOneMiddleware
+from matrix.views import COLOR_CLASSES
+
+
+def _render_cells(queryset):
+    def view(request):
+        return HttpResponse("".join(
+            render_to_string("matrix/task_cell.html", {
+                "task": task, "chart": task.chart, "color_classes": COLOR_CLASSES,
+            })
+            for task in queryset
+        ))
+    return view
+
+
+@pytest.fixture
+def debug(settings):
+    settings.DEBUG = True
+    settings.NPLUSONE_THRESHOLD = 3
+    settings.NPLUSONE_HEADER = True
+    return settings
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("debug")
+class TestNPlusOneMiddleware:
+    def test_reports_template_line_of_lazy_load(self, tasks, caplog):
+        middleware = NPlusOneMiddleware(_render_cells(Task.objects.filter(pillar__position=1)))
+
+        with caplog.at_level(logging.WARNING, logger="config.nplusone"):
+            response = middleware(RequestFactory().get("/matrix/1/"))
+
+        assert "matrix/task_cell.html:3" in response[HEADER]
+        assert "8x" in response[HEADER]
+        assert "N+1 on GET /matrix/1/" in caplog.text
+        assert "charts_pillar" in caplog.text
+
+    def test_quiet_when_related_objects_are_joined(self, tasks, caplog):
+        queryset = Task.objects.filter(pillar__position=1).select_related("pillar", "chart")
+        middleware = NPlusOneMiddleware(_render_cells(queryset))
+
+        with caplog.at_level(logging.WARNING, logger="config.nplusone"):
+            response = middleware(RequestFactory().get("/matrix/1/"))
+
+        assert HEADER not in response
+        assert "N+1" not in caplog.text
+
+    def test_header_can_be_disabled(self, tasks, debug):
+        debug.NPLUSONE_HEADER = False
+        middleware = NPlusOneMiddleware(_render_cells(Task.objects.filter(pillar__position=1)))
+
+        assert HEADER not in middleware(RequestFactory().get("/"))
+
+
+def test_removed_outside_debug(settings):
+    settings.DEBUG = False
+    with pytest.raises(MiddlewareNotUsed):
+        NPlusOneMiddleware(lambda request: HttpResponse())
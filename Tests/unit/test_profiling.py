@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from config.profiling import Sampler
+
+
+def _spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_folds_the_sampled_thread_stack():
+    with Sampler(threading.get_ident(), 0.001) as sampler:
+        _spin(0.1)
+
+    folded = sampler.folded()
+    assert folded
+    stack, count = folded.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "_spin (Tests/unit/test_profiling.py:" in stack
+    assert stack.index("test_sampler_folds_the_sampled_thread_stack") < stack.index("_spin")
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_DIR = str(tmp_path)
+    settings.PROFILE_SAMPLE_RATE = 0
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    def test_staff_can_profile_a_request(self, client, profile_dir):
+        staff = User.objects.create_user("staff", password="x", is_staff=True)
+        client.force_login(staff)
+
+        response = client.get(reverse("dashboard"), {"_profile": "1"})
+
+        url = response["X-Profile-URL"]
+        assert len(list(profile_dir.glob("*-dashboard-*.folded"))) == 1
+        download = client.get(url)
+        assert download.status_code == 200
+        assert download["Content-Type"].startswith("text/plain")
+
+    def test_header_switch_works_too(self, client, profile_dir):
+        client.force_login(User.objects.create_user("staff", password="x", is_staff=True))
+
+        response = client.get(reverse("dashboard"), HTTP_X_PROFILE="1")
+
+        assert "X-Profile-URL" in response
+
+    def test_ignored_for_other_users(self, client, user, profile_dir):
+        client.force_login(user)
+
+        response = client.get(reverse("dashboard"), {"_profile": "1"})
+
+        assert "X-Profile-URL" not in response
+        assert list(profile_dir.iterdir()) == []
+
+    def test_profiles_are_staff_only(self, client, user, profile_dir):
+        (profile_dir / "x.folded").write_text("a;b 1\n")
+        client.force_login(user)
+
+        response = client.get(reverse("profile_download", args=["x.folded"]))
+
+        assert response.status_code == 302  # to the admin login
+
+    def test_sample_rate_profiles_without_telling_the_client(self, client, profile_dir, settings):
+        settings.PROFILE_SAMPLE_RATE = 1
+        settings.PROFILE_KEEP = 2
+
+        for _ in range(3):
+            response = client.get(reverse("home"))
+
+        assert "X-Profile-URL" not in response
+        assert len(list(profile_dir.glob("*-home-*.folded"))) == 2
@@ -0,0 +1,135 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from config import metrics, pruning
+from jobs.models import Job, TaskResultStatus
+from wizard.models import WizardDraft
+
+SESSIONS, DRAFTS, JOBS = pruning.TABLES
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _sessions(count, expired):
+    offset = timedelta(days=-1 if expired else 1)
+    for _ in range(count):
+        store = SessionStore()
+        store["wizard_draft"] = "token"
+        store.create()
+        Session.objects.filter(session_key=store.session_key).update(expire_date=timezone.now() + offset)
+
+
+def _drafts(count, expired):
+    offset = timedelta(days=-1 if expired else 1)
+    WizardDraft.objects.bulk_create(
+        WizardDraft(data={"title": f"Draft {n}"}, expires_at=timezone.now() + offset) for n in range(count)
+    )
+
+
+@pytest.mark.django_db
+class TestPrune:
+    def test_deletes_only_expired_rows_in_batches(self):
+        _sessions(7, expired=True)
+        _sessions(2, expired=False)
+
+        with CaptureQueriesContext(connection) as run:
+            assert pruning.prune(SESSIONS, batch_size=3, pause=0) == 7
+
+        assert Session.objects.count() == 2
+        deletes = [q for q in run.captured_queries if q["sql"].startswith("DELETE")]
+        assert len(deletes) == 3  # 3 + 3 + 1
+
+    def test_limit_leaves_the_rest_for_the_next_run(self):
+        _drafts(5, expired=True)
+
+        assert pruning.prune(DRAFTS, batch_size=2, pause=0, limit=3) == 3
+        assert WizardDraft.objects.count() == 2
+        assert pruning.prune(DRAFTS, batch_size=2, pause=0) == 2
+
+    def test_finished_jobs_are_kept_for_the_retention_period(self, settings):
+        settings.JOBS_RETENTION = 3600
+        now = timezone.now()
+        old = Job.objects.create(task_path="t", status=TaskResultStatus.SUCCESSFUL, finished_at=now - timedelta(hours=2))
+        Job.objects.create(task_path="t", status=TaskResultStatus.FAILED, finished_at=now - timedelta(minutes=5))
+        Job.objects.create(task_path="t", status=TaskResultStatus.READY)
+
+        assert pruning.prune(JOBS, pause=0) == 1
+        assert not Job.objects.filter(id=old.id).exists()
+        assert Job.objects.count() == 2
+        assert pruning.table_stats(JOBS) == {"rows": 2, "expired": 0, "written_last_hour": 1}
+
+    def test_pruned_rows_are_counted(self, tmp_path):
+        _drafts(4, expired=True)
+
+        pruning.prune(DRAFTS, batch_size=3, pause=0)
+
+        assert 'harada_pruned_rows_total{table="wizard_wizarddraft"} 4' in metrics.exposition()
+        assert not list(tmp_path.glob("metrics_*.db"))  # straight into the aggregate
+
+    def test_table_stats(self, settings):
+        settings.WIZARD_DRAFT_TTL = 7200
+        _drafts(3, expired=True)
+        WizardDraft.objects.create(data={}, expires_at=timezone.now() + timedelta(seconds=7000))  # fresh
+        WizardDraft.objects.create(data={}, expires_at=timezone.now() + timedelta(seconds=1000))  # written 1h40 ago
+
+        assert pruning.table_stats(DRAFTS) == {"rows": 5, "expired": 3, "written_last_hour": 1}
+
+    def test_sizes_are_exported(self):
+        _sessions(1, expired=True)
+
+        text = metrics.exposition()
+
+        assert 'harada_table_rows{table="django_session"} 1' in text
+        assert 'harada_table_expired_rows{table="django_session"} 1' in text
+        assert 'harada_table_growth_rows_per_hour{table="wizard_wizarddraft"} 0' in text
+
+    def test_sizes_are_cached_between_scrapes(self):
+        metrics.exposition()
+
+        with CaptureQueriesContext(connection) as scrape:
+            metrics.exposition()
+
+        assert not [q for q in scrape.captured_queries if '"__count"' in q["sql"]]  # table_stats' count()s
+
+
+@pytest.mark.django_db
+def test_prune_expired_command_reports_each_table(settings):
+    settings.PRUNE_PAUSE = 0
+    _sessions(2, expired=True)
+    _drafts(3, expired=True)
+    _drafts(1, expired=False)
+    out = StringIO()
+
+    call_command("prune_expired", "--json", stdout=out)
+
+    report = {row["table"]: row for row in json.loads(out.getvalue())}
+    assert report["django_session"]["pruned"] == 2
+    assert report["wizard_wizarddraft"] == {
+        "table": "wizard_wizarddraft", "pruned": 3, "rows": 1, "expired": 0, "written_last_hour": 0,
+    }
+
+
+@pytest.mark.django_db
+def test_dry_run_deletes_nothing():
+    _drafts(2, expired=True)
+    out = StringIO()
+
+    call_command("prune_expired", "--dry-run", stdout=out)
+
+    assert WizardDraft.objects.count() == 2
+    assert "still expired       2" in out.getvalue()
@@ -0,0 +1,80 @@
+import logging
+import re
+
+import pytest
+from django.urls import reverse
+
+from config.timing import PROBE, SERVER_TIMING, with_probes
+
+
+def _metrics(header):
+    return {
+        match.group(1): float(match.group(2))
+        for match in re.finditer(r"([\w.]+);dur=([\d.]+)", header)
+    }
+
+
+def test_with_probes_places_a_probe_after_each_middleware():
+    assert with_probes(["a.A", "b.B"]) == [SERVER_TIMING, "a.A", PROBE, "b.B", PROBE]
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+    @pytest.fixture(autouse=True)
+    def header_on(self, settings):
+        settings.SERVER_TIMING = True
+
+    def test_header_breaks_matrix_request_into_phases(self, client, user, harada_chart, pillars, tasks):
+        client.force_login(user)
+
+        response = client.get(reverse("matrix_view", args=[harada_chart.id]))
+
+        header = response["Server-Timing"]
+        metrics = _metrics(header)
+        assert {"mw.ClerkMiddleware", "mw.SessionMiddleware", "view", "tpl", "db", "total"} <= set(metrics)
+        assert metrics["tpl"] > 0
+        assert re.search(r'db;dur=[\d.]+;desc="\d+ queries"', header)
+        # Phases are exclusive, so they add up to the total
+        phases = sum(ms for name, ms in metrics.items() if name != "total")
+        assert phases == pytest.approx(metrics["total"], abs=1.0)
+
+    def test_timings_are_logged_as_structured_fields(self, client, caplog, settings):
+        settings.TIMING_LOG_MS = 0  # log every request at INFO
+        logger = logging.getLogger("config.timing")
+        logger.addHandler(caplog.handler)
+        try:
+            client.get(reverse("home"))
+        finally:
+            logger.removeHandler(caplog.handler)
+
+        record = next(r for r in caplog.records if r.name == "config.timing")
+        assert record.timing["db_count"] == 0
+        assert {"view", "tpl", "db", "total"} <= set(record.timing)
+        assert "GET / 200" in record.getMessage()
+
+    def test_fast_requests_are_logged_at_debug(self, client, caplog, settings):
+        settings.TIMING_LOG_MS = 60_000
+        logger = logging.getLogger("config.timing")
+        logger.addHandler(caplog.handler)
+        try:
+            with caplog.at_level(logging.DEBUG, logger="config.timing"):
+                client.get(reverse("home"))
+        finally:
+            logger.removeHandler(caplog.handler)
+
+        record = next(r for r in caplog.records if r.name == "config.timing")
+        assert record.levelno == logging.DEBUG
+
+    def test_publicly_cacheable_responses_carry_no_header(self, client):
+        response = client.get(reverse("home"))  # anonymous page: Cache-Control: public
+
+        assert "public" in response["Cache-Control"]
+        assert "Server-Timing" not in response
+
+    def test_header_can_be_disabled(self, client, user, settings):
+        settings.SERVER_TIMING = False
+        client.force_login(user)
+
+        response = client.get(reverse("dashboard"))
+
+        assert "Server-Timing" not in response
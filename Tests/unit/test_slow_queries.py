@@ -0,0 +1,100 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from config.slow_queries import SlowQueryWrapper, redact
+
+
+@pytest.fixture
+def slow_log(settings, caplog, monkeypatch):
+    """Treat every query as slow and capture the log instead of writing the file."""
+    settings.SLOW_QUERY_MS = 0
+    settings.SLOW_QUERY_SAMPLE_RATE = 1.0
+    monkeypatch.setattr(logging.getLogger("config.slow_queries"), "handlers", [caplog.handler])
+
+
+def _samples(caplog):
+    return [json.loads(r.getMessage()) for r in caplog.records if r.name == "config.slow_queries"]
+
+
+def test_redact_keeps_types_not_values():
+    assert redact([42, "secret@example.com", None]) == ["int", "str(18)", "NoneType"]
+    assert redact({"a": b"xy"}) == ["bytes(2)"]
+    assert redact(None) is None
+
+
+@pytest.mark.django_db
+class TestSlowQueryLog:
+    def test_wrapper_is_installed_on_new_connections(self):
+        connection.ensure_connection()
+
+        assert isinstance(connection.execute_wrappers[0], SlowQueryWrapper)
+
+    def test_samples_name_the_view_and_template(self, client, user, harada_chart, pillars, tasks, slow_log, caplog):
+        client.force_login(user)
+
+        client.get(reverse("task_modal", args=[harada_chart.id, tasks[0].id]))
+
+        samples = [s for s in _samples(caplog) if s["view"] == "task_modal"]
+        assert samples
+        task_query = next(s for s in samples if 'FROM "charts_task"' in s["sql"])
+        assert task_query["code"].startswith("matrix/views.py:")
+        assert task_query["params"] == ["int", "int"]
+        assert user.username not in json.dumps(samples)
+
+    def test_fast_queries_are_not_logged(self, user, slow_log, settings, caplog):
+        settings.SLOW_QUERY_MS = 10_000
+
+        list(type(user).objects.all())
+
+        assert _samples(caplog) == []
+
+    def test_sample_rate_zero_logs_nothing(self, user, slow_log, settings, caplog):
+        settings.SLOW_QUERY_SAMPLE_RATE = 0
+
+        list(type(user).objects.all())
+
+        assert _samples(caplog) == []
+
+    def test_recording_errors_stay_out_of_the_sample_log(self, user, slow_log, caplog, monkeypatch):
+        def broken(*args):
+            raise RuntimeError("no frame")
+
+        monkeypatch.setattr("config.slow_queries.attribute", broken)
+
+        list(type(user).objects.all())
+
+        assert _samples(caplog) == []
+        error = next(r for r in caplog.records if r.name == "config")
+        assert error.getMessage() == "Could not record a slow query"
+        assert error.exc_info[0] is RuntimeError
+
+
+def test_summary_command_groups_by_shape(tmp_path):
+    log = tmp_path / "slow.jsonl"
+    rows = [
+        {"ts": "2026-10-19T10:00:00.000+00:00", "duration_ms": ms, "sql": sql, "view": view,
+         "code": "matrix/views.py:40 in matrix_view", "template": template}
+        for ms, sql, view, template in [
+            (120, "SELECT a FROM t WHERE id = %s", "matrix_view", "matrix/task_cell.html:3"),
+            (300, "SELECT a FROM t WHERE id = %s", "matrix_view", "matrix/task_cell.html:3"),
+            (150, "SELECT b FROM u", "dashboard", ""),
+        ]
+    ]
+    log.write_text("\n".join(map(json.dumps, rows)) + "\nnot json\n")
+    out = StringIO()
+
+    call_command("slow_queries", log=str(log), json=True, stdout=out, stderr=StringIO())
+
+    summary = json.loads(out.getvalue())
+    assert summary[0]["sql"] == "SELECT a FROM t WHERE id = %s"
+    assert summary[0]["count"] == 2
+    assert summary[0]["total_ms"] == 420
+    assert summary[0]["max_ms"] == 300
+    assert summary[0]["locations"] == [["matrix_view @ matrix/task_cell.html:3", 2]]
+    assert summary[1]["locations"] == [["dashboard @ matrix/views.py:40 in matrix_view", 1]]
@@ -0,0 +1,15 @@
+from django.template import engines
+
+from config.warmup import build_url_resolver, memory_usage, precompile_templates
+
+
+def test_precompile_templates_compiles_project_templates():
+    """Every project template is compiled, including matrix and wizard pages."""
+    assert precompile_templates() >= 20
+    assert engines["django"].get_template("matrix/view.html")
+
+
+def test_build_url_resolver_and_memory_usage():
+    """The resolver is populated and memory figures are reported in KiB."""
+    assert build_url_resolver() > 0
+    assert memory_usage()["rss"] > 0
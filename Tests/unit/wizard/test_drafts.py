@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from charts.models import ChartProgressDaily, SearchDocument, Task, TaskStatusEvent
+from wizard import drafts
+from wizard.models import WizardDraft
+from wizard.views import _migrate_session_to_database
+
+
+def _request(session=None, user=None):
+    request = RequestFactory().get("/")
+    request.session = session if session is not None else {}
+    if user is not None:
+        request.user = user
+    return request
+
+
+def _full_draft():
+    return {
+        "title": "Run a marathon",
+        "core_goal": "Run a marathon",
+        "target_date": "2026-10-01",
+        "perspectives": {"self_tangible": "Medal"},
+        "pillars": {
+            str(p): {"name": f"Pillar {p}", "tasks": {str(t): {"title": f"Task {p}.{t}"} for t in range(1, 9)}}
+            for p in range(1, 9)
+        },
+    }
+
+
+@pytest.mark.django_db
+class TestDrafts:
+    def test_session_holds_only_the_token(self):
+        request = _request()
+
+        draft = drafts.save(request, _full_draft())
+
+        assert request.session == {drafts.SESSION_KEY: draft.token}
+        assert drafts.load(_request(dict(request.session)))["title"] == "Run a marathon"
+
+    def test_saving_again_updates_the_same_row(self, settings):
+        settings.WIZARD_DRAFT_TTL = 60
+        session = {}
+        drafts.save(_request(session), {"title": "First"})
+        WizardDraft.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        with CaptureQueriesContext(connection) as run:
+            drafts.save(_request(session), {"title": "Second"})
+
+        draft = WizardDraft.objects.get()
+        assert draft.data == {"title": "Second"}
+        assert draft.updated_at > timezone.now() - timedelta(minutes=1)
+        assert draft.expires_at <= timezone.now() + timedelta(seconds=60)
+        assert len(run.captured_queries) == 2  # look up, update
+
+    def test_expired_drafts_are_ignored(self):
+        session = {}
+        drafts.save(_request(session), {"title": "Old"})
+        WizardDraft.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        assert drafts.load(_request(session)) == {}
+
+    def test_legacy_session_data_is_moved_to_a_draft(self):
+        session = {"temp_chart_id": "temp_abc", "temp_chart_data": {"title": "Legacy"}}
+
+        assert drafts.load(_request(session)) == {"title": "Legacy"}
+        assert list(session) == [drafts.SESSION_KEY]
+        assert WizardDraft.objects.get().data == {"title": "Legacy"}
+
+    def test_discard(self):
+        session = {}
+        drafts.save(_request(session), {"title": "Gone"})
+
+        drafts.discard(_request(session))
+
+        assert session == {}
+        assert not WizardDraft.objects.exists()
+
+    def test_migration_uses_bulk_inserts(self, user):
+        session = {}
+        drafts.save(_request(session), _full_draft())
+        request = _request(session, user=user)
+
+        with CaptureQueriesContext(connection) as run:
+            chart = _migrate_session_to_database(request, "temp_abc")
+
+        assert chart.user == user and chart.is_draft is False
+        assert Task.objects.filter(chart=chart).count() == 64
+        assert SearchDocument.objects.filter(chart=chart).count() == 1 + 8 + 64
+        assert not WizardDraft.objects.exists()
+        assert session == {}
+        inserts = [q for q in run.captured_queries if q["sql"].startswith("INSERT")]
+        # chart, its search document, pillars, tasks, search documents, status events, progress rows
+        assert len(inserts) == 7
+        assert TaskStatusEvent.objects.filter(chart=chart, from_status="", to_status="todo").count() == 64
+        assert ChartProgressDaily.objects.filter(chart=chart).count() == 8
+
+
+@pytest.mark.django_db
+def test_anonymous_wizard_keeps_the_chart_out_of_the_session(client):
+    response = client.post(
+        reverse("create_chart"), {"title": "Learn Japanese"}, content_type="application/json"
+    )
+    chart_id = response.json()["chart_id"]
+
+    client.post(reverse("wizard_step1", args=[chart_id]), {"title": "Learn Japanese", "core_goal": "JLPT N2"})
+
+    assert dict(client.session) == {drafts.SESSION_KEY: WizardDraft.objects.get().token}
+    assert WizardDraft.objects.get().data["core_goal"] == "JLPT N2"
@@ -8,4 +8,9 @@ urlpatterns = [
     path("sign-in/", views.sign_in, name="sign_in"),
     path("dashboard/", views.dashboard, name="dashboard"),
     path("chart/<int:chart_id>/delete/", views.delete_chart, name="delete_chart"),
+    path(
+        "chart/<int:chart_id>/duplicate/",
+        views.duplicate_chart,
+        name="duplicate_chart",
+    ),
 ]
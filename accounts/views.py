@@ -1,9 +1,20 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
+from django.db import transaction
+from django.http import HttpResponseBadRequest
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.conf import settings
 from charts.models import HaradaChart
+from charts.search import search as search_charts
+from charts import tasks as chart_tasks
+from charts.services import clone_chart
+from config.caching import cache_public_page
+from jobs.models import Job, TaskResultStatus
 
 
+@cache_public_page
 def sign_in(request):
     """Sign in view with Clerk."""
     return render(request, "accounts/login.html", {
@@ -11,6 +22,7 @@ def sign_in(request):
     })
 
 
+@cache_public_page
 def sign_up(request):
     """Sign up view with Clerk."""
     # Get redirect URL from query parameters or session
@@ -22,32 +34,64 @@ def sign_up(request):
     })
 
 
+@cache_public_page
 def long_term_goal(request):
     """Long-term Goal method page."""
     return render(request, "method/long_term_goal.html")
 
 
+@cache_public_page
 def five_pillars(request):
     """Five Pillars method page."""
     return render(request, "method/five_pillars.html")
 
 
+@cache_public_page
 def tasks_64(request):
     """64 Tasks method page."""
     return render(request, "method/64_tasks.html")
 
 
+def _pending_deletions(user):
+    """The user's queued or running `charts.tasks.delete_chart` jobs."""
+    return Job.objects.filter(
+        owner=user,
+        task_path=chart_tasks.delete_chart.module_path,
+        status__in=[TaskResultStatus.READY, TaskResultStatus.RUNNING],
+    )
+
+
 @login_required
 def dashboard(request):
     """User dashboard showing all charts."""
-    charts = request.user.harada_charts.all()
+    charts = list(request.user.harada_charts.with_task_counts())
+    deletions = {job.args[0]: job for job in _pending_deletions(request.user)}
+    for chart in charts:
+        chart.deletion_job = deletions.get(chart.id)
     return render(request, "accounts/dashboard.html", {"charts": charts})
 
 
 @login_required
+def search(request):
+    """Full-text search across the user's charts, pillars, tasks and comments."""
+    query = request.GET.get("q", "").strip()
+    results = search_charts(request.user, query) if query else []
+
+    template = "accounts/search_results.html" if request.htmx else "accounts/search.html"
+    return render(request, template, {"query": query, "results": results})
+
+
+@login_required
+@require_POST
 def delete_chart(request, chart_id):
     """
-    Delete a chart after user confirmation.
+    Queue the deletion of a chart after user confirmation.
+
+    The cascade over pillars, tasks and comments runs in a background job
+    (`charts.tasks.delete_chart`), not in the request. Until it finishes the
+    chart is flagged with `deletion_requested_at`, which hides it everywhere
+    but the dashboard. Repeated POSTs (double clicks, retries) return the
+    job already queued instead of queueing another.
 
     Parameters
     ----------
@@ -59,12 +103,61 @@ def delete_chart(request, chart_id):
     Returns
     -------
     HttpResponse
-        Redirects to dashboard on successful deletion.
+        For HTMX, the chart card's "deleting" state, which polls the job;
+        otherwise a redirect to the dashboard.
     """
-    chart = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
-    chart.delete()
+    with transaction.atomic():
+        # The row lock serializes concurrent POSTs for the same chart
+        chart = get_object_or_404(
+            HaradaChart.objects.select_for_update(), id=chart_id, user=request.user
+        )
+        job = _pending_deletions(request.user).filter(args__0=chart.id).first()
+        if job is None:
+            if chart.deletion_requested_at is None:
+                chart.deletion_requested_at = timezone.now()
+                HaradaChart.objects.filter(id=chart.id).update(
+                    deletion_requested_at=chart.deletion_requested_at
+                )
+            job = chart_tasks.delete_chart.using(owner=request.user).enqueue(chart.id)
+    if request.htmx:
+        return render(request, "accounts/chart_deleting.html", {"chart": chart, "job": job})
     return redirect("dashboard")
 
 
+@login_required
+@require_POST
+def duplicate_chart(request, chart_id):
+    """
+    Duplicate a chart with its pillars and tasks as a template.
 
+    Parameters
+    ----------
+    request : HttpRequest
+        The HTTP request object. Optional POST fields: ``title``,
+        ``target_date``, ``keep_status`` and ``include_comments``.
+    chart_id : int
+        The ID of the chart to duplicate.
 
+    Returns
+    -------
+    HttpResponse
+        Redirects to the new chart's matrix view, or 400 when
+        ``target_date`` is not a valid YYYY-MM-DD date.
+    """
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
+    target_date = None
+    if request.POST.get("target_date"):
+        try:
+            target_date = parse_date(request.POST["target_date"])
+        except ValueError:
+            pass  # well formatted but impossible, e.g. 2026-02-30
+        if target_date is None:
+            return HttpResponseBadRequest("Invalid target date")
+    copy = clone_chart(
+        chart,
+        title=request.POST.get("title", "").strip() or None,
+        target_date=target_date,
+        reset_status="keep_status" not in request.POST,
+        include_comments="include_comments" in request.POST,
+    )
+    return redirect("matrix_view", chart_id=copy.id)
@@ -0,0 +1,466 @@
+"""Asyncio load generator running scripted user journeys against a local server.
+
+Each virtual user N signs in with the Django session of user loadtest_N,
+created ahead of the run by ``manage.py loadtest_sessions`` (no Clerk token
+is involved), and loops over a journey until the run ends:
+
+    create  wizard create -> step 1 -> step 2 -> step 3 -> matrix
+            -> task modal -> task update -> comment
+    browse  dashboard -> matrix -> task modal -> task update
+
+Results are reported per endpoint (throughput, mean, p50/p95/p99 latency)
+and written as JSON, by default to benchmarks/results/<commit>.json, so
+runs from different commits can be compared:
+
+    python manage.py migrate
+    python manage.py seed_bench --users 100   # users loadtest_0..99 for browse
+    python manage.py loadtest_sessions --users 20 --out sessions.json
+    gunicorn -c gunicorn_config.py &
+    python benchmarks/loadtest.py --sessions sessions.json --users 20 --duration 60
+    python benchmarks/loadtest.py compare results/abc123.json results/def456.json
+
+Pass --direct when the server runs with DEBUG=True (e.g. runserver).
+
+Only the standard library is used, so it runs from any Python 3.11+.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+_ID_SEGMENT = re.compile(r"/(\d+|temp_[0-9a-f]+)(?=/)")
+_CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+_CSRF_HEADER = re.compile(r'"X-CSRFToken": "([^"]+)"')
+_TASK_CELL = re.compile(r'id="task-cell-(\d+)"')
+_MATRIX_LINK = re.compile(r'href="/matrix/(\d+)/"')
+
+
+class JourneyError(Exception):
+    """A response did not match what the journey expects."""
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", "replace")
+
+
+@dataclass
+class Stats:
+    """Latency samples (seconds) and error counts per endpoint."""
+
+    samples: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        self.samples.setdefault(endpoint, []).append(seconds)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """Group requests by route: numeric and temporary ids become {id}."""
+    return f"{method} {_ID_SEGMENT.sub('/{id}', path.split('?', 1)[0])}"
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client with a cookie jar.
+
+    With `behind_proxy` it sends X-Forwarded-Proto: https and https
+    Origin/Referer headers as nginx would, so a server with DEBUG=False
+    neither redirects to HTTPS nor fails the CSRF origin check.
+    """
+
+    def __init__(self, base_url: str, stats: Stats, timeout: float = 30, behind_proxy: bool = True):
+        parts = urlsplit(base_url)
+        self.origin = f"{'https' if behind_proxy else parts.scheme}://{parts.netloc}"
+        self.behind_proxy = behind_proxy
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.host_header = parts.netloc
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies: dict[str, str] = {}
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def request(self, method, path, *, data=None, json_body=None, headers=None) -> Response:
+        body = b""
+        extra = dict(headers or {})
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            extra["Content-Type"] = "application/json"
+        elif data is not None:
+            body = urlencode(data).encode()
+            extra["Content-Type"] = "application/x-www-form-urlencoded"
+
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = await asyncio.wait_for(
+                self._send(method, path, body, extra), self.timeout
+            )
+            ok = response.status < 400
+            return response
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+            await self.close()
+            raise JourneyError(f"{method} {path}: {exc!r}") from exc
+        finally:
+            self.stats.record(endpoint_name(method, path), time.perf_counter() - started, ok)
+
+    async def _send(self, method, path, body, extra) -> Response:
+        for attempt in (1, 2):
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self._writer.write(self._encode(method, path, body, extra))
+                await self._writer.drain()
+                return await self._read_response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # The server may close an idle keep-alive connection; retry once
+                await self.close()
+                if attempt == 2:
+                    raise
+        raise AssertionError("unreachable")
+
+    def _encode(self, method, path, body, extra) -> bytes:
+        headers = {
+            "Host": self.host_header,
+            "User-Agent": "harada-loadtest",
+            "Accept": "text/html,application/json",
+            "Connection": "keep-alive",
+            "Origin": self.origin,
+            "Referer": f"{self.origin}{path}",
+            **extra,
+        }
+        if self.behind_proxy:
+            headers["X-Forwarded-Proto"] = "https"
+        if body or method == "POST":
+            headers["Content-Length"] = str(len(body))
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        head = f"{method} {path} HTTP/1.1\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+        return head.encode("latin-1") + b"\r\n" + body
+
+    async def _read_response(self) -> Response:
+        status_line = await self._reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers: dict[str, str] = {}
+        while True:
+            line = await self._reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "set-cookie":
+                self._store_cookie(value)
+            else:
+                headers[name] = value
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self._read_chunked()
+        else:
+            body = await self._reader.readexactly(int(headers.get("content-length", 0)))
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return Response(status, headers, body)
+
+    async def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int((await self._reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                await self._reader.readuntil(b"\r\n")
+                return b"".join(chunks)
+            chunks.append(await self._reader.readexactly(size))
+            await self._reader.readexactly(2)
+
+    def _store_cookie(self, header: str):
+        name, _, rest = header.partition("=")
+        value = rest.split(";", 1)[0]
+        if value and "max-age=0" not in rest.lower():
+            self.cookies[name.strip()] = value
+        else:
+            self.cookies.pop(name.strip(), None)
+
+
+def _expect(response: Response, *statuses: int) -> Response:
+    if response.status not in statuses:
+        raise JourneyError(f"expected {statuses}, got {response.status}")
+    return response
+
+
+def _find(pattern: re.Pattern, response: Response, what: str) -> str:
+    match = pattern.search(response.text)
+    if not match:
+        raise JourneyError(f"no {what} in response")
+    return match.group(1)
+
+
+class VirtualUser:
+    """One signed-in user running journeys with its own connection and cookies."""
+
+    def __init__(self, number: int, client: HttpClient, rng: random.Random, cookie: tuple[str, str]):
+        self.number = number
+        self.client = client
+        self.rng = rng
+        name, session_key = cookie
+        client.cookies[name] = session_key
+
+    async def create(self):
+        client, rng = self.client, self.rng
+        response = _expect(
+            await client.request(
+                "POST", "/wizard/create-chart/",
+                json_body={"title": f"Load test goal {rng.randrange(10**6)}"},
+            ),
+            200,
+        )
+        chart_id = json.loads(response.body)["chart_id"]
+
+        step1 = f"/wizard/{chart_id}/step1/"
+        token = _find(_CSRF_INPUT, _expect(await client.request("GET", step1), 200), "CSRF token")
+        _expect(await client.request("POST", step1, data={
+            "csrfmiddlewaretoken": token,
+            "title": "Load test chart",
+            "core_goal": "Sustain realistic traffic",
+            "target_date": "2026-12-31",
+            "self_tangible": "Numbers", "self_intangible": "Confidence",
+            "others_tangible": "Fast pages", "others_intangible": "Trust",
+            "action": "manual",
+        }), 302)
+
+        step2 = f"/wizard/{chart_id}/step2/"
+        token = _find(_CSRF_INPUT, _expect(await client.request("GET", step2), 200), "CSRF token")
+        pillars = {f"pillar_{i}": f"Pillar {i}" for i in range(1, 9)}
+        _expect(await client.request("POST", step2, data={"csrfmiddlewaretoken": token, **pillars}), 302)
+
+        step3 = f"/wizard/{chart_id}/step3/"
+        token = _find(_CSRF_INPUT, _expect(await client.request("GET", step3), 200), "CSRF token")
+        tasks = {
+            f"pillar_{p}_task_{t}": f"Task {p}.{t}"
+            for p in range(1, 9) for t in range(1, 9)
+        }
+        _expect(await client.request("POST", step3, data={"csrfmiddlewaretoken": token, **tasks}), 302)
+
+        await self._work_on_chart(chart_id, comment=True)
+
+    async def browse(self):
+        client = self.client
+        dashboard = _expect(await client.request("GET", "/dashboard/"), 200)
+        chart_ids = _MATRIX_LINK.findall(dashboard.text)
+        if not chart_ids:
+            # Nothing to browse yet: make a chart first
+            await self.create()
+            return
+        await self._work_on_chart(self.rng.choice(chart_ids), comment=False)
+
+    async def _work_on_chart(self, chart_id, *, comment: bool):
+        client, rng = self.client, self.rng
+        matrix = _expect(await client.request("GET", f"/matrix/{chart_id}/"), 200)
+        csrf = {"X-CSRFToken": _find(_CSRF_HEADER, matrix, "HTMX CSRF header"), "HX-Request": "true"}
+        task_id = rng.choice(_TASK_CELL.findall(matrix.text) or [None])
+        if task_id is None:
+            raise JourneyError("matrix has no tasks")
+
+        _expect(await client.request(
+            "GET", f"/matrix/{chart_id}/task/{task_id}/modal/", headers={"HX-Request": "true"}
+        ), 200)
+        _expect(await client.request(
+            "POST", f"/matrix/{chart_id}/task/{task_id}/update/",
+            data={"status": rng.choice(["todo", "in_progress", "done"])}, headers=csrf,
+        ), 200)
+        if comment:
+            _expect(await client.request(
+                "POST", f"/matrix/{chart_id}/task/{task_id}/comment/",
+                data={"content": "Progress note from the load test"}, headers=csrf,
+            ), 200)
+
+
+def load_sessions(path: Path, users: int) -> list[tuple[str, str]]:
+    """(cookie name, session key) per virtual user, from a loadtest_sessions file."""
+    data = json.loads(path.read_text())
+    if len(data["sessions"]) < users:
+        raise SystemExit(f"{path} has {len(data['sessions'])} sessions; run loadtest_sessions --users {users}")
+    return [(data["cookie"], key) for key in data["sessions"][:users]]
+
+
+async def run_user(number, args, stats: Stats, deadline: float, journeys: list[str], cookie: tuple[str, str]):
+    rng = random.Random(args.seed + number)
+    client = HttpClient(args.base_url, stats, timeout=args.timeout, behind_proxy=not args.direct)
+    user = VirtualUser(number, client, rng, cookie)
+    completed = failed = 0
+    try:
+        while time.monotonic() < deadline and (not args.iterations or completed + failed < args.iterations):
+            journey = getattr(user, rng.choice(journeys))
+            try:
+                await journey()
+                completed += 1
+            except JourneyError as exc:
+                failed += 1
+                if args.verbose:
+                    print(f"user {number}: {exc}", file=sys.stderr)
+    finally:
+        await client.close()
+    return completed, failed
+
+
+def percentile(sorted_samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_samples)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def summarize(stats: Stats, elapsed: float) -> dict[str, dict]:
+    endpoints = {}
+    for name, samples in sorted(stats.samples.items()):
+        ordered = sorted(samples)
+        endpoints[name] = {
+            "count": len(ordered),
+            "errors": stats.errors.get(name, 0),
+            "rps": round(len(ordered) / elapsed, 2),
+            "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        }
+    return endpoints
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> dict:
+    stats = Stats()
+    journeys = args.journeys.split(",")
+    cookies = load_sessions(args.sessions, args.users)
+    started = time.monotonic()
+    deadline = started + args.duration
+    results = await asyncio.gather(*(
+        run_user(n, args, stats, deadline, journeys, cookies[n]) for n in range(args.users)
+    ))
+    elapsed = time.monotonic() - started
+    total_requests = sum(map(len, stats.samples.values()))
+
+    return {
+        "commit": args.label or current_commit(),
+        "base_url": args.base_url,
+        "users": args.users,
+        "journeys": journeys,
+        "seed": args.seed,
+        "elapsed_s": round(elapsed, 2),
+        "journeys_completed": sum(c for c, _ in results),
+        "journeys_failed": sum(f for _, f in results),
+        "requests": total_requests,
+        "rps": round(total_requests / elapsed, 2) if elapsed else 0,
+        "endpoints": summarize(stats, elapsed),
+    }
+
+
+def compare(baseline: dict, current: dict) -> str:
+    """Per-endpoint p50/p95/p99 and throughput change from `baseline` to `current`."""
+    lines = [
+        f"{baseline['commit']} -> {current['commit']}",
+        f"{'endpoint':<52} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16} {'rps':>14}",
+    ]
+    for name in sorted(set(baseline["endpoints"]) | set(current["endpoints"])):
+        old = baseline["endpoints"].get(name)
+        new = current["endpoints"].get(name)
+        if not old or not new:
+            lines.append(f"{name:<52} {'only in ' + ('current' if new else 'baseline'):>16}")
+            continue
+        cells = [
+            _delta(old[key], new[key]) for key in ("p50_ms", "p95_ms", "p99_ms", "rps")
+        ]
+        lines.append(f"{name:<52} {cells[0]:>16} {cells[1]:>16} {cells[2]:>16} {cells[3]:>14}")
+    return "\n".join(lines)
+
+
+def _delta(old: float, new: float) -> str:
+    change = (new - old) * 100 / old if old else 0.0
+    return f"{new:.1f} ({change:+.0f}%)"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command")
+
+    cmp_parser = sub.add_parser("compare", help="Compare two result files.")
+    cmp_parser.add_argument("baseline", type=Path)
+    cmp_parser.add_argument("current", type=Path)
+
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--sessions", type=Path, help="Session cookies written by manage.py loadtest_sessions (required for runs)."
+    )
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=30, help="Run length in seconds.")
+    parser.add_argument("--iterations", type=int, default=0, help="Stop each user after N journeys (0: no limit).")
+    parser.add_argument("--journeys", default="create,browse", help="Comma-separated journeys to mix.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument(
+        "--direct", action="store_true",
+        help="Server runs with DEBUG=True: don't pretend to come through the HTTPS proxy.",
+    )
+    parser.add_argument("--label", help="Name for this run (default: current git commit).")
+    parser.add_argument("--out", type=Path, help="Result file (default: benchmarks/results/<label>.json).")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        baseline, current = (json.loads(p.read_text()) for p in (args.baseline, args.current))
+        print(compare(baseline, current))
+        return 0
+
+    if args.sessions is None:
+        parser.error("--sessions is required: run manage.py loadtest_sessions first")
+    result = asyncio.run(run(args))
+    out = args.out or RESULTS_DIR / f"{result['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2) + "\n")
+
+    print(json.dumps({k: v for k, v in result.items() if k != "endpoints"}, indent=2))
+    for name, row in result["endpoints"].items():
+        print(f"{name:<52} n={row['count']:<6} p50={row['p50_ms']:>8}ms p95={row['p95_ms']:>8}ms p99={row['p99_ms']:>8}ms err={row['errors']}")
+    print(f"Results written to {out}")
+    return 1 if result["journeys_failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
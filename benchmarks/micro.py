@@ -0,0 +1,254 @@
+"""Microbenchmarks for the matrix and wizard hot paths, with stored baselines.
+
+Runs against a throwaway test database seeded with `seed_bench` (fixed seed),
+times each benchmark and compares the median per-call time with
+benchmarks/baselines.json:
+
+    python benchmarks/micro.py                   # compare, exit 1 on regression
+    python benchmarks/micro.py --threshold 0.1   # flag anything 10% slower
+    python benchmarks/micro.py --update-baseline # record new baselines
+    python benchmarks/micro.py --only matrix_view_cold --repeat 20
+
+Baselines are only comparable on the machine that recorded them; the file
+keeps the platform and Python version and the runner warns on a mismatch.
+Fix a regression rather than re-recording over it. When a change really
+must be slower, move only that benchmark (--update-baseline --only NAME)
+in the same commit and say why.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines.json"
+
+DEFAULT_THRESHOLD = 0.25
+TARGET_ROUND_SECONDS = 0.2
+
+AI_JSON = json.dumps({
+    "goal": "Run a marathon",
+    "completion_date": "2026-12-31",
+    "pillars": [
+        {"pillar_name": f"Pillar {p}", "tasks": [f"Task {p}.{t}" for t in range(1, 9)]}
+        for p in range(1, 9)
+    ],
+})
+
+
+def setup_django():
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    os.environ.setdefault("SECRET_KEY", "micro-benchmarks")
+    # Production-like: cached template loader and no DEBUG query logging
+    os.environ.setdefault("DEBUG", "False")
+
+    import django
+
+    django.setup()
+
+    # Keep formatting/handler cost in the numbers but not on the terminal;
+    # most stream handlers sit behind config.log's queue listeners
+    import logging
+
+    from config import log
+
+    devnull = open(os.devnull, "w")
+    for handler in log.handlers():
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(devnull)
+
+
+class _Session(dict):
+    modified = False
+
+
+def build_benchmarks() -> dict:
+    """Seed the database and return {name: zero-argument callable}."""
+
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.db import transaction
+    from django.template.loader import render_to_string
+    from django.test import Client, RequestFactory
+    from django.urls import reverse
+    from django.utils import timezone
+    from io import StringIO
+
+    from charts.models import HaradaChart
+    from charts.services import checked_in_task_ids
+    from matrix.services import build_matrix_grid, load_chart_snapshot
+    from matrix.views import COLOR_CLASSES
+    from wizard import drafts
+    from wizard.views import _migrate_session_to_database
+
+    call_command("seed_bench", users=1, charts=10, comments=1, seed=42, stdout=StringIO())
+    user = User.objects.get(username="loadtest_0")
+    chart = HaradaChart.objects.filter(user=user).order_by("id").first()
+
+    client = Client()
+    client.force_login(user)
+
+    def rolled_back(fn):
+        def run():
+            with transaction.atomic():
+                fn()
+                transaction.set_rollback(True)
+        return run
+
+    def render_matrix_template():
+        snapshot = load_chart_snapshot(chart)
+        tasks = [t for p in snapshot.pillars for t in p.tasks_by_pos.values()]
+        checked_in = checked_in_task_ids(tasks, timezone.localdate())
+        for task in tasks:
+            task.checked_in_today = task.id in checked_in
+        render_to_string("matrix/view.html", {
+            "chart": chart,
+            "grid": build_matrix_grid(chart, snapshot),
+            "pillars": snapshot.pillars,
+            "completion_percentage": snapshot.completion_percentage,
+            "color_classes": COLOR_CLASSES,
+            "position_range": range(1, 9),
+        })
+
+    def matrix_view_cold():
+        cache.clear()
+        client.get(reverse("matrix_view", args=[chart.id]), secure=True)
+
+    temp_data = {
+        "id": "temp_bench",
+        "title": "Session chart",
+        "core_goal": "Finish the wizard",
+        "target_date": "2026-12-31",
+        "perspectives": {},
+        "pillars": {
+            str(p): {
+                "name": f"Pillar {p}",
+                "tasks": {str(t): {"title": f"Task {p}.{t}"} for t in range(1, 9)},
+            }
+            for p in range(1, 9)
+        },
+    }
+    factory = RequestFactory()
+
+    def migrate_session():
+        request = factory.post("/")
+        request.user = user
+        request.session = _Session()
+        drafts.save(request, temp_data)
+        _migrate_session_to_database(request, "temp_bench")
+
+    ai_url = reverse("ai_inspiration", args=[chart.id])
+
+    def ai_inspiration_import():
+        response = client.post(ai_url, {"json_input": AI_JSON}, secure=True)
+        assert response.status_code == 302, response.status_code
+
+    return {
+        "build_matrix_grid": lambda: build_matrix_grid(chart),
+        "matrix_template_render": render_matrix_template,
+        "matrix_view_cold": matrix_view_cold,
+        "completion_percentage": lambda: chart.completion_percentage,
+        "migrate_session_to_database": rolled_back(migrate_session),
+        "ai_inspiration_import": rolled_back(ai_inspiration_import),
+        "dashboard": lambda: client.get(reverse("dashboard"), secure=True),
+    }
+
+
+def measure(fn, repeat: int) -> dict:
+    """Median and minimum per-call time in ms over `repeat` rounds."""
+
+    fn()  # warm-up: imports, template compilation, connection setup
+    started = time.perf_counter()
+    fn()
+    single = max(time.perf_counter() - started, 1e-6)
+    number = max(1, int(TARGET_ROUND_SECONDS / single))
+
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - started) / number)
+
+    return {
+        "median_ms": round(statistics.median(rounds) * 1000, 3),
+        "min_ms": round(min(rounds) * 1000, 3),
+        "calls": number * repeat,
+    }
+
+
+def find_regressions(baselines: dict, results: dict, threshold: float) -> list[str]:
+    """Names of benchmarks whose median grew by more than `threshold` (a fraction)."""
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline and result["median_ms"] > baseline["median_ms"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def machine() -> dict:
+    return {"platform": platform.platform(), "python": platform.python_version()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown as a fraction (default: {DEFAULT_THRESHOLD}).")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed rounds per benchmark.")
+    parser.add_argument("--only", action="append", help="Run only this benchmark (repeatable).")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases
+
+    locmem = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    with override_settings(CACHES={"default": locmem, "shared": locmem}):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            benchmarks = build_benchmarks()
+            names = args.only or list(benchmarks)
+            results = {name: measure(benchmarks[name], args.repeat) for name in names}
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    stored = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    baselines = stored.get("benchmarks", {})
+    if stored.get("machine") and stored["machine"] != machine():
+        print(f"warning: baselines were recorded on {stored['machine']}", file=sys.stderr)
+
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        change = (
+            f"{(result['median_ms'] / baseline['median_ms'] - 1) * 100:+6.1f}%"
+            if baseline else "   new"
+        )
+        print(f"{name:<30} {result['median_ms']:>10.3f} ms  (min {result['min_ms']:.3f})  {change}")
+
+    if args.update_baseline:
+        stored = {"machine": machine(), "benchmarks": {**baselines, **results}}
+        BASELINE_FILE.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"Baselines written to {BASELINE_FILE}")
+        return 0
+
+    regressions = find_regressions(baselines, results, args.threshold)
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
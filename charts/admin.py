@@ -1,7 +1,40 @@
 from django.contrib import admin
-from .models import HaradaChart, Pillar, Task, TaskComment
+from .models import (
+    ChartProgressDaily,
+    ChartShareLink,
+    HaradaChart,
+    Pillar,
+    RoutineCheckIn,
+    Task,
+    TaskComment,
+    TaskStatusEvent,
+)
+from .services import resync_progress_day
+
+
+class TaskAdmin(admin.ModelAdmin):
+    """Admin edits skip the status events, so re-seed today's summary after each."""
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        resync_progress_day(obj.chart_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        resync_progress_day(obj.chart_id)
+
+    def delete_queryset(self, request, queryset):
+        chart_ids = set(queryset.values_list("chart_id", flat=True))
+        super().delete_queryset(request, queryset)
+        for chart_id in chart_ids:
+            resync_progress_day(chart_id)
+
 
 admin.site.register(HaradaChart)
 admin.site.register(Pillar)
-admin.site.register(Task)
+admin.site.register(Task, TaskAdmin)
 admin.site.register(TaskComment)
+admin.site.register(TaskStatusEvent)
+admin.site.register(ChartProgressDaily)
+admin.site.register(RoutineCheckIn)
+admin.site.register(ChartShareLink)
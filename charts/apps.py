@@ -2,4 +2,9 @@ from django.apps import AppConfig
 
 
 class ChartsConfig(AppConfig):
+    # What the migrations were generated with; the project sets no DEFAULT_AUTO_FIELD
+    default_auto_field = 'django.db.models.BigAutoField'
     name = 'charts'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects the search index receivers)
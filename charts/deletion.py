@@ -0,0 +1,111 @@
+"""Chunked deletion of charts and whole accounts.
+
+`HaradaChart.delete()` goes through Django's cascade collector, which loads
+every pillar, task, comment, status event and check-in into memory and
+deletes them in per-object batches so signal receivers can run. Here each
+table is emptied child-first by raw ``DELETE ... WHERE id IN (...)``
+statements of at most DELETE_CHUNK_SIZE rows, one transaction per chunk.
+The chart rows go last, so an interrupted run leaves no dangling
+references and running it again carries on where it stopped.
+
+Raw deletes skip signals, so this module does their work: search documents
+are deleted like any other table and the charts' cache generations are
+bumped at the end.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from config import generations
+
+from .models import (
+    ChartProgressDaily,
+    ChartShareLink,
+    HaradaChart,
+    Pillar,
+    RoutineCheckIn,
+    SearchDocument,
+    Task,
+    TaskComment,
+    TaskStatusEvent,
+)
+
+# Every table holding chart data, children before the tables they point at,
+# with the lookup from a row to its chart ("" for the chart itself)
+CHART_TABLES = [
+    (SearchDocument, "chart__"),
+    (ChartShareLink, "chart__"),
+    (TaskStatusEvent, "chart__"),
+    (ChartProgressDaily, "chart__"),
+    (RoutineCheckIn, "task__chart__"),
+    (TaskComment, "task__chart__"),
+    (Task, "chart__"),
+    (Pillar, "chart__"),
+    (HaradaChart, ""),
+]
+
+Progress = Callable[[int, int], None]
+
+
+def _delete_in_chunks(querysets, chunk_size: int, progress: Progress | None) -> int:
+    total = sum(queryset.count() for queryset in querysets) if progress else 0
+    done = 0
+    if progress:
+        progress(done, total)
+    for queryset in querysets:
+        model = queryset.model
+        while True:
+            with transaction.atomic(using=queryset.db):
+                ids = list(queryset.values_list("id", flat=True)[:chunk_size])
+                if ids:
+                    # No collector, no signals: one DELETE statement
+                    model._base_manager.using(queryset.db).filter(id__in=ids)._raw_delete(queryset.db)
+            done += len(ids)
+            if ids and progress:
+                progress(done, total)
+            if len(ids) < chunk_size:
+                break
+    return done
+
+
+def _bump_caches(chart_ids):
+    for chart_id in chart_ids:
+        generations.bump(generations.chart_namespace(chart_id))
+
+
+def delete_charts(
+    chart_ids: Iterable[int], *, chunk_size: int | None = None, progress: Progress | None = None
+) -> int:
+    """Delete charts with everything that belongs to them; returns rows deleted.
+
+    `progress(done, total)` is called after each chunk. Charts that do not
+    exist are ignored, so the call can be repeated after an interruption.
+    """
+    chart_ids = list(chart_ids)
+    querysets = [
+        model._base_manager.filter(**{f"{prefix}id__in": chart_ids}) for model, prefix in CHART_TABLES
+    ]
+    deleted = _delete_in_chunks(querysets, chunk_size or settings.DELETE_CHUNK_SIZE, progress)
+    _bump_caches(chart_ids)
+    return deleted
+
+
+def delete_account(user_id: int, *, chunk_size: int | None = None, progress: Progress | None = None) -> int:
+    """Delete a user's charts in chunks, then the user; returns rows deleted.
+
+    Only the user row itself (and its few auth relations) goes through the
+    cascade collector, once no chart data is left to collect.
+    """
+    chart_ids = list(HaradaChart.objects.filter(user_id=user_id).values_list("id", flat=True))
+    querysets = [
+        model._base_manager.filter(**{f"{prefix}user_id": user_id}) for model, prefix in CHART_TABLES
+    ]
+    deleted = _delete_in_chunks(querysets, chunk_size or settings.DELETE_CHUNK_SIZE, progress)
+    _bump_caches(chart_ids)
+    user_rows, _ = User.objects.filter(id=user_id).delete()
+    return deleted + user_rows
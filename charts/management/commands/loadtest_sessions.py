@@ -0,0 +1,42 @@
+import json
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from .seed_bench import DEFAULT_PREFIX
+
+
+class Command(BaseCommand):
+    help = (
+        "Sign in the load-test users the way the test client's force_login does and "
+        "write their session cookies as JSON for benchmarks/loadtest.py --sessions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="Username prefix.")
+        parser.add_argument("--out", help="File to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        store_class = import_module(settings.SESSION_ENGINE).SessionStore
+        keys = []
+        for number in range(options["users"]):
+            # The create journey works without seeded data, so make missing users
+            user, _ = User.objects.get_or_create(username=f"{options['prefix']}{number}")
+            session = store_class()
+            session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+            session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+            session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+            session.create()
+            keys.append(session.session_key)
+
+        data = json.dumps({"cookie": settings.SESSION_COOKIE_NAME, "sessions": keys}, indent=2) + "\n"
+        if options["out"]:
+            with open(options["out"], "w") as out:
+                out.write(data)
+            self.stderr.write(f"Wrote {len(keys)} sessions to {options['out']}")
+        else:
+            self.stdout.write(data, ending="")
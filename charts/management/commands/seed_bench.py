@@ -0,0 +1,185 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from charts import search
+from charts.deletion import delete_account
+from charts.models import HaradaChart, Pillar, Task, TaskComment
+
+# Load-test virtual user N signs in as "<prefix>N" (see benchmarks/loadtest.py)
+DEFAULT_PREFIX = "loadtest_"
+
+WORDS = (
+    "daily practice review plan write read train build share learn teach track "
+    "morning evening weekly budget savings health sleep run stretch meditate "
+    "journal project client design launch test ship fix refactor mentor network "
+    "family friends community volunteer habit focus energy balance goal progress "
+    "portfolio course chapter workout meal prep call meeting outline draft edit"
+).split()
+
+PILLAR_NAMES = [
+    "Technical Skills", "Marketing", "Mental Health", "Finance", "Community",
+    "Design", "Operations", "Learning", "Fitness", "Relationships", "Career",
+    "Creativity", "Mindset", "Nutrition", "Leadership", "Rest",
+]
+
+COLORS = [value for value, _ in Pillar.COLOR_CHOICES]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a reproducible synthetic dataset for benchmarks and load tests: "
+        "N users x M charts x 8 pillars x 64 tasks x ~K comments per task."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--charts", type=int, default=3, help="Charts per user.")
+        parser.add_argument("--comments", type=float, default=0.5, help="Mean comments per task.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--chunk-size", type=int, default=2000,
+            help="Rows per INSERT; users are committed in batches of about this many tasks.",
+        )
+        parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="Username prefix.")
+        parser.add_argument(
+            "--flush", action="store_true",
+            help="Delete existing users with the prefix first, --chunk-size rows per DELETE.",
+        )
+        parser.add_argument("--no-search-index", action="store_true", help="Skip filling the search index.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.chunk_size = options["chunk_size"]
+        self.index = not options["no_search_index"]
+        prefix = options["prefix"]
+
+        if options["flush"]:
+            # Chunked raw deletes: the cascade collector would load every row into memory
+            user_ids = list(User.objects.filter(username__startswith=prefix).values_list("id", flat=True))
+            deleted = sum(delete_account(user_id, chunk_size=self.chunk_size) for user_id in user_ids)
+            self.stdout.write(f"Deleted {deleted} existing rows")
+
+        started = time.monotonic()
+
+        tasks_per_user = options["charts"] * 64
+        users_per_batch = max(1, self.chunk_size // max(tasks_per_user, 1))
+        totals = dict.fromkeys(("users", "charts", "pillars", "tasks", "comments"), 0)
+
+        for first in range(0, options["users"], users_per_batch):
+            numbers = range(first, min(first + users_per_batch, options["users"]))
+            with transaction.atomic():
+                counts = self._seed_users(prefix, numbers, options["charts"], options["comments"])
+            for key, value in counts.items():
+                totals[key] += value
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {totals['users']}/{options['users']} users, {totals['tasks']} tasks")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            "Seeded " + ", ".join(f"{n} {name}" for name, n in totals.items())
+            + f" in {elapsed:.1f}s ({totals['tasks'] / elapsed if elapsed else 0:.0f} tasks/s)"
+        ))
+
+    def _seed_users(self, prefix, numbers, charts_per_user, mean_comments):
+        rng = self.rng
+        users = User.objects.bulk_create(
+            [
+                User(username=f"{prefix}{n}", email=f"{prefix}{n}@bench.invalid", password="!")
+                for n in numbers
+            ],
+            batch_size=self.chunk_size,
+        )
+
+        charts = HaradaChart.objects.bulk_create(
+            [
+                HaradaChart(
+                    user=user,
+                    title=self._sentence(2, 6).title(),
+                    core_goal=self._sentence(6, 20),
+                    target_date=date(2026, 12, 31) + timedelta(days=rng.randrange(-180, 540)),
+                    is_draft=rng.random() < 0.1,
+                    perspectives={
+                        key: self._sentence(3, 10)
+                        for key in ("self_tangible", "self_intangible", "others_tangible", "others_intangible")
+                    },
+                )
+                for user in users
+                for _ in range(charts_per_user)
+            ],
+            batch_size=self.chunk_size,
+        )
+
+        pillars = Pillar.objects.bulk_create(
+            [
+                Pillar(chart=chart, name=name, color=COLORS[position - 1], position=position)
+                for chart in charts
+                for position, name in enumerate(rng.sample(PILLAR_NAMES, 8), 1)
+            ],
+            batch_size=self.chunk_size,
+        )
+
+        # Each chart gets its own completion level so dashboards show a spread
+        progress = {chart.id: rng.betavariate(2, 3) for chart in charts}
+        tasks = Task.objects.bulk_create(
+            [
+                Task(
+                    chart_id=pillar.chart_id,
+                    pillar=pillar,
+                    title=self._sentence(2, 8).capitalize(),
+                    description="" if rng.random() < 0.4 else self._sentence(8, 40),
+                    frequency="routine" if rng.random() < 0.35 else "one_time",
+                    status=self._status(progress[pillar.chart_id]),
+                    position=position,
+                )
+                for pillar in pillars
+                for position in range(1, 9)
+            ],
+            batch_size=self.chunk_size,
+        )
+
+        owners = {chart.id: chart.user_id for chart in charts}
+        comments = TaskComment.objects.bulk_create(
+            [
+                TaskComment(task=task, user_id=owners[task.chart_id], content=self._sentence(4, 60))
+                for task in tasks
+                for _ in range(self._comment_count(mean_comments))
+            ],
+            batch_size=self.chunk_size,
+        )
+
+        if self.index:
+            # bulk_create skips the post_save signal that normally indexes
+            objects = [*charts, *pillars, *tasks, *comments]
+            for start in range(0, len(objects), self.chunk_size):
+                search.index_objects(objects[start:start + self.chunk_size])
+
+        return {
+            "users": len(users),
+            "charts": len(charts),
+            "pillars": len(pillars),
+            "tasks": len(tasks),
+            "comments": len(comments),
+        }
+
+    def _sentence(self, low, high):
+        # Skewed towards short texts with a long tail, like real input
+        length = min(high, low + int(self.rng.expovariate(3 / (high - low + 1))))
+        return " ".join(self.rng.choices(WORDS, k=length))
+
+    def _status(self, progress):
+        roll = self.rng.random()
+        if roll < progress:
+            return "done"
+        if roll < progress + 0.15:
+            return "in_progress"
+        return "todo"
+
+    def _comment_count(self, mean):
+        if mean <= 0:
+            return 0
+        return int(self.rng.expovariate(1 / mean))
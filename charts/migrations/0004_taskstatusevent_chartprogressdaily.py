@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charts', '0003_taskcomment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChartProgressDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('todo_count', models.PositiveIntegerField(default=0)),
+                ('in_progress_count', models.PositiveIntegerField(default=0)),
+                ('done_count', models.PositiveIntegerField(default=0)),
+                ('chart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_days', to='charts.haradachart')),
+                ('pillar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='charts.pillar')),
+            ],
+            options={
+                'ordering': ['date', 'pillar'],
+                'unique_together': {('chart', 'pillar', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('todo', 'To Do'), ('in_progress', 'In Progress'), ('done', 'Done')], help_text='Empty when the task was created with its first status', max_length=20)),
+                ('to_status', models.CharField(choices=[('todo', 'To Do'), ('in_progress', 'In Progress'), ('done', 'Done')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('chart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='charts.haradachart')),
+                ('pillar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='charts.pillar')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='charts.task')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['chart', 'created_at'], name='charts_task_chart_i_b078d7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,122 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Full-text index over charts_searchdocument, per database vendor.
+SEARCH_INDEX_SQL = {
+    "sqlite": [
+        """
+        CREATE VIRTUAL TABLE charts_searchdocument_fts USING fts5(
+            title, body,
+            content='charts_searchdocument', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+        """,
+        """
+        CREATE TRIGGER charts_searchdocument_ai AFTER INSERT ON charts_searchdocument BEGIN
+            INSERT INTO charts_searchdocument_fts(rowid, title, body)
+            VALUES (new.id, new.title, new.body);
+        END
+        """,
+        """
+        CREATE TRIGGER charts_searchdocument_ad AFTER DELETE ON charts_searchdocument BEGIN
+            INSERT INTO charts_searchdocument_fts(charts_searchdocument_fts, rowid, title, body)
+            VALUES ('delete', old.id, old.title, old.body);
+        END
+        """,
+        """
+        CREATE TRIGGER charts_searchdocument_au AFTER UPDATE ON charts_searchdocument BEGIN
+            INSERT INTO charts_searchdocument_fts(charts_searchdocument_fts, rowid, title, body)
+            VALUES ('delete', old.id, old.title, old.body);
+            INSERT INTO charts_searchdocument_fts(rowid, title, body)
+            VALUES (new.id, new.title, new.body);
+        END
+        """,
+    ],
+    "postgresql": [
+        """
+        ALTER TABLE charts_searchdocument ADD COLUMN document tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(body, '')), 'B')
+        ) STORED
+        """,
+        "CREATE INDEX charts_searchdocument_document_gin ON charts_searchdocument USING GIN (document)",
+    ],
+}
+
+DROP_SEARCH_INDEX_SQL = {
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS charts_searchdocument_ai",
+        "DROP TRIGGER IF EXISTS charts_searchdocument_ad",
+        "DROP TRIGGER IF EXISTS charts_searchdocument_au",
+        "DROP TABLE IF EXISTS charts_searchdocument_fts",
+    ],
+    "postgresql": [],  # dropped together with the table
+}
+
+
+def create_search_index(apps, schema_editor):
+    for statement in SEARCH_INDEX_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    for statement in DROP_SEARCH_INDEX_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def backfill_documents(apps, schema_editor):
+    """Index every existing chart, pillar, task and comment."""
+    HaradaChart = apps.get_model("charts", "HaradaChart")
+    Pillar = apps.get_model("charts", "Pillar")
+    Task = apps.get_model("charts", "Task")
+    TaskComment = apps.get_model("charts", "TaskComment")
+    SearchDocument = apps.get_model("charts", "SearchDocument")
+
+    def documents():
+        for chart in HaradaChart.objects.iterator():
+            body = "\n".join([chart.core_goal, *map(str, (chart.perspectives or {}).values())])
+            yield SearchDocument(kind="chart", object_id=chart.id, chart_id=chart.id, title=chart.title, body=body)
+        for pillar in Pillar.objects.iterator():
+            yield SearchDocument(kind="pillar", object_id=pillar.id, chart_id=pillar.chart_id, title=pillar.name)
+        for task in Task.objects.iterator():
+            yield SearchDocument(kind="task", object_id=task.id, chart_id=task.chart_id, title=task.title, body=task.description)
+        for comment in TaskComment.objects.select_related("task").iterator():
+            yield SearchDocument(kind="comment", object_id=comment.id, chart_id=comment.task.chart_id, body=comment.content)
+
+    batch = []
+    for document in documents():
+        batch.append(document)
+        if len(batch) >= 1000:
+            SearchDocument.objects.bulk_create(batch)
+            batch = []
+    SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charts', '0005_routinecheckin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('chart', 'Chart'), ('pillar', 'Pillar'), ('task', 'Task'), ('comment', 'Comment')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('chart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='charts.haradachart')),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:12
+
+import charts.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charts', '0006_searchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='haradachart',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Bumped whenever a pillar or task of the chart changes'),
+        ),
+        migrations.CreateModel(
+            name='ChartShareLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(default=charts.models._new_share_token, max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('revoked_at', models.DateTimeField(blank=True, null=True)),
+                ('chart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='share_links', to='charts.haradachart')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charts', '0007_chartsharelink_haradachart_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='haradachart',
+            name='deletion_requested_at',
+            field=models.DateTimeField(blank=True, help_text='Set when the chart is queued for deletion; hides it', null=True),
+        ),
+    ]
@@ -1,8 +1,27 @@
+import secrets
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
+def _new_share_token():
+    return secrets.token_urlsafe(24)
+
+
+class HaradaChartQuerySet(models.QuerySet):
+    def with_task_counts(self):
+        """Annotate `task_total` and `task_done` for completion_percentage."""
+        return self.annotate(
+            task_total=models.Count("task"),
+            task_done=models.Count("task", filter=models.Q(task__status="done")),
+        )
+
+    def live(self):
+        """Charts not waiting for a `charts.tasks.delete_chart` job."""
+        return self.filter(deletion_requested_at__isnull=True)
+
+
 class HaradaChart(models.Model):
     """
     Represents a 64-cell Harada Method chart.
@@ -22,23 +41,56 @@ class HaradaChart(models.Model):
         default=dict,
         help_text="Four perspectives: self_tangible, self_intangible, others_tangible, others_intangible",
     )
+    version = models.PositiveIntegerField(
+        default=0, help_text="Bumped whenever a pillar or task of the chart changes"
+    )
+    deletion_requested_at = models.DateTimeField(
+        null=True, blank=True, help_text="Set when the chart is queued for deletion; hides it"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = HaradaChartQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
 
     def __str__(self):
         return f"{self.title} ({self.user.username})"
 
+    def save(self, *args, update_fields=None, **kwargs):
+        """Bump `version` in the same UPDATE instead of writing back the loaded value.
+
+        Pillar and task saves bump the version of the row while an instance
+        loaded earlier still holds the old number; writing that back would
+        make the version go backwards and match stale cached renderings.
+        """
+        if self._state.adding:
+            return super().save(*args, update_fields=update_fields, **kwargs)
+        self.version = models.F("version") + 1
+        if update_fields is not None:
+            update_fields = {*update_fields, "version"}
+        super().save(*args, update_fields=update_fields, **kwargs)
+        # Deferred: read back from the row on next access
+        del self.version
+
     @property
     def completion_percentage(self):
-        """Calculate completion % based on tasks marked 'done'."""
-        tasks = self.task_set.all()
-        if tasks.count() == 0:
+        """Calculate completion % based on tasks marked 'done'.
+
+        Uses the `task_total`/`task_done` annotations when the queryset has
+        them (see `HaradaChartQuerySet.with_task_counts`), so chart lists need no query per chart.
+        """
+        total = getattr(self, "task_total", None)
+        if total is None:
+            tasks = self.task_set.all()
+            total = tasks.count()
+            done_count = tasks.filter(status="done").count() if total else 0
+        else:
+            done_count = self.task_done
+        if total == 0:
             return 0
-        done_count = tasks.filter(status="done").count()
-        return round((done_count / tasks.count()) * 100)
+        return round((done_count / total) * 100)
 
 
 class Pillar(models.Model):
@@ -132,3 +184,136 @@ class TaskComment(models.Model):
 
     def __str__(self):
         return f"Comment by {self.user.username} on {self.task.title}"
+
+
+class TaskStatusEvent(models.Model):
+    """
+    Append-only log of task status transitions.
+    One row is written every time a task moves from one status to another.
+    """
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="status_events"
+    )
+    chart = models.ForeignKey(HaradaChart, on_delete=models.CASCADE)
+    pillar = models.ForeignKey(Pillar, on_delete=models.CASCADE)
+    from_status = models.CharField(
+        max_length=20,
+        choices=Task.STATUS_CHOICES,
+        blank=True,
+        help_text="Empty when the task was created with its first status",
+    )
+    to_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["chart", "created_at"])]
+
+    def __str__(self):
+        return f"{self.task.title}: {self.from_status or '-'} -> {self.to_status}"
+
+
+class ChartProgressDaily(models.Model):
+    """
+    Per-pillar, per-day status counts rolled up from TaskStatusEvent.
+    A row holds the counts as they stood at the end of that day; days without
+    any transition for a pillar have no row and carry the previous counts forward.
+    """
+
+    chart = models.ForeignKey(
+        HaradaChart, on_delete=models.CASCADE, related_name="progress_days"
+    )
+    pillar = models.ForeignKey(Pillar, on_delete=models.CASCADE)
+    date = models.DateField()
+    todo_count = models.PositiveIntegerField(default=0)
+    in_progress_count = models.PositiveIntegerField(default=0)
+    done_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("chart", "pillar", "date")
+        ordering = ["date", "pillar"]
+
+    def __str__(self):
+        return f"{self.chart.title} / {self.pillar.name} on {self.date}"
+
+
+class RoutineCheckIn(models.Model):
+    """
+    Daily check-ins for a routine task, packed one bit per day.
+    Each row covers one calendar year: bit N is set when the task was done
+    on day N+1 of that year, so a year fits in 46 bytes.
+    """
+
+    YEAR_BYTES = 46  # 366 days rounded up to whole bytes
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="check_ins")
+    year = models.PositiveSmallIntegerField()
+    days = models.BinaryField(max_length=YEAR_BYTES, default=bytes(YEAR_BYTES))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("task", "year")
+        ordering = ["year"]
+
+    def __str__(self):
+        return f"{self.task.title} check-ins for {self.year}"
+
+    @property
+    def bits(self) -> int:
+        """The year's bitmap as an int (bit N = day N+1)."""
+        return int.from_bytes(bytes(self.days), "little")
+
+    @bits.setter
+    def bits(self, value: int):
+        self.days = value.to_bytes(self.YEAR_BYTES, "little")
+
+
+class SearchDocument(models.Model):
+    """
+    Denormalized text of one chart, pillar, task or comment for search.
+    The full-text index over these rows (FTS5 on SQLite, tsvector + GIN on
+    PostgreSQL) is created in migration 0006 and maintained by the database.
+    """
+
+    KIND_CHOICES = [
+        ("chart", "Chart"),
+        ("pillar", "Pillar"),
+        ("task", "Task"),
+        ("comment", "Comment"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    chart = models.ForeignKey(HaradaChart, on_delete=models.CASCADE)
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        unique_together = ("kind", "object_id")
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
+
+
+class ChartShareLink(models.Model):
+    """
+    Revocable token giving anonymous, read-only access to a chart's matrix.
+    """
+
+    chart = models.ForeignKey(
+        HaradaChart, on_delete=models.CASCADE, related_name="share_links"
+    )
+    token = models.CharField(max_length=64, unique=True, default=_new_share_token)
+    created_at = models.DateTimeField(auto_now_add=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Share link for {self.chart.title}"
+
+    @property
+    def is_active(self):
+        return self.revoked_at is None
@@ -0,0 +1,177 @@
+"""Full-text search over a user's charts, pillars, tasks and comments.
+
+Writes go through the SearchDocument model, so they are the same on every
+database. Queries use the vendor's native index: FTS5 (bm25 + highlight) on
+SQLite and a tsvector GIN index (ts_rank + ts_headline) on PostgreSQL.
+"""
+
+from __future__ import annotations
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import HaradaChart, Pillar, SearchDocument, Task, TaskComment
+
+
+# Highlight markers placed by the database, swapped for <mark> after escaping.
+_START, _STOP = "\x02", "\x03"
+
+MAX_QUERY_TERMS = 8
+
+INDEXED_KINDS = {
+    HaradaChart: "chart",
+    Pillar: "pillar",
+    Task: "task",
+    TaskComment: "comment",
+}
+
+_SQLITE_SEARCH = """
+    SELECT d.kind, d.object_id, d.chart_id, c.title,
+           highlight(charts_searchdocument_fts, 0, %s, %s),
+           snippet(charts_searchdocument_fts, 1, %s, %s, '…', 16)
+    FROM charts_searchdocument_fts
+    JOIN charts_searchdocument d ON d.id = charts_searchdocument_fts.rowid
+    JOIN charts_haradachart c ON c.id = d.chart_id
+    WHERE charts_searchdocument_fts MATCH %s AND c.user_id = %s
+      AND c.deletion_requested_at IS NULL
+    ORDER BY bm25(charts_searchdocument_fts, 10.0, 1.0)
+    LIMIT %s
+"""
+
+_POSTGRES_SEARCH = """
+    SELECT d.kind, d.object_id, d.chart_id, c.title,
+           ts_headline('english', d.title, q, %s),
+           ts_headline('english', d.body, q, %s)
+    FROM charts_searchdocument d
+    JOIN charts_haradachart c ON c.id = d.chart_id,
+         to_tsquery('english', %s) q
+    WHERE d.document @@ q AND c.user_id = %s
+      AND c.deletion_requested_at IS NULL
+    ORDER BY ts_rank(d.document, q) DESC
+    LIMIT %s
+"""
+
+
+def document_for(instance) -> SearchDocument | None:
+    """Build the (unsaved) search document for a model instance."""
+
+    if isinstance(instance, HaradaChart):
+        body = "\n".join([instance.core_goal, *map(str, (instance.perspectives or {}).values())])
+        return SearchDocument(
+            kind="chart", object_id=instance.id, chart_id=instance.id,
+            title=instance.title, body=body,
+        )
+    if isinstance(instance, Pillar):
+        return SearchDocument(
+            kind="pillar", object_id=instance.id, chart_id=instance.chart_id,
+            title=instance.name,
+        )
+    if isinstance(instance, Task):
+        return SearchDocument(
+            kind="task", object_id=instance.id, chart_id=instance.chart_id,
+            title=instance.title, body=instance.description,
+        )
+    if isinstance(instance, TaskComment):
+        return SearchDocument(
+            kind="comment", object_id=instance.id, chart_id=instance.task.chart_id,
+            body=instance.content,
+        )
+    return None
+
+
+def index_objects(instances):
+    """Insert or refresh the search documents for `instances` in one statement."""
+
+    documents = [d for d in map(document_for, instances) if d is not None]
+    if documents:
+        SearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=["kind", "object_id"],
+            update_fields=["chart", "title", "body"],
+        )
+
+
+def remove_object(instance):
+    """Drop the search document for a deleted instance."""
+
+    kind = INDEXED_KINDS.get(type(instance))
+    if kind:
+        SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def _query_terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())[:MAX_QUERY_TERMS]
+
+
+def _highlight(text: str):
+    """Escape database output and turn the highlight markers into <mark> tags."""
+    text = escape(text or "")
+    return mark_safe(text.replace(_START, "<mark>").replace(_STOP, "</mark>"))
+
+
+def search(user, query: str, limit: int = 20) -> list[dict]:
+    """Return the best matches for `query` among `user`'s charts.
+
+    Every term is prefix-matched and all terms must match. Results are
+    ranked by relevance (title hits weigh more than body hits) and carry
+    HTML-safe `title` and `snippet` with matches wrapped in <mark>.
+    """
+
+    terms = _query_terms(query)
+    if not terms:
+        return []
+
+    vendor = connection.vendor
+    if vendor == "sqlite":
+        fts_query = " ".join(f'"{term}"*' for term in terms)
+        sql = _SQLITE_SEARCH
+        params = [_START, _STOP, _START, _STOP, fts_query, user.id, limit]
+    elif vendor == "postgresql":
+        options = f"StartSel={_START}, StopSel={_STOP}"
+        sql = _POSTGRES_SEARCH
+        params = [
+            f"{options}, HighlightAll=TRUE",
+            f"{options}, MaxWords=20, MinWords=8",
+            " & ".join(f"{term}:*" for term in terms),
+            user.id,
+            limit,
+        ]
+    else:
+        return _search_fallback(user, terms, limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return _results(rows)
+
+
+def _search_fallback(user, terms, limit):
+    """Unranked substring search for databases without a native index."""
+
+    documents = SearchDocument.objects.filter(chart__user=user, chart__deletion_requested_at__isnull=True)
+    for term in terms:
+        documents = documents.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    rows = documents.values_list(
+        "kind", "object_id", "chart_id", "chart__title", "title", "body"
+    )[:limit]
+    return _results(rows)
+
+
+def _results(rows):
+    return [
+        {
+            "kind": kind,
+            "object_id": object_id,
+            "chart_id": chart_id,
+            "chart_title": chart_title,
+            "title": _highlight(title),
+            "snippet": _highlight(snippet),
+        }
+        for kind, object_id, chart_id, chart_title, title, snippet in rows
+    ]
@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from config import generations
+
+from . import search
+from .models import (
+    ChartProgressDaily,
+    HaradaChart,
+    Pillar,
+    RoutineCheckIn,
+    Task,
+    TaskComment,
+    TaskStatusEvent,
+)
+
+
+# Maps a task status to its counter column on ChartProgressDaily.
+STATUS_COUNT_FIELDS = {
+    "todo": "todo_count",
+    "in_progress": "in_progress_count",
+    "done": "done_count",
+}
+
+# Number of trailing days used for the routine consistency figure.
+CONSISTENCY_WINDOW = 30
+
+
+def record_status_change(task: Task, from_status: str | None):
+    """Log a status transition for `task` and roll it into today's summary.
+
+    `task` must already be saved with its new status. `from_status` is the
+    status before the change, or None when the task was just created.
+    Returns the new TaskStatusEvent, or None if the status did not change.
+    """
+
+    if from_status == task.status:
+        return None
+
+    with transaction.atomic():
+        event = TaskStatusEvent.objects.create(
+            task=task,
+            chart_id=task.chart_id,
+            pillar_id=task.pillar_id,
+            from_status=from_status or "",
+            to_status=task.status,
+        )
+        _roll_up(task, from_status, timezone.localdate(event.created_at))
+
+    return event
+
+
+def _roll_up(task: Task, from_status: str | None, day):
+    """Apply one transition to the (chart, pillar, day) summary row.
+
+    The first transition of a day for a chart seeds a row per pillar from the
+    live task counts (which already include this transition); every later
+    transition that day is a single UPDATE with F() deltas. Seeding happens
+    under a lock on the chart row: a transition racing the first one waits
+    for it to commit, then finds the seeded row and applies its delta,
+    rather than losing it to a seed that could not see it.
+    """
+
+    changes = {}
+    new_field = STATUS_COUNT_FIELDS.get(task.status)
+    old_field = STATUS_COUNT_FIELDS.get(from_status)
+    if new_field:
+        changes[new_field] = F(new_field) + 1
+    if old_field:
+        # Never below zero, even if a write that skipped the events made the row drift
+        changes[old_field] = Greatest(F(old_field) - 1, 0)
+    if not changes:
+        return
+
+    row = ChartProgressDaily.objects.filter(
+        chart_id=task.chart_id, pillar_id=task.pillar_id, date=day
+    )
+    if row.update(**changes):
+        return
+    list(HaradaChart.objects.select_for_update().filter(id=task.chart_id).values_list("id"))
+    if not row.update(**changes):
+        seed_progress_day(task.chart_id, day)
+
+
+def seed_progress_day(chart_id: int, day):
+    """Create summary rows for every pillar of a chart from live task counts.
+
+    Rows that already exist for `day` are left untouched, so concurrent
+    seeding is harmless.
+    """
+
+    counts: dict[int, dict[str, int]] = {}
+    rows = (
+        Task.objects.filter(chart_id=chart_id)
+        .values("pillar_id", "status")
+        .annotate(n=Count("id"))
+    )
+    for row in rows:
+        field = STATUS_COUNT_FIELDS.get(row["status"])
+        if field:
+            counts.setdefault(row["pillar_id"], {})[field] = row["n"]
+
+    ChartProgressDaily.objects.bulk_create(
+        [
+            ChartProgressDaily(
+                chart_id=chart_id, pillar_id=pillar_id, date=day, **pillar_counts
+            )
+            for pillar_id, pillar_counts in counts.items()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def record_bulk_status_changes(chart_id: int, changes, *, new_chart: bool = False):
+    """Log many transitions of one chart's tasks and re-seed today's summary.
+
+    `changes` holds (task, from_status) pairs as record_status_change takes
+    them, for tasks already saved; unchanged statuses are skipped. For bulk
+    writes (imports, copies, step 3): one INSERT of TaskStatusEvents instead
+    of a record_status_change per task. A `new_chart` has no summary rows
+    to replace, so they are only seeded.
+    """
+
+    with transaction.atomic(savepoint=False):
+        TaskStatusEvent.objects.bulk_create(
+            TaskStatusEvent(
+                task=task,
+                chart_id=chart_id,
+                pillar_id=task.pillar_id,
+                from_status=from_status or "",
+                to_status=task.status,
+            )
+            for task, from_status in changes
+            if from_status != task.status
+        )
+        if new_chart:
+            seed_progress_day(chart_id, timezone.localdate())
+        else:
+            resync_progress_day(chart_id)
+
+
+def resync_progress_day(chart_id: int, day=None):
+    """Rebuild a chart's summary rows for `day` (today) from live task counts.
+
+    For writes that change task statuses without going through
+    record_status_change -- bulk saves, imports, admin edits, deletes --
+    so the next F() delta starts from the real counts.
+    """
+
+    day = day or timezone.localdate()
+    with transaction.atomic():
+        ChartProgressDaily.objects.filter(chart_id=chart_id, date=day).delete()
+        seed_progress_day(chart_id, day)
+
+
+@dataclass
+class RoutineStats:
+    """Streak and consistency figures for one routine task."""
+
+    current_streak: int = 0
+    longest_streak: int = 0
+    consistency: int = 0  # % of the last CONSISTENCY_WINDOW days checked in
+    total: int = 0
+
+
+def _day_bit(day: datetime.date) -> int:
+    return day.timetuple().tm_yday - 1
+
+
+def toggle_check_in(task: Task, day: datetime.date) -> bool:
+    """Flip the check-in for `task` on `day`; return the new state."""
+
+    bit = 1 << _day_bit(day)
+    with transaction.atomic():
+        check_in, _ = RoutineCheckIn.objects.select_for_update().get_or_create(
+            task=task, year=day.year
+        )
+        check_in.bits ^= bit
+        check_in.save(update_fields=["days", "updated_at"])
+    return bool(check_in.bits & bit)
+
+
+def checked_in_task_ids(tasks, day: datetime.date) -> set[int]:
+    """Return the ids of `tasks` that have a check-in on `day` (one query)."""
+
+    bit = 1 << _day_bit(day)
+    rows = RoutineCheckIn.objects.filter(task__in=tasks, year=day.year).values_list(
+        "task_id", "days"
+    )
+    return {
+        task_id
+        for task_id, days in rows
+        if int.from_bytes(bytes(days), "little") & bit
+    }
+
+
+def routine_stats(task: Task, today: datetime.date) -> RoutineStats:
+    """Compute streaks and consistency for `task` as of `today`.
+
+    All yearly bitmaps are stitched into one int (bit N = N days after
+    January 1st of the first year) so runs crossing New Year are counted.
+    """
+
+    rows = list(
+        RoutineCheckIn.objects.filter(task=task, year__lte=today.year)
+        .order_by("year")
+        .values_list("year", "days")
+    )
+    if not rows:
+        return RoutineStats()
+
+    origin = datetime.date(rows[0][0], 1, 1)
+    bits = 0
+    for year, days in rows:
+        offset = (datetime.date(year, 1, 1) - origin).days
+        bits |= int.from_bytes(bytes(days), "little") << offset
+
+    today_index = (today - origin).days
+    bits &= (1 << (today_index + 1)) - 1  # ignore anything after today
+
+    # A streak not yet extended today is still alive until the day is over.
+    streak_end = today_index if bits >> today_index & 1 else today_index - 1
+    window_start = max(0, today_index - CONSISTENCY_WINDOW + 1)
+
+    return RoutineStats(
+        current_streak=_run_ending_at(bits, streak_end),
+        longest_streak=_longest_run(bits),
+        consistency=round((bits >> window_start).bit_count() * 100 / CONSISTENCY_WINDOW),
+        total=bits.bit_count(),
+    )
+
+
+def _run_ending_at(bits: int, end: int) -> int:
+    """Length of the run of set bits ending at bit `end`."""
+    if end < 0:
+        return 0
+    gaps = ~bits & ((1 << (end + 1)) - 1)
+    return end + 1 - gaps.bit_length()
+
+
+def _longest_run(bits: int) -> int:
+    """Length of the longest run of set bits."""
+    length = 0
+    while bits:
+        bits &= bits >> 1
+        length += 1
+    return length
+
+
+def clone_chart(
+    chart: HaradaChart,
+    *,
+    title: str | None = None,
+    target_date=None,
+    reset_status: bool = True,
+    include_comments: bool = False,
+) -> HaradaChart:
+    """Deep-copy `chart` with its pillars and tasks (and optionally comments).
+
+    Runs a fixed number of statements whatever the chart size: one SELECT
+    per related table, one INSERT for the chart, one bulk INSERT per related
+    table and one bulk upsert into the search index, all in one transaction.
+    Status history and routine check-ins are not copied: the copy's history
+    starts with one creation event per task, and today's summary is seeded.
+    """
+
+    with transaction.atomic():
+        # Under READ COMMITTED each SELECT sees its own snapshot, so tasks
+        # are read for the pillars already read, and comments for those
+        # tasks: a pillar or task added in between is left out of the copy
+        # instead of having no counterpart to attach to.
+        pillars = list(chart.pillar_set.all())
+        tasks = list(chart.task_set.filter(pillar_id__in=[p.id for p in pillars]))
+        comments = (
+            list(
+                TaskComment.objects.filter(task_id__in=[t.id for t in tasks]).order_by("created_at")
+            )
+            if include_comments
+            else []
+        )
+
+        copy = HaradaChart.objects.create(
+            user=chart.user,
+            title=title or f"{chart.title} (copy)",
+            core_goal=chart.core_goal,
+            target_date=target_date or chart.target_date,
+            is_draft=chart.is_draft,
+            perspectives=chart.perspectives,
+        )
+
+        new_pillars = Pillar.objects.bulk_create(
+            [
+                Pillar(chart=copy, name=p.name, color=p.color, position=p.position)
+                for p in pillars
+            ]
+        )
+        pillar_map = {old.id: new for old, new in zip(pillars, new_pillars)}
+
+        new_tasks = Task.objects.bulk_create(
+            [
+                Task(
+                    chart=copy,
+                    pillar=pillar_map[t.pillar_id],
+                    title=t.title,
+                    description=t.description,
+                    frequency=t.frequency,
+                    status="todo" if reset_status else t.status,
+                    position=t.position,
+                )
+                for t in tasks
+            ]
+        )
+        task_map = {old.id: new for old, new in zip(tasks, new_tasks)}
+
+        new_comments = TaskComment.objects.bulk_create(
+            [
+                TaskComment(task=task_map[c.task_id], user_id=c.user_id, content=c.content)
+                for c in comments
+            ]
+        )
+
+        # bulk_create skips post_save, so index the copies explicitly
+        search.index_objects([*new_pillars, *new_tasks, *new_comments])
+        record_bulk_status_changes(copy.id, [(task, None) for task in new_tasks], new_chart=True)
+
+    return copy
+
+
+def save_chart_tasks(chart: HaradaChart, titles: dict[tuple[int, int], str]) -> int:
+    """Write the wizard's step-3 task titles, keyed by (pillar id, position).
+
+    Every titled cell becomes a fresh one-time "todo" task, overwriting any
+    task already there. Runs one SELECT, one bulk UPDATE, one bulk INSERT
+    and one search upsert instead of an update_or_create per cell, then
+    bumps the chart version once. Status changes (including new tasks) go
+    through record_bulk_status_changes. Returns the number of tasks written.
+    """
+
+    existing = {
+        (task.pillar_id, task.position): task
+        for task in Task.objects.filter(chart=chart, pillar_id__in={p for p, _ in titles})
+    }
+    now = timezone.now()
+    to_create, to_update = [], []
+    previous_status = {}
+    for (pillar_id, position), title in titles.items():
+        task = existing.get((pillar_id, position)) or Task(pillar_id=pillar_id, position=position)
+        previous_status[id(task)] = task.status if task.pk else None
+        task.chart = chart
+        task.title = title
+        task.description = ""
+        task.status = "todo"
+        task.frequency = "one_time"
+        task.updated_at = now  # bulk_update does not apply auto_now
+        (to_update if task.pk else to_create).append(task)
+
+    with transaction.atomic():
+        Task.objects.bulk_update(
+            to_update, ["chart", "title", "description", "status", "frequency", "updated_at"]
+        )
+        Task.objects.bulk_create(to_create)
+        record_bulk_status_changes(
+            chart.id, [(task, previous_status[id(task)]) for task in [*to_update, *to_create]]
+        )
+        # The bulk calls skip post_save, so do what its receivers would
+        search.index_objects([*to_update, *to_create])
+        HaradaChart.objects.filter(id=chart.id).update(version=F("version") + 1)
+        namespace = generations.chart_namespace(chart.id)
+        generations.bump(namespace)
+        transaction.on_commit(lambda: generations.bump(namespace))
+
+    return len(to_update) + len(to_create)
@@ -0,0 +1,61 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+
+from config import generations
+
+from . import search
+from .models import HaradaChart, Pillar, RoutineCheckIn, Task
+
+
+def _index_on_save(sender, instance, raw=False, **kwargs):
+    """Keep the search index in sync with every saved chart, pillar, task or comment."""
+    if not raw:
+        search.index_objects([instance])
+
+
+def _unindex_on_delete(sender, instance, **kwargs):
+    """Drop deleted objects from the search index."""
+    search.remove_object(instance)
+
+
+for model in search.INDEXED_KINDS:
+    post_save.connect(_index_on_save, sender=model, dispatch_uid=f"search_index_{model.__name__}")
+    post_delete.connect(_unindex_on_delete, sender=model, dispatch_uid=f"search_unindex_{model.__name__}")
+
+
+def _bump_chart_version(sender, instance, origin=None, **kwargs):
+    """Mark the parent chart as changed so cached renderings can be revalidated."""
+    if isinstance(origin, HaradaChart):
+        return  # the chart itself is being deleted
+    HaradaChart.objects.filter(id=instance.chart_id).update(version=F("version") + 1)
+
+
+for model in (Pillar, Task):
+    post_save.connect(_bump_chart_version, sender=model, dispatch_uid=f"chart_version_save_{model.__name__}")
+    post_delete.connect(_bump_chart_version, sender=model, dispatch_uid=f"chart_version_delete_{model.__name__}")
+
+
+def _invalidate_chart_caches(sender, instance, **kwargs):
+    """Bump the chart's cache generation now and again once the write commits.
+
+    The first bump hides stale entries from this worker right away; the
+    second drops anything another worker cached from pre-commit data.
+    """
+    if isinstance(instance, HaradaChart):
+        chart_id = instance.id
+    elif isinstance(instance, RoutineCheckIn):
+        chart_id = instance.task.chart_id
+    else:
+        chart_id = instance.chart_id
+    namespace = generations.chart_namespace(chart_id)
+    generations.bump(namespace)
+    transaction.on_commit(lambda: generations.bump(namespace))
+
+
+for model in (HaradaChart, Pillar, Task):
+    post_save.connect(_invalidate_chart_caches, sender=model, dispatch_uid=f"chart_cache_save_{model.__name__}")
+    post_delete.connect(_invalidate_chart_caches, sender=model, dispatch_uid=f"chart_cache_delete_{model.__name__}")
+
+# Check-ins are only deleted along with their task, which already bumps
+post_save.connect(_invalidate_chart_caches, sender=RoutineCheckIn, dispatch_uid="chart_cache_save_RoutineCheckIn")
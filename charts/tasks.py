@@ -0,0 +1,20 @@
+"""Background tasks for heavy chart operations (see jobs.base)."""
+
+from jobs.base import task
+
+from . import deletion
+
+
+@task(max_attempts=3, takes_context=True)
+def delete_chart(context, chart_id: int) -> int:
+    """Delete a chart with its pillars, tasks and comments; returns rows deleted.
+
+    Deletion resumes where an interrupted attempt stopped, so retries are safe.
+    """
+    return deletion.delete_charts([chart_id], progress=context.task_result.set_progress)
+
+
+@task(max_attempts=3, takes_context=True)
+def delete_account(context, user_id: int) -> int:
+    """Delete a user with all of their charts; returns rows deleted."""
+    return deletion.delete_account(user_id, progress=context.task_result.set_progress)
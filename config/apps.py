@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class ConfigConfig(AppConfig):
+    name = "config"
+    verbose_name = "Project configuration"
+
+    def ready(self):
+        from . import log, memory, pruning, slow_queries  # noqa: F401  (pruning registers its metrics)
+
+        log.start_queues()
+        slow_queries.install()
+        memory.start_tracing()
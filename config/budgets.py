@@ -0,0 +1,62 @@
+"""Per-endpoint query and latency budgets, enforced by Tests/unit/test_budgets.py.
+
+Each URL name maps to the most queries one request may run and the most
+milliseconds it may take against a full 64-task chart, with a cold cache.
+Query counts are deterministic, so budgets are the current counts with no
+headroom: even a single new lazy load (e.g. `task.pillar.color` in a cell
+template) fails the test, which names the SQL and template line that ran
+it. Time limits are loose enough for a slow CI machine and only catch
+order-of-magnitude regressions.
+
+When a change legitimately needs more queries, raise the budget in the
+same commit and say why.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: int
+    ms: float = 500
+
+
+BUDGETS: dict[str, Budget] = {
+    # Public pages render without touching the database
+    "home": Budget(queries=0),
+    "sign_in": Budget(queries=0),
+    # Session + user lookups account for two queries on every signed-in request;
+    # the dashboard adds the charts and the user's pending chart deletions
+    "dashboard": Budget(queries=4),
+    "search": Budget(queries=3),
+    "matrix_view": Budget(queries=6, ms=1000),
+    "progress_view": Budget(queries=4),
+    "task_modal": Budget(queries=6),
+    # The save and its status event share one transaction (+ savepoint pair in tests);
+    # the day's first transition locks the chart and retries its UPDATE before seeding
+    "task_update": Budget(queries=17),
+    "task_check_in": Budget(queries=12),
+    "task_comment_create": Budget(queries=6),
+    "task_create_modal": Budget(queries=4),
+    "task_create": Budget(queries=13),
+    "pillar_modal": Budget(queries=5),
+    "pillar_update": Budget(queries=7),
+    "share_modal": Budget(queries=4),
+    "share_create": Budget(queries=5),
+    "share_revoke": Budget(queries=5),
+    "shared_chart_view": Budget(queries=3, ms=1000),
+    # The copy's creation events and today's progress rows add three INSERT/SELECTs
+    "accounts:duplicate_chart": Budget(queries=19),
+    # Only enqueues the job; the cascade runs in charts.tasks.delete_chart. Locking the
+    # chart, looking for a queued job and flagging the chart add three queries, and
+    # the transaction shows up as a savepoint pair inside the test's own transaction
+    "accounts:delete_chart": Budget(queries=8),
+    "wizard_start": Budget(queries=2),
+    "wizard_step1": Budget(queries=1),
+    "wizard_step2": Budget(queries=1),
+    # Saving all 64 tasks of step 3, then re-seeding today's progress rows
+    "wizard_step3": Budget(queries=18),
+    "wizard_step3_pillar": Budget(queries=4),
+}
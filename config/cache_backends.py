@@ -0,0 +1,247 @@
+"""Two-tier cache: a small in-process LRU in front of a shared cache.
+
+Reads are served from the worker's own memory when possible and fall back to
+the shared tier (file-based locally, Redis in production), which every
+gunicorn worker sees. Local entries live for at most LOCAL_TIMEOUT seconds,
+so a write made by another worker is visible after that delay at the latest.
+
+Configure it like any other backend; LOCATION names the shared cache alias:
+
+    CACHES = {
+        "default": {
+            "BACKEND": "config.cache_backends.TwoTierCache",
+            "LOCATION": "shared",
+            "OPTIONS": {"LOCAL_MAX_ENTRIES": 1000, "LOCAL_TIMEOUT": 5},
+        },
+        "shared": {...},
+    }
+"""
+
+from __future__ import annotations
+
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_MISSING = object()
+
+
+class TwoTierCache(BaseCache):
+    """Bounded, short-lived local LRU backed by a shared cache alias."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._shared_alias = location
+        self._local_max_entries = int(options.get("LOCAL_MAX_ENTRIES", 1000))
+        self._local_timeout = float(options.get("LOCAL_TIMEOUT", 5))
+        # Seconds a recompute may hold the lock before others take over
+        self._lock_timeout = int(options.get("LOCK_TIMEOUT", 30))
+        # How long get_or_set() waits for another process's fresh value
+        self._lock_wait = float(options.get("LOCK_WAIT", 2))
+
+        self._local: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._local_lock = threading.Lock()
+        self._flight_locks: dict[str, threading.Lock] = {}
+        self._flight_guard = threading.Lock()
+        self._stats: Counter[tuple[str, str]] = Counter()
+        # gthread workers count from several threads; Counter += is not atomic
+        self._stats_lock = threading.Lock()
+        self._incr_lock = threading.Lock()
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self._shared_alias]
+
+    # -- local tier -------------------------------------------------------
+
+    def _local_get(self, key):
+        now = time.monotonic()
+        with self._local_lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, payload = entry
+            if expires_at <= now:
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+        return pickle.loads(payload)
+
+    def _local_set(self, key, value, timeout):
+        ttl = self._local_timeout
+        if timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._local_delete(key)
+            return
+        # Pickled like LocMemCache so callers can't mutate the cached copy
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._local_lock:
+            self._local[key] = (time.monotonic() + ttl, payload)
+            self._local.move_to_end(key)
+            while len(self._local) > self._local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, key):
+        with self._local_lock:
+            self._local.pop(key, None)
+
+    # -- stats ------------------------------------------------------------
+
+    def _count(self, key, outcome):
+        with self._stats_lock:
+            self._stats[_prefix(key), outcome] += 1
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Per key-prefix counters: local_hits, shared_hits and misses."""
+        with self._stats_lock:
+            items = list(self._stats.items())
+        result: dict[str, dict[str, int]] = {}
+        for (prefix, outcome), count in items:
+            result.setdefault(prefix, {})[outcome] = count
+        return result
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+    # -- cache API --------------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        value = self._local_get(local_key)
+        if value is not _MISSING:
+            self._count(key, "local_hits")
+            return value
+
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._count(key, "misses")
+            return default
+        self._count(key, "shared_hits")
+        self._local_set(local_key, value, None)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        timeout = self.get_backend_timeout(timeout)
+        self.shared.set(key, value, timeout=timeout, version=version)
+        self._local_set(local_key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        timeout = self.get_backend_timeout(timeout)
+        added = self.shared.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._local_set(local_key, value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self.get_backend_timeout(timeout)
+        return self.shared.touch(key, timeout=timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        """Increment on the shared tier and drop the local copy.
+
+        BaseCache.incr is a get-then-set, which loses updates between
+        workers and would read a stale local value. Redis increments
+        atomically; the lock covers threads of this process for backends
+        (like the file-based one) that do not. `decr` goes through here.
+        """
+        local_key = self.make_and_validate_key(key, version=version)
+        with self._incr_lock:
+            value = self.shared.incr(key, delta, version=version)
+        self._local_delete(local_key)
+        return value
+
+    def delete(self, key, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def clear(self):
+        with self._local_lock:
+            self._local.clear()
+        self.shared.clear()
+
+    def clear_local(self):
+        """Drop this process's copies; the shared tier is untouched."""
+        with self._local_lock:
+            self._local.clear()
+
+    # -- recomputation ----------------------------------------------------
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """Return the cached value for `key`, computing it at most once.
+
+        `default` may be a callable. Concurrent callers in this process wait
+        for a single computation (single-flight). Across processes, a lock
+        key in the shared tier lets one worker recompute while the others
+        wait up to LOCK_WAIT seconds for its result (stampede protection)
+        before computing it themselves.
+        """
+
+        value = self.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+        if not callable(default):
+            self.add(key, default, timeout=timeout, version=version)
+            return self.get(key, default, version=version)
+
+        with self._flight_lock(key, version):
+            # Another thread may have filled it while we waited
+            value = self.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                return value
+
+            lock_key = f"{key}:lock"
+            if self.shared.add(lock_key, 1, timeout=self._lock_timeout, version=version):
+                try:
+                    value = default()
+                    self.set(key, value, timeout=timeout, version=version)
+                finally:
+                    self.shared.delete(lock_key, version=version)
+                return value
+
+            value = self._wait_for(key, version)
+            if value is _MISSING:
+                value = default()
+                self.set(key, value, timeout=timeout, version=version)
+            return value
+
+    def _wait_for(self, key, version):
+        deadline = time.monotonic() + self._lock_wait
+        delay = 0.01
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            value = self.shared.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                self._local_set(self.make_and_validate_key(key, version=version), value, None)
+                return value
+            delay = min(delay * 2, 0.2)
+        return _MISSING
+
+    def _flight_lock(self, key, version) -> threading.Lock:
+        full_key = self.make_key(key, version=version)
+        with self._flight_guard:
+            lock = self._flight_locks.get(full_key)
+            if lock is None:
+                # Locks are tiny; keep the table bounded like the LRU
+                if len(self._flight_locks) > self._local_max_entries:
+                    self._flight_locks = {
+                        k: v for k, v in self._flight_locks.items() if v.locked()
+                    }
+                lock = self._flight_locks[full_key] = threading.Lock()
+            return lock
+
+
+def _prefix(key) -> str:
+    """Counter bucket for a key: everything before the first ':'."""
+    return str(key).partition(":")[0]
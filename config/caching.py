@@ -0,0 +1,81 @@
+"""Whole-page caching for public pages that render the same bytes for everyone.
+
+Django's `cache_page` keys on the full URL plus every `Vary` header, so a
+`Vary: Cookie` page gets one entry per visitor. For anonymous visitors the
+pages wrapped here only depend on the Clerk publishable key, so that is all
+the key holds. Visitors who may be signed in are never served from or
+stored in the cache: their page can carry flash messages queued in the
+session, which would otherwise be shown to every other signed-in visitor.
+"""
+
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+PAGE_CACHE_PREFIX = "page"
+
+# Cookies that mean the visitor may be signed in.
+AUTH_COOKIES = ("__session", settings.SESSION_COOKIE_NAME)
+
+# Pending flash messages are rendered into the page, so never serve it cached.
+MESSAGES_COOKIE = "messages"
+
+
+def _auth_state(request) -> str:
+    return "user" if any(name in request.COOKIES for name in AUTH_COOKIES) else "anon"
+
+
+def page_cache_key(request) -> str:
+    """Cache key for a public page seen by an anonymous visitor.
+
+    The query string is left out on purpose: these templates only read it
+    client-side (e.g. the sign-up `redirect` parameter).
+    """
+    parts = (request.path, settings.CLERK_PUBLISHABLE_KEY or "", _auth_state(request))
+    return f"{PAGE_CACHE_PREFIX}:{md5('|'.join(parts).encode()).hexdigest()}"
+
+
+def _patch_headers(response, request):
+    if _auth_state(request) == "anon":
+        patch_cache_control(response, public=True, max_age=settings.PAGE_CACHE_MAX_AGE)
+    else:
+        patch_cache_control(response, private=True, max_age=settings.PAGE_CACHE_MAX_AGE)
+    patch_vary_headers(response, ["Cookie"])
+    return response
+
+
+def cache_public_page(view):
+    """Serve `view` from the page cache and mark it cacheable downstream.
+
+    Only successful anonymous GET/HEAD responses are stored. Requests
+    carrying flash messages skip the cache entirely; signed-in visitors get
+    a fresh, privately cacheable render.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or MESSAGES_COOKIE in request.COOKIES:
+            return view(request, *args, **kwargs)
+        if _auth_state(request) == "user":
+            response = view(request, *args, **kwargs)
+            return _patch_headers(response, request) if response.status_code == 200 else response
+
+        key = page_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return _patch_headers(HttpResponse(content, content_type=content_type), request)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200 or response.streaming:
+            return response
+        if hasattr(response, "render"):
+            response.render()
+        cache.set(key, (response.content, response["Content-Type"]), settings.PAGE_CACHE_MAX_AGE)
+        return _patch_headers(response, request)
+
+    return wrapper
@@ -8,6 +8,10 @@ class ClerkMiddleware(MiddlewareMixin):
     """Middleware to verify Clerk JWT tokens and sync user data"""
     
     def process_request(self, request):
+        # Public pages never sync users, so they stay cookie-free and cacheable
+        if request.path.startswith(settings.CLERK_EXEMPT_PATHS):
+            return None
+
         # Get the Clerk session token from cookies or headers
         session_token = request.COOKIES.get('__session') or request.META.get('HTTP_AUTHORIZATION', '').replace('Bearer ', '')
         
@@ -0,0 +1,133 @@
+"""Cross-worker cache invalidation through a shared-memory generation table.
+
+Each cache namespace (e.g. "chart:42") has a generation number stored in a
+small file mapped into every gunicorn worker. Cache keys built with
+`namespaced_key()` embed the current generation, so `bump()` in one worker
+makes every cached value of that namespace unreachable in all workers, in
+the local LRU and the shared tier alike. Old entries simply age out.
+
+Reading a generation is a memory read: no query, no syscall. Namespaces are
+hashed into a fixed number of slots, so two namespaces may share a slot;
+that only causes an occasional extra cache miss. The table is per host, so
+all workers must run on the same machine (or share CACHE_GENERATIONS_PATH
+on a tmpfs).
+
+The tmpfs table starts again from zero after a reboot while the shared
+tier (file or Redis) keeps its entries, so the table also holds a random
+epoch chosen when the file is created, and every key embeds it: entries
+cached before the table was recreated can never be read again.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import mmap
+import os
+import secrets
+import struct
+import threading
+import zlib
+
+from django.conf import settings
+
+SLOTS = 4096
+_SLOT = struct.Struct("<Q")
+# The first slot of the file holds the epoch; counters follow it
+_HEADER = _SLOT.size
+# flock only excludes other processes; this excludes gthread threads of this one
+_bump_lock = threading.Lock()
+
+
+class GenerationTable:
+    """Fixed-size table of 64-bit counters in a memory-mapped file."""
+
+    def __init__(self, path, slots: int = SLOTS):
+        self.path = str(path)
+        self.slots = slots
+        self._fd = None
+        self._map = None
+        self._open_lock = threading.Lock()
+
+    def _mapping(self) -> mmap.mmap:
+        if self._map is None:
+            with self._open_lock:
+                if self._map is None:
+                    size = _HEADER + self.slots * _SLOT.size
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o660)
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                    try:
+                        if os.fstat(fd).st_size < size:
+                            os.ftruncate(fd, size)
+                        mapping = mmap.mmap(fd, size, mmap.MAP_SHARED)
+                        if not _SLOT.unpack_from(mapping, 0)[0]:
+                            # A new table: start a new epoch
+                            _SLOT.pack_into(mapping, 0, secrets.randbits(63) | 1)
+                    finally:
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+                    self._map = mapping
+                    self._fd = fd
+        return self._map
+
+    @property
+    def epoch(self) -> int:
+        return _SLOT.unpack_from(self._mapping(), 0)[0]
+
+    def _offset(self, namespace: str) -> int:
+        return _HEADER + zlib.crc32(namespace.encode()) % self.slots * _SLOT.size
+
+    def get(self, namespace: str) -> int:
+        return _SLOT.unpack_from(self._mapping(), self._offset(namespace))[0]
+
+    def bump(self, namespace: str) -> int:
+        """Increment the generation of `namespace` and return the new value."""
+        mapping = self._mapping()
+        offset = self._offset(namespace)
+        # The lock and flock serialise writers across threads and processes;
+        # readers see either the old or the new aligned 8-byte value
+        with _bump_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                value = _SLOT.unpack_from(mapping, offset)[0] + 1
+                _SLOT.pack_into(mapping, offset, value)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return value
+
+
+_table: GenerationTable | None = None
+
+
+def _forget_table():
+    # flock() is per open file description, which fork shares; each worker
+    # must open the table itself for bump() to exclude the others
+    global _table
+    _table = None
+
+
+os.register_at_fork(after_in_child=_forget_table)
+
+
+def get_table() -> GenerationTable:
+    global _table
+    if _table is None or _table.path != str(settings.CACHE_GENERATIONS_PATH):
+        _table = GenerationTable(settings.CACHE_GENERATIONS_PATH)
+    return _table
+
+
+def generation(namespace: str) -> int:
+    return get_table().get(namespace)
+
+
+def bump(namespace: str) -> int:
+    return get_table().bump(namespace)
+
+
+def namespaced_key(namespace: str, *parts) -> str:
+    """Cache key under `namespace` that changes whenever it is bumped."""
+    table = get_table()
+    return ":".join([namespace, f"g{table.epoch:x}.{table.get(namespace)}", *map(str, parts)])
+
+
+def chart_namespace(chart_id) -> str:
+    return f"chart:{chart_id}"
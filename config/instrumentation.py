@@ -0,0 +1,148 @@
+"""Query recording with attribution to the code or template line that ran it.
+
+Used by the budget tests and the DEBUG-time diagnostics. Each query records
+its SQL, duration, the innermost project frame and, when the query was
+triggered while rendering a template, the template name and line.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+_PROJECT_ROOT = str(Path(settings.BASE_DIR).resolve())
+# Frames of these files (and of installed packages) are never the culprit
+_SKIP_DIRS = (
+    "site-packages",
+    "/.venv/",
+    "/config/instrumentation.py",
+    "/config/metrics.py",
+    "/config/nplusone.py",
+    "/config/slow_queries.py",
+    "/config/timing.py",
+)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\((?:\s*%s\s*,?)+\)|\((?:\s*\?\s*,?)+\)")
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL with literals and IN-lists collapsed, for grouping queries by shape."""
+    return _IN_LISTS.sub("(...)", _LITERALS.sub("?", sql))
+
+
+@dataclass
+class RecordedQuery:
+    sql: str
+    duration_ms: float
+    code: str = ""  # innermost project frame, "path.py:123 in func"
+    template: str = ""  # "matrix/task_cell.html:3", if rendering a template
+
+    @property
+    def shape(self) -> str:
+        """SQL with literals and IN-lists collapsed, for spotting repeats."""
+        return normalize_sql(self.sql)
+
+    @property
+    def location(self) -> str:
+        return self.template or self.code or "?"
+
+
+@dataclass
+class QueryLog:
+    queries: list[RecordedQuery] = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.queries)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(q.duration_ms for q in self.queries)
+
+    def repeated_shapes(self, threshold: int = 2) -> list[tuple[str, int, list[str]]]:
+        """(shape, count, distinct locations) for shapes run `threshold`+ times."""
+        counts = Counter(q.shape for q in self.queries)
+        repeated = []
+        for shape, count in counts.most_common():
+            if count < threshold:
+                break
+            locations = sorted({q.location for q in self.queries if q.shape == shape})
+            repeated.append((shape, count, locations))
+        return repeated
+
+    def report(self) -> str:
+        lines = [f"{len(self)} queries, {self.total_ms:.1f}ms"]
+        for number, query in enumerate(self.queries, 1):
+            lines.append(f"  {number:>3}. [{query.location}] {query.sql[:300]}")
+        for shape, count, locations in self.repeated_shapes():
+            lines.append(f"  repeated x{count} from {', '.join(locations)}: {shape[:200]}")
+        return "\n".join(lines)
+
+
+def attribute(frame) -> tuple[str, str]:
+    """Find the innermost project frame and template node above `frame`."""
+    code = template = ""
+    while frame is not None and not (code and template):
+        filename = frame.f_code.co_filename
+        if not template and frame.f_code.co_name == "render_annotated":
+            node = frame.f_locals.get("self")
+            token = getattr(node, "token", None)
+            origin = getattr(node, "origin", None)
+            if token is not None and origin is not None:
+                template = f"{origin.template_name}:{token.lineno}"
+        if (
+            not code
+            and filename.startswith(_PROJECT_ROOT)
+            and not any(part in filename for part in _SKIP_DIRS)
+        ):
+            code = f"{filename[len(_PROJECT_ROOT) + 1:]}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return code, template
+
+
+class _Recorder:
+    def __init__(self, log: QueryLog):
+        self.log = log
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            code, template = attribute(sys._getframe(1))
+            self.log.queries.append(
+                RecordedQuery(
+                    sql=sql if isinstance(sql, str) else str(sql),
+                    duration_ms=(time.perf_counter() - started) * 1000,
+                    code=code,
+                    template=template,
+                )
+            )
+
+
+@contextmanager
+def record_queries(using=None):
+    """Record every query run on `using` (default: all connections) in the block."""
+    log = QueryLog()
+    recorder = _Recorder(log)
+    aliases = [using] if using else list(connections)
+    with _wrap_all(aliases, recorder):
+        yield log
+
+
+@contextmanager
+def _wrap_all(aliases, wrapper):
+    if not aliases:
+        yield
+        return
+    with connections[aliases[0]].execute_wrapper(wrapper):
+        with _wrap_all(aliases[1:], wrapper):
+            yield
@@ -0,0 +1,160 @@
+"""Logging plumbing: off-thread handlers, JSON output and redaction.
+
+Request threads never write log output themselves: `start_queues()` (run
+from ConfigConfig.ready) moves the LOG_QUEUE_HANDLERS behind a queue each,
+and a listener thread per handler does the formatting and the I/O. The
+request thread only renders the message and any traceback, then enqueues.
+
+`JsonFormatter` writes one object per line, including the ``timing`` dict
+that ServerTimingMiddleware attaches. Wrap big values in `truncated()` so a
+pasted payload costs a bounded log line, and only when the line is emitted.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from django.conf import settings
+
+_HANDSHAKE_MARKER = "__clerk_handshake="
+_HANDSHAKE = re.compile(r'__clerk_handshake=[^&\s"]+')
+
+
+class ClerkHandshakeFilter(logging.Filter):
+    """Remove Clerk authentication handshake tokens from logs."""
+
+    def filter(self, record):
+        message = record.getMessage()
+        # A substring test is far cheaper than the regex on the usual miss
+        if _HANDSHAKE_MARKER in message:
+            record.msg = _HANDSHAKE.sub(_HANDSHAKE_MARKER + "***", message)
+            record.args = None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, pid, message, timing, exc."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        timing = getattr(record, "timing", None)
+        if timing is not None:
+            entry["timing"] = timing
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class Truncated:
+    """Log argument that renders `value` cut to `limit` characters, lazily."""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value, limit: int):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        text = str(self.value)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}... ({len(text) - self.limit} more chars)"
+
+    __repr__ = __str__
+
+
+def truncated(value, limit: int | None = None) -> Truncated:
+    return Truncated(value, settings.LOG_PAYLOAD_LIMIT if limit is None else limit)
+
+
+# -- queues -------------------------------------------------------------------
+
+
+class _PreparedQueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Unlike the stdlib version, leave formatting to the real handler's
+        # formatter; only resolve what must not cross threads (args may be
+        # mutated later, tracebacks hold frames)
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listeners: list[tuple[_PreparedQueueHandler, QueueListener]] = []
+
+
+def _loggers():
+    yield logging.getLogger()
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger):
+            yield logger
+
+
+def start_queues(names=None):
+    """Put the named handlers behind queues served by listener threads."""
+    names = set(settings.LOG_QUEUE_HANDLERS if names is None else names)
+    queued: dict[logging.Handler, QueueHandler] = {}
+    for logger in _loggers():
+        for index, handler in enumerate(logger.handlers):
+            if handler.name not in names or isinstance(handler, QueueHandler):
+                continue
+            if handler not in queued:
+                records = queue.SimpleQueue()
+                queued[handler] = _PreparedQueueHandler(records)
+                listener = QueueListener(records, handler, respect_handler_level=True)
+                listener.start()
+                _listeners.append((queued[handler], listener))
+            logger.handlers[index] = queued[handler]
+
+
+def handlers():
+    """Every handler in use, including the ones served by queue listeners."""
+    seen = []
+    for logger in _loggers():
+        for handler in logger.handlers:
+            if isinstance(handler, QueueHandler):
+                continue
+            if handler not in seen:
+                seen.append(handler)
+    for _, listener in _listeners:
+        seen.extend(handler for handler in listener.handlers if handler not in seen)
+    return seen
+
+
+def stop_queues():
+    """Flush and stop every listener; records logged afterwards are dropped."""
+    for _, listener in _listeners:
+        if listener._thread is not None:
+            listener.stop()
+
+
+def _restart_after_fork():
+    # The listener threads did not survive the fork (gunicorn preloads the
+    # app in the master); start fresh ones on fresh queues
+    for handler, listener in _listeners:
+        handler.queue = listener.queue = queue.SimpleQueue()
+        listener._thread = None
+        listener.start()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+atexit.register(stop_queues)
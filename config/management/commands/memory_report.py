@@ -0,0 +1,48 @@
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.memory import top_growth
+
+
+class Command(BaseCommand):
+    help = (
+        "Diff each worker's first tracemalloc snapshot against its latest one "
+        "and list the allocation sites that grew the most."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pid", type=int, action="append", help="Only this worker (repeatable).")
+        parser.add_argument("--top", type=int, default=15, help="Sites per worker (default: 15).")
+        parser.add_argument("--by-traceback", action="store_true", help="Group by full traceback, not by line.")
+        parser.add_argument("--dir", default=None, help="Snapshot directory (default: settings.MEMORY_DIR).")
+
+    def handle(self, *args, **options):
+        root = Path(options["dir"] or settings.MEMORY_DIR)
+        workers = sorted(
+            (path for path in root.glob("*") if path.is_dir() and path.name.isdigit()),
+            key=lambda path: int(path.name),
+        )
+        if options["pid"]:
+            workers = [path for path in workers if int(path.name) in options["pid"]]
+        if not workers:
+            raise CommandError(f"No snapshots in {root}; is TRACEMALLOC_FRAMES set?")
+
+        key_type = "traceback" if options["by_traceback"] else "lineno"
+        for directory in workers:
+            snapshots = sorted(directory.glob("*.tracemalloc"))
+            if len(snapshots) < 2:
+                self.stdout.write(f"worker {directory.name}: only {len(snapshots)} snapshot(s), skipping")
+                continue
+            first, last = snapshots[0], snapshots[-1]
+            old = tracemalloc.Snapshot.load(str(first))
+            new = tracemalloc.Snapshot.load(str(last))
+            growth = sum(stat.size_diff for stat in new.compare_to(old, "filename"))
+            self.stdout.write(self.style.WARNING(
+                f"worker {directory.name}: {first.stem} -> {last.stem}, {growth / 2**20:+.1f} MiB traced"
+            ))
+            for line in top_growth(old, new, options["top"], key_type):
+                self.stdout.write(f"  {line}")
+            self.stdout.write("")
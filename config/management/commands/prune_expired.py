@@ -0,0 +1,39 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from config import pruning
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions and wizard drafts in small batches, then "
+        "report each table's size, rows pruned and growth over the last hour."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Rows per DELETE (default: settings.PRUNE_BATCH_SIZE).")
+        parser.add_argument("--pause", type=float, default=None, help="Seconds between batches (default: settings.PRUNE_PAUSE).")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many rows per table; the next run carries on.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report, delete nothing.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        report = []
+        for table in pruning.TABLES:
+            pruned = 0
+            if not options["dry_run"]:
+                pruned = pruning.prune(
+                    table, batch_size=options["batch_size"], pause=options["pause"], limit=options["limit"]
+                )
+            report.append({"table": table.name, "pruned": pruned, **pruning.table_stats(table)})
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        for row in report:
+            self.stdout.write(
+                f"{row['table']:<24} {row['rows']:>9} rows  pruned {row['pruned']:>7}  "
+                f"still expired {row['expired']:>7}  +{row['written_last_hour']}/h"
+            )
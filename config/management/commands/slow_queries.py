@@ -0,0 +1,89 @@
+import json
+import statistics
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarize the slow-query log by query shape: count, total and "
+        "median/max time, and the views and template lines that ran it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--log", default=None, help="Log file (default: settings.SLOW_QUERY_LOG).")
+        parser.add_argument("--hours", type=float, default=None, help="Only samples from the last N hours.")
+        parser.add_argument("--top", type=int, default=20, help="Number of shapes to show (default: 20).")
+        parser.add_argument(
+            "--sort", choices=["total", "count", "max"], default="total",
+            help="Order shapes by total time (default), sample count or slowest sample.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+
+    def handle(self, *args, **options):
+        path = options["log"] or settings.SLOW_QUERY_LOG
+        since = timezone.now() - timedelta(hours=options["hours"]) if options["hours"] else None
+        try:
+            samples = list(self._read(path, since))
+        except FileNotFoundError:
+            raise CommandError(f"No slow-query log at {path}")
+
+        summary = summarize(samples)
+        key = {"total": "total_ms", "count": "count", "max": "max_ms"}[options["sort"]]
+        summary.sort(key=lambda row: row[key], reverse=True)
+        summary = summary[:options["top"]]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+
+        self.stdout.write(f"{len(samples)} slow queries, {len(summary)} shapes shown\n")
+        for row in summary:
+            self.stdout.write(self.style.WARNING(
+                f"{row['count']:>6}x  total {row['total_ms']:.0f}ms  "
+                f"median {row['median_ms']:.0f}ms  max {row['max_ms']:.0f}ms"
+            ))
+            self.stdout.write(f"        {row['sql'][:400]}")
+            for location, count in row["locations"][:5]:
+                self.stdout.write(f"        {count:>5}x {location}")
+            self.stdout.write("")
+
+    def _read(self, path, since):
+        with open(path) as log:
+            for number, line in enumerate(log, 1):
+                try:
+                    sample = json.loads(line)
+                except json.JSONDecodeError:
+                    self.stderr.write(f"Skipping malformed line {number}")
+                    continue
+                if since and datetime.fromisoformat(sample["ts"]) < since:
+                    continue
+                yield sample
+
+
+def summarize(samples) -> list[dict]:
+    """Group samples by normalized SQL; one row per shape."""
+    by_shape = defaultdict(list)
+    for sample in samples:
+        by_shape[sample["sql"]].append(sample)
+
+    rows = []
+    for sql, group in by_shape.items():
+        durations = [sample["duration_ms"] for sample in group]
+        locations = defaultdict(int)
+        for sample in group:
+            where = sample.get("template") or sample.get("code") or "?"
+            locations[f"{sample.get('view') or '-'} @ {where}"] += 1
+        rows.append({
+            "sql": sql,
+            "count": len(group),
+            "total_ms": round(sum(durations), 2),
+            "median_ms": round(statistics.median(durations), 2),
+            "max_ms": round(max(durations), 2),
+            "locations": sorted(locations.items(), key=lambda item: -item[1]),
+        })
+    return rows
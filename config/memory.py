@@ -0,0 +1,216 @@
+"""Per-worker memory gauges and tracemalloc snapshots for leak hunting.
+
+Gauges: after a request, at most every MEMORY_GAUGE_INTERVAL seconds,
+each worker publishes its RSS/PSS/private memory and (when tracing)
+tracemalloc's traced bytes to /internal/metrics/, labelled with its pid.
+Counting live gc-tracked objects walks the whole heap while holding the
+GIL, which stalls every request thread of the worker for the walk, so a
+background thread does it only every MEMORY_OBJECTS_INTERVAL seconds. A
+worker whose private memory climbs while its siblings stay flat is the
+one to look at.
+
+Allocation sites: with TRACEMALLOC_FRAMES > 0, tracing starts when Django
+loads and the same background thread dumps a snapshot to
+MEMORY_DIR/<pid>/ every MEMORY_SNAPSHOT_INTERVAL seconds (gunicorn's
+post_worker_init starts it). `manage.py memory_report` diffs each worker's first snapshot
+against its latest; /internal/memory/ does the same live for whichever
+worker answers, against that worker's own baseline.
+
+Tracing costs CPU and memory (roughly 30% and tens of MiB), so turn it on
+for a leak hunt rather than permanently.
+"""
+
+from __future__ import annotations
+
+import gc
+import linecache
+import os
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
+from django.utils import timezone
+
+from . import metrics
+from .warmup import format_memory, memory_usage
+
+MEMORY = metrics.Gauge("harada_process_memory_bytes", "Worker memory by kind (rss, pss, private).")
+OBJECTS = metrics.Gauge("harada_process_gc_objects", "Objects tracked by the garbage collector.")
+TRACED = metrics.Gauge("harada_tracemalloc_traced_bytes", "Memory traced by tracemalloc (current).")
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+# -- gauges -------------------------------------------------------------------
+
+_last_update = 0.0
+_update_lock = threading.Lock()
+
+
+def count_objects():
+    OBJECTS.set(len(gc.get_objects()))
+
+
+def update_gauges(force: bool = False):
+    """Publish the cheap gauges; `force` (the internal endpoint) also counts objects."""
+    global _last_update
+    now = time.monotonic()
+    if not force and now - _last_update < settings.MEMORY_GAUGE_INTERVAL:
+        return
+    if not _update_lock.acquire(blocking=False):
+        return  # another thread of this worker is on it
+    try:
+        _last_update = now
+        for kind, kib in memory_usage().items():
+            MEMORY.set(kib * 1024, kind=kind)
+        if force:
+            count_objects()
+        if tracemalloc.is_tracing():
+            TRACED.set(tracemalloc.get_traced_memory()[0])
+    finally:
+        _update_lock.release()
+
+
+metrics.register_updater(update_gauges)
+
+
+# -- tracemalloc --------------------------------------------------------------
+
+_baseline: tracemalloc.Snapshot | None = None
+_baseline_taken = None
+
+
+def start_tracing():
+    if settings.TRACEMALLOC_FRAMES and not tracemalloc.is_tracing():
+        tracemalloc.start(settings.TRACEMALLOC_FRAMES)
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+
+def baseline(reset: bool = False) -> tracemalloc.Snapshot:
+    """This worker's reference snapshot, taken on first use or on reset."""
+    global _baseline, _baseline_taken
+    if _baseline is None or reset:
+        _baseline = take_snapshot()
+        _baseline_taken = timezone.now()
+    return _baseline
+
+
+def _forget_baseline():
+    global _baseline, _baseline_taken
+    _baseline = _baseline_taken = None
+
+
+# A forked worker starts from its own baseline, not the master's
+os.register_at_fork(after_in_child=_forget_baseline)
+
+
+def top_growth(old: tracemalloc.Snapshot, new: tracemalloc.Snapshot, limit=20, key_type="lineno") -> list[str]:
+    """Allocation sites that grew the most from `old` to `new`, formatted."""
+    lines = []
+    for stat in new.compare_to(old, key_type)[:limit]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  "
+            f"{stat.size / 1024:10.1f} KiB total  {frame.filename}:{frame.lineno}"
+        )
+        if key_type == "traceback":
+            lines.extend(f"{'':>8}{frame.filename}:{frame.lineno}" for frame in list(stat.traceback)[1:])
+    return lines
+
+
+def snapshot_dir(pid: int | None = None) -> Path:
+    return Path(settings.MEMORY_DIR) / str(pid or os.getpid())
+
+
+def dump_snapshot() -> Path:
+    """Write this worker's snapshot, keeping the first and the newest few."""
+    directory = snapshot_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    # Microseconds: two dumps in one second must not overwrite each other
+    # (the first file of the directory is the kept baseline)
+    path = directory / f"{timezone.now():%Y%m%dT%H%M%S.%f}.tracemalloc"
+    take_snapshot().dump(str(path))
+    snapshots = sorted(directory.glob("*.tracemalloc"))
+    for old in snapshots[1:-settings.MEMORY_SNAPSHOT_KEEP]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def _background_loop(objects_interval: float, snapshot_interval: float | None):
+    next_count = next_snapshot = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if now >= next_count:
+            count_objects()
+            next_count = now + objects_interval
+        if snapshot_interval and now >= next_snapshot:
+            try:
+                dump_snapshot()
+            except OSError:
+                pass  # a full disk must not kill the worker
+            next_snapshot = now + snapshot_interval
+        wake = min(next_count, next_snapshot) if snapshot_interval else next_count
+        time.sleep(max(0.0, wake - time.monotonic()))
+
+
+def start_background():
+    """Count objects and dump snapshots from a daemon thread (one per worker)."""
+    snapshot_interval = settings.MEMORY_SNAPSHOT_INTERVAL if tracemalloc.is_tracing() else None
+    threading.Thread(
+        target=_background_loop,
+        args=(settings.MEMORY_OBJECTS_INTERVAL, snapshot_interval or None),
+        name="memory-monitor",
+        daemon=True,
+    ).start()
+
+
+# -- endpoint -----------------------------------------------------------------
+
+
+def memory_view(request):
+    """Live report for the worker that serves the request.
+
+    ?top=N limits the allocation sites, ?traceback=1 groups by traceback,
+    ?reset=1 starts a new baseline.
+    """
+    if not metrics.is_internal_request(request):
+        raise Http404
+    try:
+        top = int(request.GET.get("top", 20))
+    except ValueError:
+        top = 0
+    if top < 1:
+        return HttpResponseBadRequest("top must be a positive integer\n", content_type="text/plain")
+
+    update_gauges(force=True)
+    lines = [
+        f"pid {os.getpid()}: {format_memory(memory_usage())}, {len(gc.get_objects())} gc objects",
+        f"gc collections per generation: {[stats['collections'] for stats in gc.get_stats()]}",
+    ]
+    if not tracemalloc.is_tracing():
+        lines.append("tracemalloc is off; set TRACEMALLOC_FRAMES to trace allocation sites")
+    else:
+        current, peak = tracemalloc.get_traced_memory()
+        reset = request.GET.get("reset") == "1"
+        old = baseline(reset=reset)
+        lines.append(
+            f"tracemalloc: {current / 2**20:.1f}MiB traced, peak {peak / 2**20:.1f}MiB; "
+            f"baseline from {_baseline_taken:%Y-%m-%d %H:%M:%S}"
+        )
+        if not reset:
+            key_type = "traceback" if request.GET.get("traceback") == "1" else "lineno"
+            lines.append(f"Top {top} allocation sites since the baseline:")
+            lines.extend(top_growth(old, take_snapshot(), top, key_type))
+    return HttpResponse("\n".join(lines) + "\n", content_type="text/plain; charset=utf-8")
@@ -0,0 +1,468 @@
+"""Prometheus-format metrics shared by all gunicorn workers.
+
+Each process keeps its counters in its own memory-mapped file under
+METRICS_DIR (``metrics_<pid>.db``), so recording is a dict lookup and an
+8-byte write, with no locking between processes. The endpoint at
+/internal/metrics/ sums the files of every worker, dead ones included, so
+counters stay monotonic when gunicorn recycles a worker; gunicorn's
+on_starting hook empties the directory on each (re)start. So that
+recycled workers do not pile up files, `compact()` (run on every scrape
+and from gunicorn's child_exit hook) folds the counters of dead workers
+into one ``aggregate.db`` and deletes their files. One-off commands
+(prune_expired, every 15 minutes) count with `Counter.inc_aggregate()`,
+straight into that file, rather than leaving a file of their own.
+
+Per URL name we record request counts by status, a latency histogram,
+query counts and time, and server errors. Cache lookups are copied from
+the TwoTierCache per-prefix stats after each request. Values that only
+make sense at scrape time come from `register_collector()`; per-worker
+gauges are labelled with the pid and disappear when that worker exits.
+
+The endpoint only answers direct requests from METRICS_ALLOWED_IPS; anything
+that came through nginx (X-Forwarded-For set) gets a 404.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+
+from .timing import current_timings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_INITIAL_SIZE = 64 * 1024
+_USED = struct.Struct("<Q")
+_KEY_LENGTH = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+
+
+class ValueFile:
+    """Append-only map of key -> float in a memory-mapped file, one writer process.
+
+    Layout: an 8-byte "bytes used" header, then entries of a 4-byte key
+    length, the UTF-8 key padded to 8 bytes and an 8-byte double.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._offsets: dict[str, int] = {}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o640)
+        size = max(os.fstat(self._fd).st_size, _INITIAL_SIZE)
+        os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size, mmap.MAP_SHARED)
+        self._used = _USED.unpack_from(self._map, 0)[0] or _USED.size
+        for key, _, offset in _entries(self._map, self._used):
+            self._offsets[key] = offset
+
+    def add(self, key: str, amount: float):
+        with self._lock:
+            offset = self._offsets.get(key)
+            if offset is None:
+                offset = self._append(key)
+            value = _VALUE.unpack_from(self._map, offset)[0]
+            _VALUE.pack_into(self._map, offset, value + amount)
+
+    def set(self, key: str, value: float):
+        with self._lock:
+            offset = self._offsets.get(key)
+            if offset is None:
+                offset = self._append(key)
+            _VALUE.pack_into(self._map, offset, value)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+    def _append(self, key: str) -> int:
+        encoded = key.encode()
+        padded = len(encoded) + (-(_KEY_LENGTH.size + len(encoded)) % 8)
+        needed = self._used + _KEY_LENGTH.size + padded + _VALUE.size
+        if needed > len(self._map):
+            size = len(self._map)
+            while size < needed:
+                size *= 2
+            os.ftruncate(self._fd, size)
+            self._map.resize(size)
+        _KEY_LENGTH.pack_into(self._map, self._used, len(encoded))
+        start = self._used + _KEY_LENGTH.size
+        self._map[start:start + len(encoded)] = encoded
+        offset = start + padded
+        _VALUE.pack_into(self._map, offset, 0.0)
+        self._used = offset + _VALUE.size
+        # Publish the entry only once it is complete
+        _USED.pack_into(self._map, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+
+def _entries(buffer, used):
+    position = _USED.size
+    while position < used:
+        length = _KEY_LENGTH.unpack_from(buffer, position)[0]
+        start = position + _KEY_LENGTH.size
+        key = bytes(buffer[start:start + length]).decode()
+        offset = start + length + (-(_KEY_LENGTH.size + length) % 8)
+        yield key, _VALUE.unpack_from(buffer, offset)[0], offset
+        position = offset + _VALUE.size
+
+
+def read_file(path) -> dict[str, float]:
+    data = Path(path).read_bytes()
+    if len(data) < _USED.size:
+        return {}
+    used = min(_USED.unpack_from(data, 0)[0], len(data))
+    return {key: value for key, value, _ in _entries(data, used)}
+
+
+# -- per-process file ---------------------------------------------------------
+
+_file: ValueFile | None = None
+_file_lock = threading.Lock()
+
+
+def _forget_file():
+    # A forked worker must not write into its parent's file
+    global _file
+    _file = None
+
+
+os.register_at_fork(after_in_child=_forget_file)
+
+
+def _values() -> ValueFile:
+    global _file
+    if _file is None:
+        with _file_lock:
+            if _file is None:
+                _file = ValueFile(Path(settings.METRICS_DIR) / f"metrics_{os.getpid()}.db")
+    return _file
+
+
+def _key(name: str, labels: dict) -> str:
+    return json.dumps([name, sorted(labels.items())], separators=(",", ":"))
+
+
+# -- metric types -------------------------------------------------------------
+
+REGISTRY: dict[str, Metric] = {}
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        REGISTRY[name] = self
+
+    def samples(self, values: dict[tuple[str, tuple], float]):
+        yield from _series(values, self.name)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        _values().add(_key(self.name, labels), amount)
+
+    def inc_aggregate(self, amount: float = 1, **labels):
+        """inc() for short-lived processes: adds to AGGREGATE under the directory lock."""
+        _add_to_aggregate(_key(self.name, labels), amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        values = _values()
+        # Buckets are stored non-cumulatively and summed up on exposition
+        le = next((bound for bound in self.buckets if value <= bound), "+Inf")
+        values.add(_key(f"{self.name}_bucket", {**labels, "le": str(le)}), 1)
+        values.add(_key(f"{self.name}_sum", labels), value)
+        values.add(_key(f"{self.name}_count", labels), 1)
+
+    def samples(self, values):
+        buckets = defaultdict(dict)
+        for name, labels, value in _series(values, f"{self.name}_bucket"):
+            le = labels.pop("le")
+            buckets[tuple(labels.items())][le] = value
+        for labels, counts in buckets.items():
+            total = 0.0
+            for le in [*map(str, self.buckets), "+Inf"]:
+                total += counts.get(le, 0.0)
+                yield f"{self.name}_bucket", {**dict(labels), "le": le}, total
+        yield from _series(values, f"{self.name}_sum")
+        yield from _series(values, f"{self.name}_count")
+
+
+class Gauge(Metric):
+    """Per-worker value, labelled with the worker's pid; dropped once it exits."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        _values().set(_key(self.name, {**labels, "pid": str(os.getpid())}), value)
+
+
+def _series(values, name):
+    for (sample_name, labels), value in sorted(values.items()):
+        if sample_name == name:
+            yield sample_name, dict(labels), value
+
+
+REQUESTS = Counter("harada_http_requests_total", "HTTP requests by URL name, method and status.")
+LATENCY = Histogram("harada_http_request_duration_seconds", "Request latency by URL name.")
+ERRORS = Counter("harada_http_errors_total", "Responses with a 5xx status by URL name.")
+QUERIES = Counter("harada_db_queries_total", "Database queries by URL name.")
+QUERY_SECONDS = Counter("harada_db_query_seconds_total", "Time spent in database queries by URL name.")
+CACHE = Counter(
+    "harada_cache_lookups_total",
+    "Cache lookups by key prefix and result (local_hits, shared_hits, misses).",
+)
+
+# Callables returning [(name, type, help, [(labels, value), ...])] at scrape time
+_collectors: list = []
+
+
+def register_collector(collector):
+    _collectors.append(collector)
+    return collector
+
+
+# Callables run in the worker after each request, e.g. to refresh gauges
+_updaters: list = []
+
+
+def register_updater(updater):
+    _updaters.append(updater)
+    return updater
+
+
+# -- recording ----------------------------------------------------------------
+
+_cache_seen: dict[tuple[str, str], int] = {}
+_cache_lock = threading.Lock()
+
+
+def _record_cache_stats():
+    stats = getattr(cache, "stats", None)
+    if stats is None:
+        return
+    with _cache_lock:
+        for prefix, outcomes in stats().items():
+            for outcome, count in outcomes.items():
+                seen = _cache_seen.get((prefix, outcome), 0)
+                if count > seen:
+                    CACHE.inc(count - seen, prefix=prefix, result=outcome)
+                _cache_seen[prefix, outcome] = count
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = current_timings()
+        queries_before = (timings.db_count, timings.db_ms) if timings else (0, 0.0)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        except Exception:
+            self._record(request, 500, time.perf_counter() - started, timings, queries_before)
+            raise
+        self._record(request, response.status_code, time.perf_counter() - started, timings, queries_before)
+        return response
+
+    def _record(self, request, status, seconds, timings, queries_before):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "<unresolved>"
+        if view == "metrics":
+            return
+        REQUESTS.inc(view=view, method=request.method, status=str(status))
+        LATENCY.observe(seconds, view=view)
+        if status >= 500:
+            ERRORS.inc(view=view)
+        if timings:
+            QUERIES.inc(timings.db_count - queries_before[0], view=view)
+            QUERY_SECONDS.inc((timings.db_ms - queries_before[1]) / 1000, view=view)
+        _record_cache_stats()
+        for updater in _updaters:
+            updater()
+
+
+# -- exposition ---------------------------------------------------------------
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+AGGREGATE = "aggregate.db"
+
+
+def _pid(path: Path) -> int:
+    return int(path.stem.split("_", 1)[1])
+
+
+def _gauge_names() -> set[str]:
+    return {name for name, metric in REGISTRY.items() if isinstance(metric, Gauge)}
+
+
+def _directory_lock(directory: Path, operation: int):
+    """flock on the directory's lock file; None if a non-blocking attempt fails."""
+    os.makedirs(directory, exist_ok=True)
+    lock = open(directory / "metrics.lock", "a")
+    try:
+        fcntl.flock(lock, operation)
+    except BlockingIOError:
+        lock.close()
+        return None
+    return lock
+
+
+def compact(directory=None) -> int:
+    """Fold the counters of dead workers into AGGREGATE and delete their files.
+
+    Their gauges are dropped, as collect() would skip them anyway. Returns
+    the number of files folded; 0 if another process is compacting.
+    """
+    directory = Path(directory or settings.METRICS_DIR)
+    lock = _directory_lock(directory, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    if lock is None:
+        return 0
+    with lock:
+        dead = [path for path in sorted(directory.glob("metrics_*.db")) if not _alive(_pid(path))]
+        if not dead:
+            return 0
+        gauges = _gauge_names()
+        aggregate = ValueFile(directory / AGGREGATE)
+        try:
+            for path in dead:
+                for key, value in read_file(path).items():
+                    if json.loads(key)[0] not in gauges:
+                        aggregate.add(key, value)
+                path.unlink()
+        finally:
+            aggregate.close()
+    return len(dead)
+
+
+def _add_to_aggregate(key: str, amount: float):
+    directory = Path(settings.METRICS_DIR)
+    # Exclusive: compact() is the other writer of AGGREGATE
+    with _directory_lock(directory, fcntl.LOCK_EX):
+        aggregate = ValueFile(directory / AGGREGATE)
+        try:
+            aggregate.add(key, amount)
+        finally:
+            aggregate.close()
+
+
+def collect() -> dict[tuple[str, tuple], float]:
+    """Sum the values of every worker's file; gauges only of live workers."""
+    compact()
+    directory = Path(settings.METRICS_DIR)
+    gauges = _gauge_names()
+    totals: dict[tuple[str, tuple], float] = defaultdict(float)
+    # Shared lock: no compaction deletes a file while it is being read
+    with _directory_lock(directory, fcntl.LOCK_SH):
+        files = [(path, _alive(_pid(path))) for path in sorted(directory.glob("metrics_*.db"))]
+        if (directory / AGGREGATE).exists():
+            files.append((directory / AGGREGATE, False))
+        for path, alive in files:
+            for key, value in read_file(path).items():
+                name, labels = json.loads(key)
+                if name in gauges and not alive:
+                    continue
+                totals[name, tuple(map(tuple, labels))] += value
+    return totals
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def exposition() -> str:
+    values = collect()
+    lines = []
+    families = [
+        (metric.name, metric.type, metric.documentation, list(metric.samples(values)))
+        for metric in REGISTRY.values()
+    ]
+    for collector in _collectors:
+        try:
+            collected = collector()
+        except Exception:
+            # e.g. the database is down; the other metrics are still worth scraping
+            logger.exception("Metrics collector %s failed", collector.__qualname__)
+            continue
+        for name, kind, documentation, samples in collected:
+            families.append((name, kind, documentation, [(name, labels, value) for labels, value in samples]))
+    for name, kind, documentation, samples in families:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        for sample_name, labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def is_internal_request(request) -> bool:
+    """Direct request from an allowed address, not forwarded by nginx."""
+    return (
+        request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+        and "HTTP_X_FORWARDED_FOR" not in request.META
+    )
+
+
+def metrics_view(request):
+    if not is_internal_request(request):
+        raise Http404
+    return HttpResponse(exposition(), content_type=CONTENT_TYPE)
+
+
+def reset(directory=None):
+    """Delete every worker file; gunicorn calls this before starting workers."""
+    _forget_file()
+    _cache_seen.clear()
+    directory = Path(directory or settings.METRICS_DIR)
+    for path in [*directory.glob("metrics_*.db"), directory / AGGREGATE]:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,57 @@
+"""DEBUG-only detector for N+1 queries triggered by views and templates.
+
+Most of our ORM access happens implicitly, in templates (`task.pillar.color`,
+`comment.user.username`) and model properties. This middleware records the
+queries of each request with `config.instrumentation`, and when the same
+query shape runs NPLUSONE_THRESHOLD or more times it logs a report naming
+the template line (or code line) that triggered it, which is where the
+`select_related`/`prefetch_related` belongs. With NPLUSONE_HEADER the
+summary is also sent back in an `X-N-Plus-One` response header, handy in
+the browser's network tab for HTMX partials.
+
+The middleware removes itself when DEBUG is off, so production pays nothing.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .instrumentation import record_queries
+
+logger = logging.getLogger(__name__)
+
+HEADER = "X-N-Plus-One"
+HEADER_ENTRIES = 3
+
+
+class NPlusOneMiddleware:
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.NPLUSONE_THRESHOLD
+        self.header = settings.NPLUSONE_HEADER
+
+    def __call__(self, request):
+        with record_queries() as log:
+            response = self.get_response(request)
+
+        repeated = log.repeated_shapes(self.threshold)
+        if repeated:
+            logger.warning(
+                "N+1 on %s %s: %d queries, %d repeated shape(s)\n%s",
+                request.method,
+                request.path,
+                len(log),
+                len(repeated),
+                "\n".join(
+                    f"  {count}x from {', '.join(locations)}: {shape[:300]}"
+                    for shape, count, locations in repeated
+                ),
+            )
+            if self.header:
+                response[HEADER] = "; ".join(
+                    f"{count}x {locations[0]}" for _, count, locations in repeated[:HEADER_ENTRIES]
+                )
+        return response
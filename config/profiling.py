@@ -0,0 +1,140 @@
+"""On-demand sampling profiler for single requests.
+
+Staff can profile any request by adding ``?_profile=1`` or an
+``X-Profile: 1`` header; the response then carries an ``X-Profile-URL``
+header pointing at the result. Independently, PROFILE_SAMPLE_RATE = N
+profiles one in N requests from anyone for continuous profiling (no
+header is sent for those).
+
+A background thread samples the request thread's stack every
+PROFILE_INTERVAL_MS via `sys._current_frames()`, so the profiled code runs
+unmodified (unlike cProfile, there is no per-call overhead). Profiles are
+written to PROFILE_DIR in the folded-stack format read by flamegraph.pl,
+speedscope and inferno; the newest PROFILE_KEEP files are kept.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.utils import timezone
+
+_ROOT = str(Path(settings.BASE_DIR).resolve()) + os.sep
+_PROFILE_NAME = "{stamp}-{view}-{token}.folded"
+
+
+def _frame_name(code) -> str:
+    filename = code.co_filename
+    if "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    elif filename.startswith(_ROOT):
+        filename = filename[len(_ROOT):]
+    # The first line, not the current one, so samples of a function merge
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def fold(frame) -> str:
+    """The stack ending at `frame`, outermost first, in folded format."""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Sampler:
+    """Samples one thread's stack at a fixed interval from a helper thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[fold(frame)] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _requested(request) -> bool:
+    # Look at the switch first: touching request.user costs session and user queries
+    if request.GET.get("_profile") != "1" and request.headers.get("X-Profile") != "1":
+        return False
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_staff)
+
+
+def _prune(directory: Path, keep: int):
+    profiles = sorted(directory.glob("*.folded"), key=lambda path: path.stat().st_mtime_ns)
+    for path in profiles[:-keep] if keep else []:
+        path.unlink(missing_ok=True)
+
+
+def save(sampler: Sampler, view_name: str) -> str:
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = _PROFILE_NAME.format(
+        stamp=timezone.now().strftime("%Y%m%dT%H%M%S"),
+        view=(view_name or "unresolved").replace(":", "."),
+        token=uuid.uuid4().hex[:8],
+    )
+    (directory / name).write_text(sampler.folded())
+    _prune(directory, settings.PROFILE_KEEP)
+    return name
+
+
+class ProfilingMiddleware:
+    """Must come after the authentication middleware (it checks is_staff)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = _requested(request)
+        rate = settings.PROFILE_SAMPLE_RATE
+        if not requested and not (rate and random.randrange(rate) == 0):
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with Sampler(threading.get_ident(), settings.PROFILE_INTERVAL_MS / 1000) as sampler:
+            response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+        name = save(sampler, match.view_name if match else "")
+        if requested:
+            response["X-Profile-URL"] = reverse("profile_download", args=[name])
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            response["X-Profile-Samples"] = f"{sum(sampler.stacks.values())} in {elapsed_ms:.0f}ms"
+        return response
+
+
+@staff_member_required
+def profile_download(request, name):
+    path = Path(settings.PROFILE_DIR) / name
+    if path.name != name or path.suffix != ".folded" or not path.is_file():
+        raise Http404
+    return FileResponse(path.open("rb"), content_type="text/plain; charset=utf-8", filename=name)
@@ -11,23 +11,13 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
-import re
-import logging
 from pathlib import Path
 from dotenv import load_dotenv
 import dj_database_url
 
-load_dotenv()
+from config.timing import with_probes
 
-# Logging filter to remove Clerk authentication traces
-class ClerkHandshakeFilter(logging.Filter):
-    """Remove Clerk authentication handshake tokens from logs."""
-    
-    def filter(self, record):
-        if record.getMessage() and '__clerk_handshake=' in record.getMessage():
-            # Remove the clerk_handshake parameter from the logged URL
-            record.msg = re.sub(r'__clerk_handshake=[^&\s"]+', '__clerk_handshake=***', record.msg)
-        return True
+load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -52,9 +42,20 @@ if not DEBUG:
 CLERK_SECRET_KEY = os.getenv("CLERK_SECRET_KEY")
 CLERK_PUBLISHABLE_KEY = os.getenv("CLERK_PUBLISHABLE_KEY")
 
+# Paths served without Clerk user sync (anonymous, cacheable pages)
+CLERK_EXEMPT_PATHS = ("/share/",)
+
 # Django Authentication
 LOGIN_URL = "/sign-in/"
 
+# Public share pages: browser/CDN freshness in seconds. A revoked link can
+# stay visible in shared caches for at most this long.
+SHARE_CACHE_MAX_AGE = int(os.getenv("SHARE_CACHE_MAX_AGE", "3600"))
+
+# Home, method and sign-in/up pages: server-side page cache and browser/proxy
+# freshness in seconds (see config.caching).
+PAGE_CACHE_MAX_AGE = int(os.getenv("PAGE_CACHE_MAX_AGE", "300"))
+
 
 # Application definition
 
@@ -70,10 +71,15 @@ INSTALLED_APPS = [
     "charts",
     "wizard",
     "matrix",
+    "jobs",
+    "config",
 ]
 
-MIDDLEWARE = [
+# with_probes() adds per-middleware timings to the Server-Timing header
+MIDDLEWARE = with_probes([
+    "config.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "config.nplusone.NPlusOneMiddleware",  # DEBUG only
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -82,13 +88,26 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
     "config.clerk_middleware.ClerkMiddleware",
-]
+    "config.profiling.ProfilingMiddleware",
+])
+
+# Send per-phase request timings (db, tpl, view, mw.*) in a Server-Timing header.
+# Off in production unless opted in: the header exposes internals. It is never
+# added to responses marked Cache-Control: public.
+SERVER_TIMING = os.getenv("SERVER_TIMING", str(DEBUG)) == "True"
+# Requests slower than this (ms) are logged at INFO by config.timing; the rest at DEBUG
+TIMING_LOG_MS = float(os.getenv("TIMING_LOG_MS", "500"))
+
+# N+1 detector (DEBUG only): report query shapes repeated this many times
+NPLUSONE_THRESHOLD = int(os.getenv("NPLUSONE_THRESHOLD", "3"))
+NPLUSONE_HEADER = os.getenv("NPLUSONE_HEADER", "True") == "True"
 
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "config.timing.TimedDjangoTemplates",
+        "NAME": "django",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -117,6 +136,112 @@ DATABASES = {
 }
 
 
+# Cache
+# Every worker keeps a small, short-lived LRU in front of a shared tier:
+# Redis when REDIS_URL is set, otherwise files under CACHE_DIR.
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+else:
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_DIR", str(BASE_DIR / ".cache")),
+    }
+
+CACHES = {
+    "default": {
+        "BACKEND": "config.cache_backends.TwoTierCache",
+        "LOCATION": "shared",
+        "TIMEOUT": 300,
+        "OPTIONS": {
+            "LOCAL_MAX_ENTRIES": int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1000")),
+            "LOCAL_TIMEOUT": float(os.getenv("CACHE_LOCAL_TIMEOUT", "5")),
+        },
+    },
+    "shared": {**SHARED_CACHE, "TIMEOUT": 300},
+}
+
+# Shared-memory generation table used to invalidate cached values in every
+# worker at once (see config.generations). Must be the same file for all
+# workers of a deployment; tmpfs keeps reads in memory.
+CACHE_GENERATIONS_PATH = os.getenv(
+    "CACHE_GENERATIONS_PATH",
+    "/dev/shm/harada-cache-generations"
+    if os.path.isdir("/dev/shm")
+    else str(BASE_DIR / ".cache" / "generations"),
+)
+
+# Slow-query log (see config.slow_queries); SLOW_QUERY_MS="" turns it off
+_slow_query_ms = os.getenv("SLOW_QUERY_MS", "100")
+SLOW_QUERY_MS = float(_slow_query_ms) if _slow_query_ms else None
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", str(BASE_DIR / "logs" / "slow_queries.jsonl"))
+
+# Sampling profiler (see config.profiling): staff add ?_profile=1; also
+# profile one in PROFILE_SAMPLE_RATE requests (0 = off)
+PROFILE_SAMPLE_RATE = int(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", str(BASE_DIR / "logs" / "profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "500"))
+
+# Memory instrumentation (see config.memory). TRACEMALLOC_FRAMES > 0 turns on
+# allocation tracing, with periodic per-worker snapshots in MEMORY_DIR
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "0"))
+MEMORY_DIR = os.getenv("MEMORY_DIR", str(BASE_DIR / "logs" / "memory"))
+MEMORY_SNAPSHOT_INTERVAL = int(os.getenv("MEMORY_SNAPSHOT_INTERVAL", "3600"))
+MEMORY_SNAPSHOT_KEEP = int(os.getenv("MEMORY_SNAPSHOT_KEEP", "24"))
+MEMORY_GAUGE_INTERVAL = int(os.getenv("MEMORY_GAUGE_INTERVAL", "15"))
+# Counting gc objects holds the GIL for a whole heap walk, so it runs less often
+MEMORY_OBJECTS_INTERVAL = int(os.getenv("MEMORY_OBJECTS_INTERVAL", "300"))
+
+# Per-worker metric files, summed by /internal/metrics/ (see config.metrics)
+METRICS_DIR = os.getenv(
+    "METRICS_DIR",
+    "/dev/shm/harada-metrics" if os.path.isdir("/dev/shm") else str(BASE_DIR / ".cache" / "metrics"),
+)
+# Direct (not proxied) clients allowed to scrape the metrics endpoint
+METRICS_ALLOWED_IPS = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",")
+
+# Background jobs (see jobs.base and jobs.worker). JOBS_QUEUES maps each queue
+# to the most jobs of it running at once across all workers, e.g. "default=2"
+JOBS_QUEUES = {
+    name: int(limit)
+    for name, limit in (entry.split("=") for entry in os.getenv("JOBS_QUEUES", "default=2").split(","))
+}
+JOBS_THREADS = int(os.getenv("JOBS_THREADS", "2"))
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "1"))
+JOBS_RETRY_DELAY = float(os.getenv("JOBS_RETRY_DELAY", "10"))
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1"))
+JOBS_STALE_AFTER = int(os.getenv("JOBS_STALE_AFTER", "3600"))
+# Seconds a finished job's row is kept for polling before prune_expired deletes it
+JOBS_RETENTION = int(os.getenv("JOBS_RETENTION", str(7 * 24 * 3600)))
+# Run jobs in the request, after its transaction commits (no worker needed); on by
+# default under DEBUG so a dev server without jobs_worker still finishes them
+JOBS_IMMEDIATE = os.getenv("JOBS_IMMEDIATE", str(DEBUG)) == "True"
+# Rows per DELETE statement (and transaction) in charts.deletion
+DELETE_CHUNK_SIZE = int(os.getenv("DELETE_CHUNK_SIZE", "500"))
+# Seconds an anonymous wizard draft (wizard.drafts) lives after its last save
+WIZARD_DRAFT_TTL = int(os.getenv("WIZARD_DRAFT_TTL", str(7 * 24 * 3600)))
+# Expired sessions, drafts and old jobs are deleted this many rows per statement, with
+# a pause (seconds) between statements (see config.pruning)
+PRUNE_BATCH_SIZE = int(os.getenv("PRUNE_BATCH_SIZE", "1000"))
+PRUNE_PAUSE = float(os.getenv("PRUNE_PAUSE", "0.1"))
+# Seconds the table sizes exported to /internal/metrics/ are cached
+PRUNE_STATS_TIMEOUT = int(os.getenv("PRUNE_STATS_TIMEOUT", "300"))
+
+# Logging (see config.log): console output is JSON unless LOG_FORMAT=verbose;
+# LOG_QUEUE_HANDLERS are served from listener threads, not request threads
+LOG_FORMAT = os.getenv("LOG_FORMAT", "verbose" if DEBUG else "json")
+LOG_QUEUE_HANDLERS = [name for name in os.getenv("LOG_QUEUE_HANDLERS", "console,slow_queries").split(",") if name]
+# Longest rendering of a payload passed through config.log.truncated()
+LOG_PAYLOAD_LIMIT = int(os.getenv("LOG_PAYLOAD_LIMIT", "500"))
+
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -130,18 +255,31 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
         },
+        'message': {
+            'format': '{message}',
+            'style': '{',
+        },
+        'json': {
+            '()': 'config.log.JsonFormatter',
+        },
     },
     'filters': {
         'clerk_filter': {
-            '()': ClerkHandshakeFilter,
+            '()': 'config.log.ClerkHandshakeFilter',
         },
     },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'verbose',
             'filters': ['clerk_filter'],
         },
+        'slow_queries': {
+            'class': 'logging.handlers.WatchedFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'formatter': 'message',
+            'delay': True,
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -153,9 +291,19 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'config.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'config.timing': {
+            'handlers': ['console'],
+            'level': 'DEBUG' if DEBUG else 'INFO',
+            'propagate': False,
+        },
         'wizard': {
             'handlers': ['console'],
-            'level': 'DEBUG',
+            'level': 'DEBUG' if DEBUG else 'INFO',
             'propagate': False,
         },
     },
@@ -206,6 +354,8 @@ MEDIA_ROOT = str(BASE_DIR / "media")
 if not DEBUG:
     SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
     SECURE_SSL_REDIRECT = True
+    # Scraped over plain HTTP on the gunicorn port
+    SECURE_REDIRECT_EXEMPT = [r"^internal/"]
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
     SECURE_HSTS_SECONDS = 31536000  # 1 year
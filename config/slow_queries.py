@@ -0,0 +1,104 @@
+"""Sampled log of slow queries, attributed to the view and template line.
+
+`install()` (called from ConfigConfig.ready) adds an execute wrapper to
+every database connection as it is opened, so requests, management
+commands and background jobs are all covered. For ordinary queries the
+wrapper costs two clock reads and a comparison; only queries slower than
+SLOW_QUERY_MS are sampled (SLOW_QUERY_SAMPLE_RATE) and only those pay for
+the stack walk and the log write.
+
+Each sample is one JSON line on the ``config.slow_queries`` logger,
+written to SLOW_QUERY_LOG: normalized SQL (literals and IN-lists
+collapsed), parameter types in place of their values, duration, URL name
+and the code and template line that ran the query. `manage.py
+slow_queries` summarizes the file by query shape. Failures to record a
+sample go to the application log, never into that file.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from .instrumentation import attribute, normalize_sql
+from .timing import current_timings
+
+logger = logging.getLogger(__name__)
+# Not config.slow_queries: its handler writes the JSONL file verbatim
+errors = logging.getLogger("config")
+
+
+def redact(params) -> list[str] | None:
+    """Parameter types (and string lengths) without their values."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        params = params.values()
+    redacted = []
+    for value in params:
+        if isinstance(value, (str, bytes)):
+            redacted.append(f"{type(value).__name__}({len(value)})")
+        else:
+            redacted.append(type(value).__name__)
+    return redacted
+
+
+def _view_name() -> str:
+    timings = current_timings()
+    match = getattr(timings and timings.request, "resolver_match", None)
+    return match.view_name if match else ""
+
+
+def record(sql, params, many, alias, duration_ms, frame):
+    code, template = attribute(frame)
+    logger.warning(json.dumps({
+        "ts": timezone.now().isoformat(timespec="milliseconds"),
+        "duration_ms": round(duration_ms, 2),
+        "sql": normalize_sql(sql if isinstance(sql, str) else str(sql)),
+        "params": None if many else redact(params),
+        "many": many,
+        "alias": alias,
+        "view": _view_name(),
+        "code": code,
+        "template": template,
+    }))
+
+
+class SlowQueryWrapper:
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= settings.SLOW_QUERY_MS and random.random() < settings.SLOW_QUERY_SAMPLE_RATE:
+                try:
+                    record(sql, params, many, self.alias, duration_ms, sys._getframe(1))
+                except Exception:
+                    errors.exception("Could not record a slow query")
+
+
+def _add_wrapper(sender, connection, **kwargs):
+    if any(isinstance(wrapper, SlowQueryWrapper) for wrapper in connection.execute_wrappers):
+        return
+    # First in the list: execute_wrapper() blocks that are open while the
+    # connection gets created pop the last entry when they exit
+    connection.execute_wrappers.insert(0, SlowQueryWrapper(connection.alias))
+
+
+def install():
+    if settings.SLOW_QUERY_MS is None:
+        return
+    os.makedirs(os.path.dirname(settings.SLOW_QUERY_LOG), exist_ok=True)
+    connection_created.connect(_add_wrapper, dispatch_uid="slow_query_log")
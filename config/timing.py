@@ -0,0 +1,194 @@
+"""Per-request phase timings, reported in a Server-Timing header and the log.
+
+Every request is split into exclusive phases that add up to its total:
+
+- ``mw.<Name>``: time inside each middleware's own code (e.g. ClerkMiddleware
+  syncing the user), measured by probes that `with_probes()` places between
+  the entries of MIDDLEWARE;
+- ``db``: all queries, with their count;
+- ``tpl``: template rendering, minus the queries templates trigger;
+- ``view``: everything else inside the URL handler, i.e. view code plus
+  `process_view`-style middleware hooks.
+
+Browsers show the header in devtools; the log record carries the same
+numbers as a ``timing`` dict for the log pipeline. The header is opt-in
+(SERVER_TIMING, on with DEBUG) and never sent on ``Cache-Control: public``
+responses, which shared caches may store and replay to anyone. Requests
+slower than TIMING_LOG_MS are logged at INFO, all others at DEBUG. Template time is only
+seen for templates loaded through `TimedDjangoTemplates` (see TEMPLATES).
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.cache import cc_delim_re
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+PROBE = "config.timing.TimingProbe"
+SERVER_TIMING = "config.timing.ServerTimingMiddleware"
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> RequestTimings | None:
+    """Timings of the request being served, if ServerTimingMiddleware is active."""
+    return _current.get()
+
+
+def with_probes(middleware: list[str]) -> list[str]:
+    """Wrap a MIDDLEWARE list so each entry's own time can be measured."""
+    probed = [SERVER_TIMING]
+    for path in middleware:
+        probed += [path, PROBE]
+    return probed
+
+
+class RequestTimings:
+    def __init__(self, request=None):
+        self.request = request
+        self.db_count = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.template_db_ms = 0.0
+        self._template_depth = 0
+        # (elapsed ms, db ms) of the server-timing middleware and each probe,
+        # outermost first; None while still running
+        self.spans: list[tuple[float, float] | None] = []
+
+    def query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.db_count += 1
+            self.db_ms += elapsed
+            if self._template_depth:
+                self.template_db_ms += elapsed
+
+    def enter_span(self) -> tuple[int, float, float]:
+        self.spans.append(None)
+        return len(self.spans) - 1, time.perf_counter(), self.db_ms
+
+    def exit_span(self, token):
+        index, started, db_ms = token
+        self.spans[index] = ((time.perf_counter() - started) * 1000, self.db_ms - db_ms)
+
+    def phases(self, names: list[str]) -> dict[str, float]:
+        """Exclusive milliseconds per phase; `names` are the probed middleware."""
+        spans = [span or (0.0, 0.0) for span in self.spans]
+        spans += [(0.0, 0.0)] * (len(names) + 1 - len(spans))
+        phases = {}
+        for name, outer, inner in zip(names, spans, spans[1:]):
+            phases[f"mw.{name}"] = (outer[0] - inner[0]) - (outer[1] - inner[1])
+        # Without probes the handler span is the whole request
+        handler_ms, handler_db_ms = spans[len(names)]
+        template_ms = self.template_ms - self.template_db_ms
+        phases["view"] = handler_ms - handler_db_ms - template_ms
+        phases["tpl"] = template_ms
+        phases["db"] = self.db_ms
+        phases["total"] = spans[0][0]
+        return {name: round(max(ms, 0.0), 2) for name, ms in phases.items()}
+
+
+class ServerTimingMiddleware:
+    """Outermost middleware: collects the timings and reports them."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header = settings.SERVER_TIMING
+        entries = list(settings.MIDDLEWARE)
+        start = entries.index(SERVER_TIMING) + 1 if SERVER_TIMING in entries else 0
+        self.names = (
+            [import_string(path).__name__ for path in entries[start:] if path != PROBE]
+            if PROBE in entries
+            else []
+        )
+
+    def __call__(self, request):
+        timings = RequestTimings(request)
+        reset = _current.set(timings)
+        token = timings.enter_span()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timings.query))
+                response = self.get_response(request)
+        finally:
+            timings.exit_span(token)
+            _current.reset(reset)
+
+        phases = timings.phases(self.names)
+        if self.header and "public" not in cc_delim_re.split(response.get("Cache-Control", "")):
+            response["Server-Timing"] = ", ".join(
+                f'db;dur={ms};desc="{timings.db_count} queries"' if name == "db" else f"{name};dur={ms}"
+                for name, ms in phases.items()
+            )
+        logger.log(
+            logging.INFO if phases["total"] >= settings.TIMING_LOG_MS else logging.DEBUG,
+            "%s %s %s %.1fms (db %d/%.1fms, tpl %.1fms, view %.1fms)",
+            request.method,
+            request.path,
+            response.status_code,
+            phases["total"],
+            timings.db_count,
+            phases["db"],
+            phases["tpl"],
+            phases["view"],
+            extra={"timing": {**phases, "db_count": timings.db_count}},
+        )
+        return response
+
+
+class TimingProbe:
+    """Marks the boundary after one middleware; see `with_probes()`."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = _current.get()
+        if timings is None:
+            return self.get_response(request)
+        token = timings.enter_span()
+        try:
+            return self.get_response(request)
+        finally:
+            timings.exit_span(token)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return super().render(context, request)
+        # Only the outermost render counts; nested render_to_string calls
+        # (e.g. from template tags) are already inside it
+        timings._template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings._template_depth -= 1
+            if not timings._template_depth:
+                timings.template_ms += (time.perf_counter() - started) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with rendering time added to the request timings."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
@@ -19,18 +19,29 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import TemplateView
 from accounts import views as accounts_views
+from matrix import views as matrix_views
+from config.caching import cache_public_page
+from config.memory import memory_view
+from config.metrics import metrics_view
+from config.profiling import profile_download
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/", include("accounts.urls")),
     path("wizard/", include("wizard.urls")),
     path("matrix/", include("matrix.urls")),
+    path("jobs/", include("jobs.urls")),
     path("sign-in/", accounts_views.sign_in, name="sign_in"),
     path("sign-up/", accounts_views.sign_up, name="sign_up"),
     path("dashboard/", accounts_views.dashboard, name="dashboard"),
+    path("search/", accounts_views.search, name="search"),
+    path("share/<str:token>/", matrix_views.shared_chart_view, name="shared_chart_view"),
     path("method/long-term-goal/", accounts_views.long_term_goal, name="long_term_goal"),
     path("method/five-pillars/", accounts_views.five_pillars, name="five_pillars"),
     path("method/64-tasks/", accounts_views.tasks_64, name="64_tasks"),
-    path("", TemplateView.as_view(template_name="home.html"), name="home"),
+    path("internal/metrics/", metrics_view, name="metrics"),
+    path("internal/memory/", memory_view, name="memory"),
+    path("staff/profiles/<str:name>/", profile_download, name="profile_download"),
+    path("", cache_public_page(TemplateView.as_view(template_name="home.html")), name="home"),
 ]
 
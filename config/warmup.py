@@ -0,0 +1,72 @@
+"""Process warm-up helpers for gunicorn (see gunicorn_config.py).
+
+With `preload_app` the master imports Django, compiles every project
+template into the cached loader and builds the URL resolver once; forked
+workers then share those pages copy-on-write instead of each paying for
+them on its first request.
+"""
+
+from __future__ import annotations
+
+import resource
+from pathlib import Path
+
+from django.template import engines
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+
+def precompile_templates() -> int:
+    """Compile every template under the project template dirs; return the count.
+
+    Admin and other app templates are left to load lazily.
+    """
+
+    count = 0
+    for engine in engines.all():
+        for directory in engine.engine.dirs:
+            root = Path(directory)
+            for path in sorted(root.rglob("*.html")):
+                get_template(path.relative_to(root).as_posix(), using=engine.name)
+                count += 1
+    return count
+
+
+def build_url_resolver() -> int:
+    """Populate the root resolver's reverse/namespace tables; return the route count."""
+
+    resolver = get_resolver()
+    resolver._populate()
+    return len(resolver.reverse_dict)
+
+
+def warm_up() -> dict[str, int]:
+    return {"templates": precompile_templates(), "routes": build_url_resolver()}
+
+
+def memory_usage() -> dict[str, int]:
+    """Resident memory of this process in KiB.
+
+    `pss` and `private` (Linux only) split out the pages shared with the
+    master after a preloaded fork; `rss` alone counts them in every worker.
+    """
+
+    usage = {"rss": 0}
+    try:
+        with open("/proc/self/smaps_rollup") as smaps:
+            fields = dict(line.split(":", 1) for line in smaps if ":" in line)
+    except OSError:
+        usage["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage
+
+    def kib(name):
+        return int(fields.get(name, "0 kB").split()[0])
+
+    usage["rss"] = kib("Rss")
+    usage["pss"] = kib("Pss")
+    usage["private"] = kib("Private_Clean") + kib("Private_Dirty")
+    return usage
+
+
+def format_memory(usage: dict[str, int]) -> str:
+    return " ".join(f"{name}={kib / 1024:.1f}MiB" for name, kib in usage.items())
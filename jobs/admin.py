@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("task_path", "queue_name", "status", "attempts", "enqueued_at", "finished_at")
+    list_filter = ("status", "queue_name")
+    search_fields = ("task_path", "error")
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,108 @@
+"""Database-backed background tasks with the API of django.tasks.
+
+Django 6's tasks framework is not available on the Django version this
+project runs, so this module follows its interface closely enough that
+switching later is a matter of changing imports::
+
+    from jobs.base import task
+
+    @task(queue_name="default", max_attempts=3)
+    def rebuild(chart_id):
+        ...
+
+    result = rebuild.using(owner=request.user).enqueue(chart.id)
+    result.refresh(); result.status, result.return_value
+
+Arguments and return values must be JSON-serializable. A task declared with
+``takes_context=True`` receives a `TaskContext` first, whose ``task_result``
+can report progress. Enqueued jobs are rows of `jobs.models.Job`, run by
+``manage.py jobs_worker`` (or inline when JOBS_IMMEDIATE is set).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Job, TaskResultStatus
+
+__all__ = ["Task", "TaskContext", "TaskResultStatus", "get_result", "task"]
+
+
+@dataclass(frozen=True)
+class TaskContext:
+    task_result: Job
+
+    @property
+    def attempt(self) -> int:
+        return self.task_result.attempts
+
+
+@dataclass(frozen=True)
+class Task:
+    func: object
+    priority: int = 0
+    queue_name: str = "default"
+    max_attempts: int | None = None
+    takes_context: bool = False
+    run_after: datetime | None = None
+    owner: object = None
+
+    @property
+    def module_path(self) -> str:
+        return f"{self.func.__module__}.{self.func.__name__}"
+
+    def using(self, *, priority=None, queue_name=None, run_after=None, owner=None) -> Task:
+        """A copy with some options changed; `owner` may poll the result."""
+        changes = {"priority": priority, "queue_name": queue_name, "run_after": run_after, "owner": owner}
+        return dataclasses.replace(self, **{name: value for name, value in changes.items() if value is not None})
+
+    def enqueue(self, *args, **kwargs) -> Job:
+        # Fail in the caller, not in the worker, on arguments that cannot be stored
+        json.dumps([args, kwargs])
+        if self.queue_name not in settings.JOBS_QUEUES:
+            raise ValueError(f"Unknown queue {self.queue_name!r}; see JOBS_QUEUES")
+        options = {"run_after": self.run_after} if self.run_after else {}
+        job = Job.objects.create(
+            task_path=self.module_path,
+            args=list(args),
+            kwargs=kwargs,
+            queue_name=self.queue_name,
+            priority=self.priority,
+            owner=self.owner,
+            max_attempts=self.max_attempts or settings.JOBS_MAX_ATTEMPTS,
+            **options,
+        )
+        if settings.JOBS_IMMEDIATE:
+            from .worker import run_now
+
+            transaction.on_commit(lambda: run_now(job.id))
+        return job
+
+    def call(self, *args, **kwargs):
+        """Run the task in this thread, without a job."""
+        return self.func(*args, **kwargs)
+
+
+def task(function=None, *, priority=0, queue_name="default", max_attempts=None, takes_context=False):
+    """Turn a function into a `Task`; usable with or without arguments."""
+
+    def wrap(func):
+        return Task(
+            func=func,
+            priority=priority,
+            queue_name=queue_name,
+            max_attempts=max_attempts,
+            takes_context=takes_context,
+        )
+
+    return wrap(function) if function is not None else wrap
+
+
+def get_result(result_id) -> Job:
+    return Job.objects.get(id=result_id)
@@ -0,0 +1,37 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database queue until stopped (SIGTERM/SIGINT)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue", action="append", dest="queues",
+            help="Only this queue (repeatable; default: every queue in JOBS_QUEUES).",
+        )
+        parser.add_argument("--threads", type=int, default=None, help="Jobs run at once by this process (default: JOBS_THREADS).")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due instead of polling.")
+
+    def handle(self, *args, **options):
+        names = options["queues"] or list(settings.JOBS_QUEUES)
+        unknown = sorted(set(names) - set(settings.JOBS_QUEUES))
+        if unknown:
+            raise CommandError(f"Unknown queue(s) {', '.join(unknown)}; see JOBS_QUEUES")
+        worker = Worker(
+            {name: settings.JOBS_QUEUES[name] for name in names},
+            threads=options["threads"] or settings.JOBS_THREADS,
+        )
+
+        def stop(signum, frame):
+            self.stdout.write("Stopping after the running jobs finish...")
+            worker.stopping.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        self.stdout.write(f"Worker {worker.worker_id} on {', '.join(names)} with {worker.threads} thread(s)")
+        worker.run(burst=options["burst"])
@@ -0,0 +1,37 @@
+"""Queue depth in /internal/metrics/, read from the job table at scrape time."""
+
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from config import metrics
+
+from .models import Job, TaskResultStatus
+
+
+@metrics.register_collector
+def queue_depth():
+    now = timezone.now()
+    pending = (
+        Job.objects.filter(status__in=[TaskResultStatus.READY, TaskResultStatus.RUNNING])
+        .values_list("queue_name", "status")
+        .annotate(count=Count("id"))
+    )
+    oldest = (
+        Job.objects.filter(status=TaskResultStatus.READY, run_after__lte=now)
+        .values_list("queue_name")
+        .annotate(oldest=Min("run_after"))
+    )
+    return [
+        (
+            "harada_jobs_pending",
+            "gauge",
+            "Jobs waiting (READY) or running (RUNNING), by queue.",
+            [({"queue": queue, "status": status}, count) for queue, status, count in pending],
+        ),
+        (
+            "harada_jobs_oldest_ready_seconds",
+            "gauge",
+            "Age of the oldest due job that no worker has picked up, by queue.",
+            [({"queue": queue}, (now - since).total_seconds()) for queue, since in oldest],
+        ),
+    ]
@@ -0,0 +1,76 @@
+import uuid
+
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class TaskResultStatus(models.TextChoices):
+    """The states of django.tasks' TaskResultStatus."""
+
+    READY = "READY", "Ready"
+    RUNNING = "RUNNING", "Running"
+    FAILED = "FAILED", "Failed"
+    SUCCESSFUL = "SUCCESSFUL", "Successful"
+
+
+class Job(models.Model):
+    """
+    One enqueued call of a background task (see jobs.base) and its outcome.
+    READY jobs whose run_after has passed are claimed by `manage.py jobs_worker`.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task_path = models.CharField(max_length=255, help_text="Dotted path of the task")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    queue_name = models.CharField(max_length=50, default="default")
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first")
+    status = models.CharField(
+        max_length=10, choices=TaskResultStatus.choices, default=TaskResultStatus.READY
+    )
+    owner = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL, related_name="jobs",
+        help_text="The user who may poll this job",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=1)
+    run_after = models.DateTimeField(default=timezone.now)
+    enqueued_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    worker_id = models.CharField(max_length=100, blank=True)
+    progress = models.JSONField(
+        default=dict, blank=True, help_text='Reported by the task, e.g. {"done": 3, "total": 8}'
+    )
+    return_value = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, help_text="Traceback of the last failed attempt")
+
+    class Meta:
+        ordering = ["-enqueued_at"]
+        indexes = [
+            models.Index(fields=["status", "queue_name", "run_after"], name="jobs_job_claim_idx"),
+            # prune_expired walks finished jobs oldest first
+            models.Index(fields=["finished_at"], name="jobs_job_finished_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task_path} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (TaskResultStatus.SUCCESSFUL, TaskResultStatus.FAILED)
+
+    @property
+    def percent_done(self):
+        total = self.progress.get("total")
+        return round(self.progress.get("done", 0) / total * 100) if total else None
+
+    def refresh(self):
+        """Reload the status and result, like django.tasks' TaskResult.refresh()."""
+        self.refresh_from_db()
+
+    def set_progress(self, done: int, total: int):
+        """Record progress from inside the running task (one UPDATE)."""
+        self.progress = {"done": done, "total": total}
+        Job.objects.filter(id=self.id).update(progress=self.progress)
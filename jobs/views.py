@@ -0,0 +1,11 @@
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import get_object_or_404, render
+
+from .models import Job
+
+
+@login_required
+def job_status(request, job_id):
+    """HTMX partial with a job's state; it polls itself until the job finishes."""
+    job = get_object_or_404(Job, id=job_id, owner=request.user)
+    return render(request, "jobs/status.html", {"job": job})
@@ -0,0 +1,178 @@
+"""Claiming and running jobs; the loop behind ``manage.py jobs_worker``.
+
+A job is claimed with a conditional UPDATE (READY -> RUNNING), so any
+number of worker processes can poll the same table without row locks, on
+SQLite as well as PostgreSQL. JOBS_QUEUES caps how many jobs of each queue
+run at once across all workers; the cap is checked just before claiming,
+so two workers racing for the last slot can overshoot it by one.
+
+A failed attempt is retried after JOBS_RETRY_DELAY seconds, doubling each
+time, until the task's max_attempts is used up. Jobs left RUNNING by a
+worker that died are returned to the queue after JOBS_STALE_AFTER seconds.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection
+from django.db.models import Count, F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .base import TaskContext
+from .models import Job, TaskResultStatus
+
+logger = logging.getLogger(__name__)
+
+# How many READY candidates to try per poll before giving up to another worker
+_CANDIDATES = 5
+# Seconds between sweeps for jobs of dead workers
+_SWEEP_INTERVAL = 60
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_job(job_id, worker_id: str) -> Job | None:
+    """Take the READY job `job_id` for this worker, unless someone else did."""
+    claimed = Job.objects.filter(id=job_id, status=TaskResultStatus.READY).update(
+        status=TaskResultStatus.RUNNING,
+        worker_id=worker_id,
+        started_at=timezone.now(),
+        attempts=F("attempts") + 1,
+    )
+    return Job.objects.get(id=job_id) if claimed else None
+
+
+def claim_next(queues: dict[str, int], worker_id: str) -> Job | None:
+    """Claim the most urgent due job of a queue that is below its concurrency limit."""
+    running = dict(
+        Job.objects.filter(status=TaskResultStatus.RUNNING, queue_name__in=queues)
+        .values_list("queue_name")
+        .annotate(count=Count("id"))
+    )
+    open_queues = [name for name, limit in queues.items() if running.get(name, 0) < limit]
+    if not open_queues:
+        return None
+    candidates = (
+        Job.objects.filter(
+            status=TaskResultStatus.READY, queue_name__in=open_queues, run_after__lte=timezone.now()
+        )
+        .order_by("-priority", "run_after")
+        .values_list("id", flat=True)[:_CANDIDATES]
+    )
+    for job_id in candidates:
+        job = claim_job(job_id, worker_id)
+        if job is not None:
+            return job
+    return None
+
+
+def run_job(job: Job):
+    """Run a claimed job and store its outcome, scheduling a retry on failure."""
+    try:
+        task = import_string(job.task_path)
+        args = job.args
+        if task.takes_context:
+            args = [TaskContext(task_result=job), *args]
+        value = task.call(*args, **job.kwargs)
+        json.dumps(value)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            job.status = TaskResultStatus.READY
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+            logger.warning("Job %s (%s) failed, retrying in %ss", job.id, job.task_path, delay, exc_info=True)
+        else:
+            job.status = TaskResultStatus.FAILED
+            job.finished_at = timezone.now()
+            logger.error("Job %s (%s) failed for good", job.id, job.task_path, exc_info=True)
+    else:
+        job.status = TaskResultStatus.SUCCESSFUL
+        job.return_value = value
+        job.finished_at = timezone.now()
+    job.save(update_fields=["status", "return_value", "error", "run_after", "finished_at"])
+
+
+def run_now(job_id):
+    """Claim and run `job_id` in this thread (JOBS_IMMEDIATE)."""
+    job = claim_job(job_id, "immediate")
+    if job is not None:
+        run_job(job)
+
+
+def requeue_stale() -> int:
+    """Give jobs of workers that died mid-run another attempt, or fail them."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_STALE_AFTER)
+    stale = Job.objects.filter(status=TaskResultStatus.RUNNING, started_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=TaskResultStatus.FAILED, finished_at=timezone.now(), error="Worker lost while running the job"
+    )
+    return failed + stale.update(status=TaskResultStatus.READY, run_after=timezone.now())
+
+
+class Worker:
+    """Polls the queues from `threads` threads until stopped."""
+
+    def __init__(self, queues: dict[str, int], threads: int = 1, worker_id: str | None = None):
+        self.queues = queues
+        self.threads = threads
+        self.worker_id = worker_id or default_worker_id()
+        self.stopping = threading.Event()
+        self._next_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+
+    def run(self, burst: bool = False):
+        """Process jobs; with `burst`, return once no job is due."""
+        threads = [
+            threading.Thread(target=self._loop, args=(burst,), name=f"jobs-worker-{number}")
+            for number in range(self.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _sweep(self):
+        with self._sweep_lock:
+            if time.monotonic() < self._next_sweep:
+                return
+            self._next_sweep = time.monotonic() + _SWEEP_INTERVAL
+        requeued = requeue_stale()
+        if requeued:
+            logger.warning("Recovered %d jobs of lost workers", requeued)
+
+    def _loop(self, burst: bool):
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                try:
+                    self._sweep()
+                    job = claim_next(self.queues, self.worker_id)
+                except DatabaseError:
+                    logger.exception("Polling the job queue failed")
+                    job = None
+                if job is not None:
+                    try:
+                        run_job(job)
+                    except Exception:
+                        # Storing the outcome failed; the job stays RUNNING
+                        # until requeue_stale() picks it up
+                        logger.exception("Could not finish job %s (%s)", job.id, job.task_path)
+                elif burst:
+                    return
+                else:
+                    self.stopping.wait(settings.JOBS_POLL_INTERVAL)
+        finally:
+            connection.close()
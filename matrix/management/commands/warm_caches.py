@@ -0,0 +1,80 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from charts.models import HaradaChart
+from matrix.services import load_chart_snapshot, snapshot_key, SNAPSHOT_TIMEOUT
+
+PUBLIC_PAGES = ["home", "long_term_goal", "five_pillars", "64_tasks", "sign_in", "sign_up"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-compute chart snapshots (which carry the completion figures) for "
+        "recently active users and render the cached public pages. Run before "
+        "gunicorn starts accepting traffic."
+    )
+
+    # Matrix cells and modals are not cached as HTML: they are rendered per
+    # request from the snapshot warmed here, and their compiled templates are
+    # shared by every worker through config.warmup in the gunicorn master.
+    # There is no fragment cache to fill, so none is warmed.
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=7,
+            help="Users with a task updated in this many days count as active (default: 7).",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=500,
+            help="Maximum number of charts to warm, most recently active first (default: 500).",
+        )
+
+    def handle(self, *args, days, limit, **options):
+        started = time.monotonic()
+        since = timezone.now() - timedelta(days=days)
+
+        active_users = (
+            User.objects.filter(harada_charts__task__updated_at__gte=since)
+            .values("id")
+            .distinct()
+        )
+        charts = (
+            HaradaChart.objects.filter(user__in=active_users)
+            .annotate(last_activity=Max("task__updated_at"))
+            .order_by("-last_activity")[:limit]
+        )
+
+        warmed = 0
+        for chart in charts:
+            # Recompute unconditionally: a stale shared entry is worse than none
+            cache.set(snapshot_key(chart.id), load_chart_snapshot(chart), SNAPSHOT_TIMEOUT)
+            warmed += 1
+
+        pages = self._warm_public_pages()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {warmed} chart snapshots and {pages} public pages "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
+
+    def _warm_public_pages(self):
+        """Render each public page once so it lands in the page cache."""
+        host = next((h for h in settings.ALLOWED_HOSTS if h and "*" not in h), "localhost")
+        factory = RequestFactory(HTTP_HOST=host)
+        warmed = 0
+        for name in PUBLIC_PAGES:
+            path = reverse(name)
+            request = factory.get(path)
+            request.session = {}
+            response = resolve(path).func(request)
+            warmed += response.status_code == 200
+        return warmed
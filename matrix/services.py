@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from itertools import groupby
+from operator import itemgetter
 
-from charts.models import HaradaChart, Pillar, Task
+from django.core.cache import cache
+
+from charts.models import ChartProgressDaily, HaradaChart, Pillar, Task
+from config.generations import chart_namespace, namespaced_key
 
 
 CENTER = (4, 4)  # 0-based (row, col) for a 9x9 grid
@@ -46,8 +51,63 @@ PILLAR_POS_TO_OUTER_CENTER = {
     8: (4, 1),
 }
 
+# Snapshots are invalidated by generation bumps, so this only bounds how long
+# an idle chart occupies the shared cache.
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass
+class ChartSnapshot:
+    """A chart's pillars and tasks as the matrix pages render them.
+
+    `pillars` are ordered by position and each carries `tasks_by_pos`
+    ({position: Task}); every task has its pillar attached, so templates
+    can follow `task.pillar` without a query.
+    """
+
+    pillars: list[Pillar]
+    completion_percentage: int
+
+
+def load_chart_snapshot(chart: HaradaChart) -> ChartSnapshot:
+    """Read a chart's pillars and tasks from the database (two queries)."""
+
+    pillars = list(chart.pillar_set.order_by("position"))
+    pillars_by_id = {p.id: p for p in pillars}
+    for pillar in pillars:
+        pillar.tasks_by_pos = {}
+
+    total = done = 0
+    for task in Task.objects.filter(chart=chart).order_by("position"):
+        total += 1
+        done += task.status == "done"
+        pillar = pillars_by_id.get(task.pillar_id)
+        if pillar:
+            task.pillar = pillar
+            pillar.tasks_by_pos[task.position] = task
+
+    return ChartSnapshot(
+        pillars=pillars,
+        completion_percentage=round(done * 100 / total) if total else 0,
+    )
+
+
+def snapshot_key(chart_id: int) -> str:
+    return namespaced_key(chart_namespace(chart_id), "snapshot")
 
-def build_matrix_grid(chart: HaradaChart):
+
+def chart_snapshot(chart: HaradaChart) -> ChartSnapshot:
+    """Return the cached snapshot of `chart`, loading it on a miss.
+
+    Any save or delete of the chart, its pillars or tasks bumps the chart's
+    generation (see charts.signals), which moves this to a fresh key.
+    """
+    return cache.get_or_set(
+        snapshot_key(chart.id), lambda: load_chart_snapshot(chart), SNAPSHOT_TIMEOUT
+    )
+
+
+def build_matrix_grid(chart: HaradaChart, snapshot: ChartSnapshot | None = None):
     """Return a 9x9 list-of-lists of cell dicts for rendering.
 
     This grid is fully deterministic and follows the Harada mapping:
@@ -56,8 +116,12 @@ def build_matrix_grid(chart: HaradaChart):
     - 8 outer 3x3 blocks, each centered on a mirrored pillar, surrounded by its 8 tasks
 
     Missing tasks are represented as `task_empty` placeholder cells.
+    Pass a `snapshot` to build the grid without touching the database.
     """
 
+    if snapshot is None:
+        snapshot = load_chart_snapshot(chart)
+
     grid: list[list[dict | None]] = [[None for _ in range(9)] for _ in range(9)]
 
     # Core goal at exact center
@@ -67,8 +131,7 @@ def build_matrix_grid(chart: HaradaChart):
         "title": "Core Goal",
     }
 
-    pillars = list(chart.pillar_set.all().order_by("position"))
-    pillars_by_pos: dict[int, Pillar] = {p.position: p for p in pillars}
+    pillars_by_pos: dict[int, Pillar] = {p.position: p for p in snapshot.pillars}
 
     # Place pillars in center ring and mirrored outer centers
     for pos in range(1, 9):
@@ -103,8 +166,7 @@ def build_matrix_grid(chart: HaradaChart):
         if not pillar:
             continue
 
-        tasks = list(pillar.task_set.all().order_by("position"))
-        tasks_by_pos: dict[int, Task] = {t.position: t for t in tasks}
+        tasks_by_pos: dict[int, Task] = pillar.tasks_by_pos
         center_r, center_c = PILLAR_POS_TO_OUTER_CENTER[pos]
 
         for task_pos in range(1, 9):
@@ -136,3 +198,42 @@ def build_matrix_grid(chart: HaradaChart):
                 }
 
     return grid
+
+
+def build_progress_series(chart: HaradaChart):
+    """Return one point per day with status totals for the progress page.
+
+    Reads only the pre-aggregated ChartProgressDaily rows. A pillar without a
+    row on a given day keeps the counts from its previous row.
+    """
+
+    rows = (
+        ChartProgressDaily.objects.filter(chart=chart)
+        .order_by("date", "pillar_id")
+        .values("date", "pillar_id", "todo_count", "in_progress_count", "done_count")
+    )
+
+    latest: dict[int, dict] = {}
+    series = []
+    for day, day_rows in groupby(rows, key=itemgetter("date")):
+        for row in day_rows:
+            latest[row["pillar_id"]] = row
+        series.append(_progress_point(day, latest.values()))
+
+    return series
+
+
+def _progress_point(day, pillar_rows):
+    todo = sum(r["todo_count"] for r in pillar_rows)
+    in_progress = sum(r["in_progress_count"] for r in pillar_rows)
+    done = sum(r["done_count"] for r in pillar_rows)
+    total = todo + in_progress + done
+    return {
+        "date": day,
+        "todo": todo,
+        "in_progress": in_progress,
+        "done": done,
+        "total": total,
+        "done_pct": round(done * 100 / total) if total else 0,
+        "in_progress_pct": round(in_progress * 100 / total) if total else 0,
+    }
@@ -3,6 +3,14 @@ from . import views
 
 urlpatterns = [
     path("<int:chart_id>/", views.matrix_view, name="matrix_view"),
+    path("<int:chart_id>/progress/", views.progress_view, name="progress_view"),
+    path("<int:chart_id>/share/", views.share_modal, name="share_modal"),
+    path("<int:chart_id>/share/create/", views.share_create, name="share_create"),
+    path(
+        "<int:chart_id>/share/<int:link_id>/revoke/",
+        views.share_revoke,
+        name="share_revoke",
+    ),
     path(
         "<int:chart_id>/pillar/<int:pillar_id>/modal/",
         views.pillar_modal,
@@ -32,6 +40,11 @@ urlpatterns = [
         views.task_create,
         name="task_create",
     ),
+    path(
+        "<int:chart_id>/task/<int:task_id>/check-in/",
+        views.task_check_in,
+        name="task_check_in",
+    ),
     path(
         "<int:chart_id>/task/<int:task_id>/comment/",
         views.task_comment_create,
@@ -1,11 +1,21 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
-from django.http import HttpResponse
-from django.db.models import Prefetch
-from charts.models import HaradaChart, Task, Pillar, TaskComment
-
-from .services import build_matrix_grid
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from charts.models import ChartShareLink, HaradaChart, Task, Pillar, TaskComment
+from charts.services import (
+    checked_in_task_ids,
+    record_status_change,
+    routine_stats,
+    toggle_check_in,
+)
+
+from .services import build_matrix_grid, build_progress_series, chart_snapshot
 
 
 # Color mapping for Tailwind classes
@@ -24,34 +34,47 @@ COLOR_CLASSES = {
 @login_required
 def matrix_view(request, chart_id):
     """Display the 9x9 matrix view of a chart."""
-    chart = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
-
-    # Prefetch pillars and tasks for mobile view
-    pillars = list(chart.pillar_set.all().prefetch_related(
-        Prefetch('task_set', queryset=Task.objects.all().order_by('position'))
-    ).order_by('position'))
-    
-    # Helper to access tasks by position in mobile view
-    for pillar in pillars:
-        tasks = list(pillar.task_set.all())
-        pillar.tasks_by_pos = {t.position: t for t in tasks}
-
-    grid = build_matrix_grid(chart)
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
+
+    snapshot = chart_snapshot(chart)
+    grid = build_matrix_grid(chart, snapshot)
+
+    # Flag routine tasks already checked in today (one query for the chart).
+    # Grid cells and pillars share the same task objects.
+    tasks = [
+        task for pillar in snapshot.pillars for task in pillar.tasks_by_pos.values()
+    ]
+    checked_in = checked_in_task_ids(
+        [t for t in tasks if t.frequency == "routine"], timezone.localdate()
+    )
+    for task in tasks:
+        task.checked_in_today = task.id in checked_in
 
     return render(request, "matrix/view.html", {
         "chart": chart, 
         "grid": grid, 
-        "pillars": pillars,
+        "pillars": snapshot.pillars,
+        "completion_percentage": snapshot.completion_percentage,
         "color_classes": COLOR_CLASSES,
         "position_range": range(1, 9)
     })
 
 
+@login_required
+@require_http_methods(["GET"])
+def progress_view(request, chart_id):
+    """Display the chart's progress over time from the daily rollups."""
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
+    series = build_progress_series(chart)
+
+    return render(request, "matrix/progress.html", {"chart": chart, "series": series})
+
+
 @login_required
 @require_http_methods(["GET"])
 def pillar_modal(request, chart_id, pillar_id):
     """HTMX endpoint: Get pillar detail modal."""
-    chart = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
     pillar = get_object_or_404(
         Pillar.objects.prefetch_related('task_set'),
         id=pillar_id,
@@ -69,7 +92,7 @@ def pillar_modal(request, chart_id, pillar_id):
 @require_http_methods(["POST"])
 def pillar_update(request, chart_id, pillar_id):
     """HTMX endpoint: Update pillar details."""
-    chart = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
     pillar = get_object_or_404(Pillar, id=pillar_id, chart=chart)
 
     # Update pillar fields
@@ -85,36 +108,71 @@ def pillar_update(request, chart_id, pillar_id):
 @require_http_methods(["GET"])
 def task_modal(request, chart_id, task_id):
     """HTMX endpoint: Get task detail modal."""
-    chart = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
     task = get_object_or_404(
-        Task.objects.prefetch_related('comments__user'),
+        Task.objects.select_related('pillar').prefetch_related('comments__user'),
         id=task_id,
         chart=chart
     )
 
-    return render(request, "matrix/task_modal.html", {"task": task, "chart": chart})
+    stats = None
+    if task.frequency == "routine":
+        stats = routine_stats(task, timezone.localdate())
+
+    return render(
+        request,
+        "matrix/task_modal.html",
+        {"task": task, "chart": chart, "routine_stats": stats},
+    )
 
 
 @login_required
 @require_http_methods(["POST"])
 def task_update(request, chart_id, task_id):
     """HTMX endpoint: Update task details."""
-    chart = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
     task = get_object_or_404(
         Task.objects.select_related('pillar'),
         id=task_id,
         chart=chart
     )
 
+    previous_status = task.status
+
     # Update task fields
     task.title = request.POST.get("title", task.title)
     task.description = request.POST.get("description", task.description)
     task.frequency = request.POST.get("frequency", task.frequency)
     task.status = request.POST.get("status", task.status)
-    task.save()
+    with transaction.atomic():
+        task.save()
+        record_status_change(task, previous_status)
+
+    return _task_cell_response(task, chart)
+
+
+@login_required
+@require_http_methods(["POST"])
+def task_check_in(request, chart_id, task_id):
+    """HTMX endpoint: Toggle today's check-in for a routine task."""
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
+    task = get_object_or_404(
+        Task.objects.select_related('pillar'),
+        id=task_id,
+        chart=chart,
+        frequency="routine",
+    )
+
+    toggle_check_in(task, timezone.localdate())
+
+    return _task_cell_response(task, chart)
+
+
+def _task_cell_response(task, chart):
+    """Render a task cell for both the desktop and mobile matrix wrappers."""
+    if task.frequency == "routine":
+        task.checked_in_today = bool(checked_in_task_ids([task], timezone.localdate()))
 
-    # Return updated task cell with both desktop and mobile wrappers
-    from django.template.loader import render_to_string
     cell_html = render_to_string("matrix/task_cell.html", {
         "task": task, 
         "chart": chart,
@@ -133,7 +191,7 @@ def task_update(request, chart_id, task_id):
 @require_http_methods(["GET"])
 def task_create_modal(request, chart_id, pillar_id, position):
     """HTMX endpoint: Open a create-task modal for an empty task cell."""
-    chart = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
     pillar = get_object_or_404(Pillar, id=pillar_id, chart=chart)
     position = int(position)
 
@@ -148,7 +206,7 @@ def task_create_modal(request, chart_id, pillar_id, position):
 @require_http_methods(["POST"])
 def task_create(request, chart_id, pillar_id, position):
     """HTMX endpoint: Create (or upsert) a task for an empty task cell."""
-    chart = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
     pillar = get_object_or_404(Pillar, id=pillar_id, chart=chart)
     position = int(position)
 
@@ -158,17 +216,24 @@ def task_create(request, chart_id, pillar_id, position):
     status = request.POST.get("status", "todo")
 
     if title:
-        Task.objects.update_or_create(
-            pillar=pillar,
-            position=position,
-            defaults={
-                "chart": chart,
-                "title": title,
-                "description": description,
-                "frequency": frequency,
-                "status": status,
-            },
-        )
+        with transaction.atomic():
+            previous_status = (
+                Task.objects.filter(pillar=pillar, position=position)
+                .values_list("status", flat=True)
+                .first()
+            )
+            task, _ = Task.objects.update_or_create(
+                pillar=pillar,
+                position=position,
+                defaults={
+                    "chart": chart,
+                    "title": title,
+                    "description": description,
+                    "frequency": frequency,
+                    "status": status,
+                },
+            )
+            record_status_change(task, previous_status)
 
     # Simple + reliable: reload page to reflect new grid contents.
     response = HttpResponse("")
@@ -180,7 +245,7 @@ def task_create(request, chart_id, pillar_id, position):
 @require_http_methods(["POST"])
 def task_comment_create(request, chart_id, task_id):
     """HTMX endpoint: Create a comment on a task."""
-    chart = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
     task = get_object_or_404(Task, id=task_id, chart=chart)
 
     content = request.POST.get("content", "").strip()
@@ -196,3 +261,70 @@ def task_comment_create(request, chart_id, task_id):
         return render(request, "matrix/task_comment.html", {"comment": comment})
     
     return HttpResponse("")
+
+
+@login_required
+@require_http_methods(["GET"])
+def share_modal(request, chart_id):
+    """HTMX endpoint: List and manage a chart's public share links."""
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
+    return _share_modal_response(request, chart)
+
+
+@login_required
+@require_http_methods(["POST"])
+def share_create(request, chart_id):
+    """HTMX endpoint: Create a new public share link."""
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
+    ChartShareLink.objects.create(chart=chart)
+    return _share_modal_response(request, chart)
+
+
+@login_required
+@require_http_methods(["POST"])
+def share_revoke(request, chart_id, link_id):
+    """HTMX endpoint: Revoke a public share link."""
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
+    ChartShareLink.objects.filter(id=link_id, chart=chart, revoked_at__isnull=True).update(
+        revoked_at=timezone.now()
+    )
+    return _share_modal_response(request, chart)
+
+
+def _share_modal_response(request, chart):
+    links = chart.share_links.filter(revoked_at__isnull=True)
+    return render(request, "matrix/share_modal.html", {"chart": chart, "links": links})
+
+
+@require_http_methods(["GET", "HEAD"])
+def shared_chart_view(request, token):
+    """Anonymous, read-only 9x9 matrix behind a share link.
+
+    Never touches the session or request.user and is skipped by
+    ClerkMiddleware (see CLERK_EXEMPT_PATHS), so the response carries no
+    cookies or Vary: Cookie and can be stored by nginx or a CDN. The ETag
+    changes whenever the chart or any of its pillars or tasks change, so
+    revalidation is a single indexed lookup answered with 304.
+    """
+    link = (
+        ChartShareLink.objects.select_related("chart")
+        .filter(token=token, revoked_at__isnull=True, chart__deletion_requested_at__isnull=True)
+        .first()
+    )
+    if link is None:
+        raise Http404("Share link not found")
+
+    chart = link.chart
+    etag = f'"{chart.id}-{chart.version}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        html = render_to_string("matrix/shared_view.html", {
+            "chart": chart,
+            "grid": build_matrix_grid(chart, chart_snapshot(chart)),
+            "color_classes": COLOR_CLASSES,
+        })
+        response = HttpResponse(html)
+        response["ETag"] = etag
+
+    patch_cache_control(response, public=True, max_age=settings.SHARE_CACHE_MAX_AGE)
+    return response
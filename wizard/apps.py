@@ -2,4 +2,6 @@ from django.apps import AppConfig
 
 
 class WizardConfig(AppConfig):
+    # What 0001_initial was generated with; the project sets no DEFAULT_AUTO_FIELD
+    default_auto_field = 'django.db.models.AutoField'
     name = 'wizard'
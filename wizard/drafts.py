@@ -0,0 +1,130 @@
+"""Anonymous wizard drafts, kept in WizardDraft rows instead of the session.
+
+The session holds only the draft's token, so pages outside the wizard no
+longer load and re-save the whole temporary chart with every request, and
+the session itself is only written when a draft is started or dropped.
+Drafts expire WIZARD_DRAFT_TTL seconds after their last save.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from charts import search
+from charts.models import HaradaChart, Pillar, Task
+from charts.services import record_bulk_status_changes
+
+from .models import WizardDraft
+
+SESSION_KEY = "wizard_draft"
+# Where drafts lived before they moved out of the session
+_LEGACY_KEYS = ("temp_chart_id", "temp_chart_data")
+
+
+def _expiry():
+    return timezone.now() + timedelta(seconds=settings.WIZARD_DRAFT_TTL)
+
+
+def _draft(request) -> WizardDraft | None:
+    # Looked up once per request; save() and discard() keep it current
+    if not hasattr(request, "_wizard_draft"):
+        token = request.session.get(SESSION_KEY)
+        draft = (
+            WizardDraft.objects.filter(token=token, expires_at__gt=timezone.now()).first()
+            if token
+            else None
+        )
+        legacy = request.session.get("temp_chart_data")
+        for key in _LEGACY_KEYS:
+            request.session.pop(key, None)
+        if draft is None and legacy:
+            draft = WizardDraft.objects.create(data=legacy, expires_at=_expiry())
+            request.session[SESSION_KEY] = draft.token
+        request._wizard_draft = draft
+    return request._wizard_draft
+
+
+def load(request) -> dict:
+    """The visitor's draft data, or {} when there is none."""
+    draft = _draft(request)
+    return draft.data if draft is not None else {}
+
+
+def save(request, data: dict) -> WizardDraft:
+    """Store `data` as the visitor's draft and renew its expiry."""
+    draft = _draft(request)
+    expires_at = _expiry()
+    # update() skips auto_now, so updated_at is set by hand
+    updated_at = timezone.now()
+    if draft is not None and WizardDraft.objects.filter(id=draft.id).update(
+        data=data, expires_at=expires_at, updated_at=updated_at
+    ):
+        draft.data, draft.expires_at, draft.updated_at = data, expires_at, updated_at
+        return draft
+    draft = WizardDraft.objects.create(data=data, expires_at=expires_at)
+    request.session[SESSION_KEY] = draft.token
+    request._wizard_draft = draft
+    return draft
+
+
+def discard(request):
+    """Delete the visitor's draft and forget its token."""
+    draft = _draft(request)
+    if draft is not None:
+        WizardDraft.objects.filter(id=draft.id).delete()
+    request.session.pop(SESSION_KEY, None)
+    request._wizard_draft = None
+
+
+def target_date(data: dict):
+    value = data.get("target_date", "2026-12-31")
+    return datetime.strptime(value, "%Y-%m-%d").date() if isinstance(value, str) else value
+
+
+def create_chart(user, data: dict) -> HaradaChart:
+    """A finished chart built from draft `data` with bulk inserts.
+
+    One INSERT for the chart, one for all pillars, one for all tasks, one
+    search upsert and one for the tasks' creation events (plus today's
+    progress rows), whatever the number of cells filled in.
+    """
+    with transaction.atomic():
+        chart = HaradaChart.objects.create(
+            user=user,
+            title=data.get("title", "Untitled Goal"),
+            core_goal=data.get("core_goal", ""),
+            target_date=target_date(data),
+            perspectives=data.get("perspectives", {}),
+            is_draft=False,  # they finished the wizard
+        )
+        named = [
+            (int(number), pillar_data)
+            for number, pillar_data in data.get("pillars", {}).items()
+            if pillar_data.get("name")
+        ]
+        pillars = Pillar.objects.bulk_create(
+            [Pillar(chart=chart, name=pillar_data["name"], position=number) for number, pillar_data in named]
+        )
+        tasks = Task.objects.bulk_create(
+            [
+                Task(
+                    chart=chart,
+                    pillar=pillar,
+                    title=task_data["title"],
+                    position=int(task_number),
+                    status="todo",
+                    frequency="one_time",
+                )
+                for pillar, (_, pillar_data) in zip(pillars, named)
+                for task_number, task_data in pillar_data.get("tasks", {}).items()
+                if task_data.get("title")
+            ]
+        )
+        # bulk_create skips post_save, so index the rows explicitly
+        search.index_objects([*pillars, *tasks])
+        record_bulk_status_changes(chart.id, [(task, None) for task in tasks], new_chart=True)
+    return chart
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:17
+
+import wizard.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WizardDraft',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(default=wizard.models._new_draft_token, max_length=64, unique=True)),
+                ('data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField(db_index=True, help_text='Renewed on every save; expired drafts are ignored')),
+            ],
+        ),
+    ]
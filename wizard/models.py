@@ -1,3 +1,25 @@
+import secrets
+
 from django.db import models
 
-# Create your models here.
+
+def _new_draft_token():
+    return secrets.token_urlsafe(24)
+
+
+class WizardDraft(models.Model):
+    """
+    An anonymous visitor's wizard progress: title, perspectives, pillars and
+    task titles. The session only holds the token (see wizard.drafts).
+    """
+
+    token = models.CharField(max_length=64, unique=True, default=_new_draft_token)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(
+        db_index=True, help_text="Renewed on every save; expired drafts are ignored"
+    )
+
+    def __str__(self):
+        return f"Draft {self.data.get('title') or self.token[:8]}"
@@ -8,79 +8,26 @@ import uuid
 import logging
 from datetime import datetime
 from charts.models import HaradaChart, Pillar, Task
+from charts.services import record_bulk_status_changes, save_chart_tasks
 from matrix.views import COLOR_CLASSES
+from config.log import truncated
 
-logger = logging.getLogger(__name__)
-
-
-def _get_or_create_session_chart(request):
-    """Get or create a temporary chart for unauthenticated users."""
-    if 'temp_chart_id' not in request.session:
-        request.session['temp_chart_id'] = None
-        request.session['temp_chart_data'] = {}
-    return request.session.get('temp_chart_data', {})
-
+from . import drafts
 
-def _save_session_chart_data(request, chart_id, data):
-    """Save chart data in session for unauthenticated users."""
-    request.session['temp_chart_id'] = chart_id
-    request.session['temp_chart_data'] = data
-    request.session.modified = True
+logger = logging.getLogger(__name__)
 
 
 def _migrate_session_to_database(request, chart_id):
-    """Migrate a session-based temporary chart to a real database chart."""
+    """Turn the visitor's wizard draft into a real chart owned by the user."""
     if not request.user.is_authenticated:
         return None
-    
-    temp_data = request.session.get('temp_chart_data', {})
+
+    temp_data = drafts.load(request)
     if not temp_data:
         return None
-    
-    # Create the chart
-    target_date_str = temp_data.get('target_date', '2026-12-31')
-    if isinstance(target_date_str, str):
-        target_date = datetime.strptime(target_date_str, "%Y-%m-%d").date()
-    else:
-        target_date = target_date_str
-    
-    chart = HaradaChart.objects.create(
-        user=request.user,
-        title=temp_data.get('title', 'Untitled Goal'),
-        core_goal=temp_data.get('core_goal', ''),
-        target_date=target_date,
-        perspectives=temp_data.get('perspectives', {}),
-        is_draft=False  # Mark as complete since they finished the wizard
-    )
-    
-    # Create pillars and tasks
-    pillars_data = temp_data.get('pillars', {})
-    for pillar_num, pillar_data in pillars_data.items():
-        if pillar_data.get('name'):
-            pillar = Pillar.objects.create(
-                chart=chart,
-                name=pillar_data['name'],
-                position=int(pillar_num)
-            )
-            
-            # Create tasks for this pillar
-            tasks_data = pillar_data.get('tasks', {})
-            for task_num, task_data in tasks_data.items():
-                if task_data.get('title'):
-                    Task.objects.create(
-                        chart=chart,
-                        pillar=pillar,
-                        title=task_data['title'],
-                        position=int(task_num),
-                        status='todo',
-                        frequency='one_time'
-                    )
-    
-    # Clear session data
-    request.session['temp_chart_id'] = None
-    request.session['temp_chart_data'] = {}
-    request.session.modified = True
-    
+
+    chart = drafts.create_chart(request.user, temp_data)
+    drafts.discard(request)
     return chart
 
 
@@ -88,34 +35,32 @@ def _migrate_session_to_database(request, chart_id):
 @require_POST
 def create_chart(request):
     """API endpoint to create a new chart with a goal (both authenticated and unauthenticated)."""
-    logger.info("=== CREATE CHART ENDPOINT CALLED ===")
-    logger.info(f"Request method: {request.method}")
-    logger.info(f"User authenticated: {request.user.is_authenticated}")
-    logger.info(f"User: {request.user}")
-    logger.info(f"Request body length: {len(request.body) if request.body else 0}")
+    logger.debug(
+        "create_chart: user=%s authenticated=%s body=%d bytes",
+        request.user, request.user.is_authenticated, len(request.body or b""),
+    )
     
     try:
         # Parse JSON body
         try:
             data = json.loads(request.body)
-            logger.info(f"Parsed JSON data: {data}")
+            logger.debug("Parsed JSON data: %s", truncated(data))
         except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {str(e)}")
+            logger.warning("JSON decode error: %s", e)
             return JsonResponse({'error': f'Invalid JSON: {str(e)}'}, status=400)
         
         title = data.get('title', '').strip()
-        logger.info(f"Title extracted: '{title}'")
+        logger.debug("Title extracted: '%s'", truncated(title))
         
         if not title:
             logger.warning("Title is empty")
             return JsonResponse({'error': 'Title is required'}, status=400)
         
         if request.user.is_authenticated:
-            logger.info(f"Creating real database chart for user: {request.user.username}")
+            logger.debug("Creating database chart for user %s", request.user.username)
             # Create a real database chart for authenticated users
             try:
                 target_date = datetime.strptime("2026-12-31", "%Y-%m-%d").date()
-                logger.info(f"Target date created: {target_date}")
                 
                 chart = HaradaChart.objects.create(
                     user=request.user,
@@ -124,20 +69,20 @@ def create_chart(request):
                     target_date=target_date,
                     is_draft=True,
                 )
-                logger.info(f"Chart created successfully with ID: {chart.id}")
+                logger.info("Chart %s created for user %s", chart.id, request.user.username)
                 
                 return JsonResponse({
                     'chart_id': chart.id,
                     'success': True
                 })
             except Exception as db_error:
-                logger.error(f"Database error creating chart: {str(db_error)}", exc_info=True)
+                logger.error("Database error creating chart: %s", db_error, exc_info=True)
                 raise
         else:
-            logger.info("Creating temporary session-based chart for unauthenticated user")
-            # For unauthenticated users, use a temporary session-based chart
+            logger.debug("Creating wizard draft for unauthenticated user")
+            # For unauthenticated users, keep the chart as a wizard draft
             temp_id = f"temp_{uuid.uuid4().hex[:12]}"
-            logger.info(f"Generated temp_id: {temp_id}")
+            logger.debug("Generated temp_id: %s", temp_id)
             
             temp_chart_data = {
                 'id': temp_id,
@@ -150,15 +95,15 @@ def create_chart(request):
                 'tasks': {}
             }
             
-            _save_session_chart_data(request, temp_id, temp_chart_data)
-            logger.info(f"Session chart saved successfully")
+            drafts.save(request, temp_chart_data)
+            logger.debug("Draft chart %s saved", temp_id)
             
             return JsonResponse({
                 'chart_id': temp_id,
                 'success': True
             })
     except Exception as e:
-        logger.error(f"Unexpected error in create_chart: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in create_chart: %s", e, exc_info=True)
         return JsonResponse({'error': str(e)}, status=500)
 
 
@@ -180,7 +125,7 @@ def wizard_start(request):
 
 
 def _get_chart(request, chart_id):
-    """Get chart from database if authenticated or from session if temporary.
+    """Get chart from database if authenticated or from the visitor's draft if temporary.
     
     If an authenticated user accesses a temporary chart ID, migrate it to a real chart.
     """
@@ -188,14 +133,10 @@ def _get_chart(request, chart_id):
         # Check if this is an authenticated user accessing a temporary chart
         if request.user.is_authenticated:
             # Migrate the temporary chart to a real database chart
-            temp_data = request.session.get('temp_chart_data', {})
+            temp_data = drafts.load(request)
             
-            # Create a chart from the session data or with a default title
-            target_date_str = temp_data.get('target_date', '2026-12-31')
-            if isinstance(target_date_str, str):
-                target_date = datetime.strptime(target_date_str, "%Y-%m-%d").date()
-            else:
-                target_date = target_date_str
+            # Create a chart from the draft or with a default title
+            target_date = drafts.target_date(temp_data)
             
             chart = HaradaChart.objects.create(
                 user=request.user,
@@ -205,19 +146,16 @@ def _get_chart(request, chart_id):
                 perspectives=temp_data.get('perspectives', {}),
                 is_draft=True
             )
-            # Clear the temporary chart data from session
-            request.session['temp_chart_id'] = None
-            request.session['temp_chart_data'] = {}
-            request.session.modified = True
+            drafts.discard(request)
             # Return the new chart
             return chart
         else:
-            # Unauthenticated user, get from session
-            return request.session.get('temp_chart_data', {})
+            # Unauthenticated user, get their draft
+            return drafts.load(request)
     else:
         # Real database chart
         try:
-            return HaradaChart.objects.get(id=chart_id)
+            return HaradaChart.objects.live().get(id=chart_id)
         except HaradaChart.DoesNotExist:
             return None
 
@@ -235,7 +173,7 @@ def wizard_step1(request, chart_id):
     
     if request.method == "POST":
         if str(chart_id).startswith('temp_'):
-            # Update session-based temporary chart
+            # Update the temporary chart in the draft
             chart['title'] = request.POST.get("title", chart.get('title', ''))
             chart['core_goal'] = request.POST.get("core_goal", chart.get('core_goal', ''))
             chart['target_date'] = request.POST.get("target_date", chart.get('target_date', '2026-12-31'))
@@ -245,7 +183,7 @@ def wizard_step1(request, chart_id):
                 "others_tangible": request.POST.get("others_tangible", ""),
                 "others_intangible": request.POST.get("others_intangible", ""),
             }
-            _save_session_chart_data(request, chart_id, chart)
+            drafts.save(request, chart)
         else:
             # Update database chart (requires authentication)
             if not request.user.is_authenticated:
@@ -285,7 +223,7 @@ def wizard_step2(request, chart_id):
 
     if request.method == "POST":
         if str(chart_id).startswith('temp_'):
-            # Update session-based temporary chart pillars
+            # Update the temporary chart's pillars in the draft
             if 'pillars' not in chart:
                 chart['pillars'] = {}
             
@@ -299,7 +237,7 @@ def wizard_step2(request, chart_id):
                         'position': i,
                         'tasks': {}
                     }
-            _save_session_chart_data(request, chart_id, chart)
+            drafts.save(request, chart)
         else:
             # Update database chart pillars (requires authentication)
             if not request.user.is_authenticated:
@@ -398,7 +336,7 @@ def wizard_step3(request, chart_id):
                             }
             
             chart['pillars'] = pillars_data
-            _save_session_chart_data(request, chart_id, chart)
+            drafts.save(request, chart)
             
             # Check if this is a "Complete Chart" action
             if 'complete_chart' in request.POST:
@@ -417,27 +355,19 @@ def wizard_step3(request, chart_id):
                 return redirect("wizard_step3", chart_id=chart_id)
         else:
             # Database chart - process normally
+            titles = {}
             for pillar in pillars:
                 for i in range(1, 9):
                     task_key = f"pillar_{pillar.position}_task_{i}"
                     task_title = request.POST.get(task_key, "")
 
                     if task_title:
-                        Task.objects.update_or_create(
-                            pillar=pillar,
-                            position=i,
-                            defaults={
-                                "chart": chart,
-                                "title": task_title,
-                                "description": "",
-                                "status": "todo",
-                                "frequency": "one_time",
-                            },
-                        )
-
-            # Finalize the chart
+                        titles[(pillar.id, i)] = task_title
+            save_chart_tasks(chart, titles)
+
+            # Finalize the chart; update_fields keeps the version bumped above
             chart.is_draft = False
-            chart.save()
+            chart.save(update_fields=["is_draft", "updated_at"])
             return redirect("matrix_view", chart_id=chart.id)
 
     return render(
@@ -455,7 +385,7 @@ def wizard_step3(request, chart_id):
 @login_required
 def wizard_step3_pillar_view(request, chart_id, pillar_id):
     """HTMX endpoint for changing focused pillar in Step 3."""
-    chart = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
+    chart = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
     pillar = get_object_or_404(Pillar, id=pillar_id, chart=chart)
     tasks = Task.objects.filter(pillar=pillar).order_by("position")
 
@@ -517,10 +447,11 @@ Output Format: You MUST return the data strictly as a single JSON object with th
 }}"""
     
     if request.method == "POST":
-        logger.info(f"=== AI INSPIRATION POST REQUEST ===")
-        logger.info(f"Chart ID: {chart_id}, Authenticated: {request.user.is_authenticated}")
         json_input = request.POST.get("json_input", "").strip()
-        logger.info(f"JSON input length: {len(json_input)}")
+        logger.debug(
+            "ai_inspiration: chart=%s authenticated=%s input=%d chars",
+            chart_id, request.user.is_authenticated, len(json_input),
+        )
         
         if not json_input:
             logger.warning("JSON input is empty")
@@ -531,11 +462,10 @@ Output Format: You MUST return the data strictly as a single JSON object with th
             })
         
         try:
-            logger.info("Attempting to parse JSON...")
             ai_data = json.loads(json_input)
-            logger.info(f"✅ JSON parsed successfully, pillars: {len(ai_data.get('pillars', []))}")
+            logger.debug("JSON parsed, %d pillars", len(ai_data.get("pillars", [])))
         except json.JSONDecodeError as e:
-            logger.error(f"❌ JSON parse error: {str(e)}")
+            logger.warning("JSON parse error: %s; input: %s", e, truncated(json_input))
             return render(request, "wizard/ai_inspiration.html", {
                 "chart": chart,
                 "prompt": prompt,
@@ -543,26 +473,23 @@ Output Format: You MUST return the data strictly as a single JSON object with th
             })
         
         # Validate JSON structure
-        logger.info(f"Validating JSON structure...")
         if not isinstance(ai_data.get("pillars"), list) or len(ai_data["pillars"]) != 8:
-            logger.error(f"❌ Invalid pillar count: {len(ai_data.get('pillars', []))}")
+            logger.warning("Invalid pillar count: %d", len(ai_data.get("pillars", [])))
             return render(request, "wizard/ai_inspiration.html", {
                 "chart": chart,
                 "prompt": prompt,
                 "error": "JSON must contain exactly 8 pillars."
             })
         
-        logger.info(f"Chart type: {type(chart)}, isinstance dict: {isinstance(chart, dict)}, is temp: {str(chart_id).startswith('temp_')}")
-        
         # Process the AI data and populate chart
         if str(chart_id).startswith('temp_'):
-            logger.info("🔵 Processing TEMPORARY chart")
+            logger.debug("Processing temporary chart %s", chart_id)
             # Session-based chart
             pillars_data = {}
             for idx, pillar_data in enumerate(ai_data["pillars"], 1):
                 tasks_list = pillar_data.get("tasks", [])
                 if len(tasks_list) != 8:
-                    logger.error(f"❌ Pillar {idx} has {len(tasks_list)} tasks instead of 8")
+                    logger.warning("Pillar %d has %d tasks instead of 8", idx, len(tasks_list))
                     return render(request, "wizard/ai_inspiration.html", {
                         "chart": chart,
                         "prompt": prompt,
@@ -576,45 +503,41 @@ Output Format: You MUST return the data strictly as a single JSON object with th
                 }
             
             chart['pillars'] = pillars_data
-            _save_session_chart_data(request, chart_id, chart)
-            logger.info(f"✅ Temporary chart pillars saved, migrating to database...")
+            drafts.save(request, chart)
+            logger.debug("Temporary chart %s pillars saved", chart_id)
             
             # Require authentication to complete
             if not request.user.is_authenticated:
-                logger.warning("❌ User not authenticated for temporary chart")
+                logger.debug("User not authenticated for temporary chart %s", chart_id)
                 return redirect(f'/sign-up?redirect=/wizard/{chart_id}/ai-inspiration/')
             
             # User is authenticated, migrate to real chart
-            logger.info("Migrating temporary chart to database...")
             migrated_chart = _migrate_session_to_database(request, chart_id)
             if migrated_chart:
-                logger.info(f"✅ Migration successful, chart ID: {migrated_chart.id}, redirecting to matrix_view")
+                logger.info("Temporary chart %s migrated to chart %s", chart_id, migrated_chart.id)
                 return redirect("matrix_view", chart_id=migrated_chart.id)
             else:
-                logger.error("❌ Migration failed")
+                logger.error("Migrating temporary chart %s failed", chart_id)
                 return redirect('home')
         else:
-            logger.info(f"🟢 Processing DATABASE chart, ID: {chart_id}")
+            logger.debug("Processing database chart %s", chart_id)
             # Database chart (requires authentication)
             if not request.user.is_authenticated:
-                logger.warning("❌ User not authenticated for database chart")
+                logger.debug("User not authenticated for database chart %s", chart_id)
                 return redirect('sign_up')
             
-            logger.info(f"Getting chart object for ID: {chart_id}, user: {request.user}")
-            chart_obj = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
-            logger.info(f"✅ Got chart object: {chart_obj}")
+            chart_obj = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
             
             # Clear existing pillars and tasks
-            logger.info("Clearing existing pillars and tasks...")
             deleted_count, _ = chart_obj.pillar_set.all().delete()
-            logger.info(f"✅ Deleted {deleted_count} pillars")
+            logger.debug("Deleted %d existing pillars and tasks", deleted_count)
             
             # Create new pillars and tasks
-            logger.info(f"Creating 8 new pillars...")
+            imported_tasks = []
             for idx, pillar_data in enumerate(ai_data["pillars"], 1):
                 tasks_list = pillar_data.get("tasks", [])
                 if len(tasks_list) != 8:
-                    logger.error(f"❌ Pillar {idx} has {len(tasks_list)} tasks instead of 8")
+                    logger.warning("Pillar %d has %d tasks instead of 8", idx, len(tasks_list))
                     return render(request, "wizard/ai_inspiration.html", {
                         "chart": chart_obj,
                         "prompt": prompt,
@@ -626,24 +549,22 @@ Output Format: You MUST return the data strictly as a single JSON object with th
                     name=pillar_data.get("pillar_name", f"Pillar {idx}"),
                     position=idx
                 )
-                logger.info(f"✅ Created pillar {idx}: {pillar.name}")
                 
                 for task_idx, task_title in enumerate(tasks_list, 1):
-                    Task.objects.create(
+                    imported_tasks.append(Task.objects.create(
                         chart=chart_obj,
                         pillar=pillar,
                         title=task_title,
                         position=task_idx,
                         status='todo',
                         frequency='one_time'
-                    )
-                logger.info(f"✅ Created 8 tasks for pillar {idx}")
+                    ))
             
             # Mark chart as complete and redirect to matrix view
-            logger.info(f"Marking chart as complete...")
             chart_obj.is_draft = False
             chart_obj.save()
-            logger.info(f"✅ Chart marked as complete. Redirecting to matrix_view with chart_id={chart_id}")
+            record_bulk_status_changes(chart_obj.id, [(task, None) for task in imported_tasks])
+            logger.info("Chart %s filled from AI inspiration", chart_id)
             return redirect("matrix_view", chart_id=chart_id)
         
         try:
@@ -683,17 +604,18 @@ Output Format: You MUST return the data strictly as a single JSON object with th
                 }
             
             chart['pillars'] = pillars_data
-            _save_session_chart_data(request, chart_id, chart)
+            drafts.save(request, chart)
             # Database chart (requires authentication)
             if not request.user.is_authenticated:
                 return redirect('sign_up')
             
-            chart_obj = get_object_or_404(HaradaChart, id=chart_id, user=request.user)
+            chart_obj = get_object_or_404(HaradaChart.objects.live(), id=chart_id, user=request.user)
             
             # Clear existing pillars and tasks
             chart_obj.pillar_set.all().delete()
             
             # Create new pillars and tasks
+            imported_tasks = []
             for idx, pillar_data in enumerate(ai_data["pillars"], 1):
                 tasks_list = pillar_data.get("tasks", [])
                 if len(tasks_list) != 8:
@@ -710,18 +632,19 @@ Output Format: You MUST return the data strictly as a single JSON object with th
                 )
                 
                 for task_idx, task_title in enumerate(tasks_list, 1):
-                    Task.objects.create(
+                    imported_tasks.append(Task.objects.create(
                         chart=chart_obj,
                         pillar=pillar,
                         title=task_title,
                         position=task_idx,
                         status='todo',
                         frequency='one_time'
-                    )
+                    ))
             
             # Mark chart as complete and redirect to matrix view
             chart_obj.is_draft = False
             chart_obj.save()
+            record_bulk_status_changes(chart_obj.id, [(task, None) for task in imported_tasks])
             return redirect("matrix_view", chart_id=chart_id)
         
         # For temporary charts, migrate to database